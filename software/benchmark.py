@@ -0,0 +1,169 @@
+from argparse import ArgumentParser
+import json
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import time
+from typing import Any, Dict
+
+from lib.carillon import Carillon
+from lib.melody import Melody
+from lib.virtualport import VirtualPort
+from lib.wireport import WirePort
+
+
+# Referenzmelodien, damit Ergebnisse zwischen Commits vergleichbar bleiben
+REFERENCE = ['songs/Westminster Quarters.mid', 'songs/218 short.mid',
+             'striker/mehrerau/q4.mid']
+
+
+def environment() -> Dict[str, Any]:
+    """Beschreibt Rechner und Softwarestand, auf dem gemessen wurde."""
+    model = Path('/proc/device-tree/model')
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'machine': platform.machine(),
+        'model': model.read_text().strip('\0\n') if model.exists() else None,
+        'python': platform.python_version(),
+        'system': platform.platform(),
+    }
+
+
+def measure(carillon: Carillon, port: VirtualPort, path: Path,
+            tempo: float) -> Dict[str, Any]:
+    """
+    Spielt eine Melodie über das Carillon auf den virtuellen Port und
+    vergleicht die aufgezeichneten Zeitstempel mit den Sollzeitpunkten.
+
+    Parameters
+    ----------
+    carillon : Carillon
+        Carillon, das auf den virtuellen Port spielt.
+    port : VirtualPort
+        Der virtuelle Port des Carillons.
+    path : Path
+        Pfad zur Melodie.
+    tempo : float
+        Tempo, mit dem die Melodie gespielt wird.
+
+    Returns
+    -------
+    Kennzahlen der Wiedergabe, Zeiten in Millisekunden.
+    """
+    melody = Melody.from_file(path)
+    melody.tempo = tempo
+
+    # Sollzeitpunkte jeder einzelnen Nachricht
+    expected = list()
+    for offset, score, transpose, speed in melody.segments():
+        times, groups = score.wire(transpose, carillon.volume)
+        for t, data in zip(times, groups):
+            for msg in WirePort.split(data):
+                expected.append((offset + t / speed, msg))
+    notes = sum(1 for _, msg in expected if msg[0] & 0xF0 == 0x90)
+
+    port.clear()
+    cpu = time.process_time()
+    carillon.play(melody)
+    deadline = time.perf_counter() + melody.duration + 5
+    while len(port.times) < len(expected) and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    while carillon.current is not None: time.sleep(0.01)
+    cpu = time.process_time() - cpu
+
+    actual = port.times[:len(expected)]
+    if len(actual) < len(expected):
+        raise RuntimeError(f'{path}: only {len(actual)} of {len(expected)} '
+                           'messages received')
+
+    # Abweichung jeder Nachricht relativ zur ersten
+    base = actual[0] - expected[0][0]
+    errors = [a - e - base for a, (e, _) in zip(actual, expected)]
+    onsets = [e for e, _ in expected]
+
+    # Drift als Steigung der Ausgleichsgeraden der Abweichung über die Zeit
+    mean_onset, mean_error = statistics.fmean(onsets), statistics.fmean(errors)
+    variance = sum((o - mean_onset) ** 2 for o in onsets)
+    drift = sum((o - mean_onset) * (e - mean_error)
+                for o, e in zip(onsets, errors)) / variance if variance else 0
+
+    # Spreizung gleichzeitiger Nachrichten (Akkorde)
+    chords: Dict[float, list] = dict()
+    for a, e in zip(actual, onsets): chords.setdefault(e, list()).append(a)
+    spreads = [max(c) - min(c) for c in chords.values() if len(c) > 1]
+
+    absolute = sorted(abs(e) for e in errors)
+    p99 = absolute[min(len(absolute) - 1, int(0.99 * len(absolute)))]
+    return {
+        'melody': str(path),
+        'messages': len(expected),
+        'notes': notes,
+        'jitter_std_ms': statistics.pstdev(errors) * 1000,
+        'jitter_p99_ms': p99 * 1000,
+        'jitter_max_ms': absolute[-1] * 1000,
+        'drift_ppm': drift * 1e6,
+        'end_error_ms': errors[-1] * 1000,
+        'chord_spread_mean_ms':
+            statistics.fmean(spreads) * 1000 if spreads else 0,
+        'chord_spread_max_ms': max(spreads) * 1000 if spreads else 0,
+        'cpu_per_note_us': cpu / notes * 1e6 if notes else 0,
+    }
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Spielt Referenzmelodien über einen virtuellen Port und '
+                    'misst die Genauigkeit der Wiedergabe.')
+    parser.add_argument('melodies', nargs='*',
+                        help='Zu spielende MIDI-Dateien (Standard: '
+                             'Referenzmelodien aus ../melodies).')
+    parser.add_argument('-t', '--tempo', type=float, default=1,
+                        help='Tempo, mit dem die Melodien gespielt werden.')
+    parser.add_argument('-r', '--repeat', type=int, default=1,
+                        help='Anzahl der Durchläufe je Melodie.')
+    parser.add_argument('-j', '--json',
+                        help='Ergebnisse zusätzlich als JSON hier ablegen.')
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.melodies] or \
+        [Path('../melodies') / p for p in REFERENCE]
+    port = VirtualPort()
+    carillon = Carillon(port)
+
+    results = list()
+    for path in paths:
+        for _ in range(args.repeat):
+            result = measure(carillon, port, path, args.tempo)
+            results.append(result)
+            print(f"{path.name:<30} Jitter {result['jitter_std_ms']:7.3f} ms "
+                  f"(p99 {result['jitter_p99_ms']:7.3f}, "
+                  f"max {result['jitter_max_ms']:7.3f})  "
+                  f"Drift {result['drift_ppm']:8.1f} ppm  "
+                  f"Chord {result['chord_spread_max_ms']:6.3f} ms  "
+                  f"CPU {result['cpu_per_note_us']:7.1f} µs/note")
+
+    summary = {
+        key: max(r[key] for r in results)
+        for key in ('jitter_std_ms', 'jitter_p99_ms', 'jitter_max_ms',
+                    'chord_spread_max_ms', 'cpu_per_note_us')
+    }
+    summary['drift_ppm'] = max((r['drift_ppm'] for r in results), key=abs)
+    print('Total (worst value): ' + ', '.join(
+        f'{k} {v:.3f}' for k, v in summary.items()))
+
+    if args.json:
+        report = {
+            'environment': environment(),
+            'settings': {'tempo': args.tempo,
+                         'busywait': carillon.settings.busywait},
+            'summary': summary,
+            'results': results,
+        }
+        Path(args.json).write_text(json.dumps(report, indent=2))
@@ -0,0 +1,116 @@
+from argparse import ArgumentParser
+from datetime import date
+import json
+from pathlib import Path
+import sys
+import time
+
+from lib.direktorium.client import DirektoriumClient
+from lib.direktorium.direktorium import Direktorium
+from lib.direktorium.fakeapi import FakeApi
+from lib.settings import Settings
+from lib.timetable import Timetable
+
+
+def years(value: str) -> range:
+    """Liest ein Jahr (`2027`) oder einen Bereich von Jahren (`2027-2029`)."""
+    first, _, last = value.partition('-')
+    return range(int(first), int(last or first) + 1)
+
+
+if __name__ == '__main__':
+    settings = Settings().direktorium
+    parser = ArgumentParser(
+        description='Lädt Kalender der Kalender-API für mehrere Kalender und '
+                    'Jahre parallel in den gemeinsamen Cache, startet einen '
+                    'lokalen Ersatz der API oder gibt den Jahresfahrplan '
+                    'aus.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help='Lokalen Ersatz der API starten.')
+    serve.add_argument('-p', '--port', type=int, default=8080,
+                       help='Port des Servers.')
+    serve.add_argument('--delay', type=float, default=0,
+                       help='Künstliche Antwortzeit je Anfrage in Sekunden.')
+
+    fetch = sub.add_parser('fetch', help='Kalender in den Cache laden.')
+    fetch.add_argument('-k', '--kalender', nargs='+',
+                       default=[settings.kalender],
+                       help='Zu ladende Kalender.')
+    fetch.add_argument('-y', '--years', type=years, nargs='+',
+                       default=[years(str(time.localtime().tm_year))],
+                       help='Jahre oder Bereiche wie 2027-2029.')
+    fetch.add_argument('-c', '--cachedir', default=settings.cachedir,
+                       help='Gemeinsames Cacheverzeichnis.')
+    fetch.add_argument('-w', '--workers', type=int, default=8,
+                       help='Anzahl paralleler Anfragen.')
+    fetch.add_argument('--api', default=settings.api,
+                       help='Adresse der API.')
+    fetch.add_argument('--fake', action='store_true',
+                       help='Gegen einen lokalen Ersatz der API laden.')
+    fetch.add_argument('--delay', type=float, default=0,
+                       help='Künstliche Antwortzeit des lokalen Ersatzes.')
+
+    timetable = sub.add_parser(
+        'timetable', help='Jahresfahrplan aus Theme, Antiphon und '
+                          'Osterstille ausgeben.')
+    timetable.add_argument('-y', '--year', type=int,
+                           default=time.localtime().tm_year,
+                           help='Jahr des Fahrplans.')
+    timetable.add_argument('-d', '--date', type=date.fromisoformat,
+                           help='Nur diesen Tag ausgeben.')
+    timetable.add_argument('--json', action='store_true',
+                           help='Als JSON ausgeben.')
+    args = parser.parse_args()
+
+    if args.command == 'timetable':
+        year = args.date.year if args.date else args.year
+        direktorium = Direktorium(
+            settings.kalender, settings.cachedir, blocking=False,
+            source=settings.source, regional=settings.regional,
+            url=settings.api)
+        table = Timetable.compile(year, direktorium, settings)
+        days = [table.get(args.date)] if args.date else table.days
+        if args.json:
+            print(table.json() if not args.date else
+                  json.dumps(days[0].export(), ensure_ascii=False, indent=2))
+            sys.exit(0)
+        for d in days:
+            antiphon = Path(d.antiphon).stem if d.antiphon else '-'
+            mute = 'muted' if d.eastermute else '-'
+            title = f'{d.title} ({d.rank})' if d.rank else d.title
+            print(f'{d.day.isoformat()}  {d.theme or "-":<16} '
+                  f'{antiphon:<24} {mute:<5} {title}')
+        sys.exit(0)
+
+    if args.command == 'serve':
+        api = FakeApi('127.0.0.1', args.port, args.delay).start()
+        print(f'Fake calendar API at {api.url()}')
+        try:
+            while True: time.sleep(3600)
+        except KeyboardInterrupt:
+            api.stop()
+        sys.exit(0)
+
+    api = FakeApi(delay=args.delay).start() if args.fake else None
+    client = DirektoriumClient(
+        args.cachedir, api.url() if api else args.api, settings.timeout,
+        args.workers)
+    pairs = [(k, y) for k in args.kalender for r in args.years for y in r]
+
+    elapsed = time.perf_counter()
+    results = client.fetch_many(pairs, settings.retries, settings.backoff)
+    elapsed = time.perf_counter() - elapsed
+
+    for (kalender, year), changed in results.items():
+        state = 'failed' if changed is None \
+            else 'fetched' if changed else 'unchanged'
+        print(f'{kalender} {year}: {state}')
+    failed = sum(1 for c in results.values() if c is None)
+    print(f'{len(pairs)} calendar years in {elapsed:.2f} s '
+          f'({failed} failed)', file=sys.stderr)
+    if api is not None:
+        print(f'Fake API: {api.requests} requests, '
+              f'{api.unchanged} unchanged', file=sys.stderr)
+        api.stop()
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,28 @@
+from argparse import ArgumentParser
+from pathlib import Path
+
+from lib.melody import Score
+from lib.melodyfile import MelodyFile
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Kompiliert alle MIDI-Dateien eines Melodiebaums in das '
+                    'vorkompilierte Binärformat.')
+    parser.add_argument('folders', nargs='*', default=['../melodies'],
+                        help='Ordner, die rekursiv durchsucht werden.')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='Auch aktuelle Dateien neu kompilieren.')
+    args = parser.parse_args()
+
+    compiled, skipped = 0, 0
+    for folder in args.folders:
+        for path in sorted(Path(folder).glob('**/*.mid')):
+            if not args.force and MelodyFile.read(path) is not None:
+                skipped += 1
+                continue
+            print(f'Compiling {path}')
+            Score.compile(path)
+            compiled += 1
+
+    print(f'{compiled} files compiled, {skipped} already up to date.')
@@ -5,12 +5,14 @@ from .festiveplayer import FestivePlayer
 from .gpiobell import GpioBell
 from .jukebox import Jukebox
 from .melody import Melody
+from .melodycache import MelodyCache
 from .mqttclient import MqttClient
 from .mqttcontroller import MqttController
 from .nightmuter import Nightmuter
 from .settings import Settings
 from .striker import Striker
+from .theme import Theme
 
 __all__ = ['AngelusPlayer', 'Carillon', 'DirektoriumProxy', 'FestivePlayer',
-           'GpioBell', 'Jukebox', 'Melody', 'MqttClient', 'MqttController',
-           'Nightmuter', 'Settings', 'Striker']
+           'GpioBell', 'Jukebox', 'Melody', 'MelodyCache', 'MqttClient',
+           'MqttController', 'Nightmuter', 'Settings', 'Striker', 'Theme']
@@ -1,3 +1,4 @@
+from datetime import date
 from typing import List, Tuple
 
 from .melody import Melody
@@ -19,7 +20,7 @@ class AngelusPlayer:
 
     Methods
     -------
-    _play_angelus(melody, hours, quarters) : Melody
+    _play_angelus(melody, hours, quarters, day) : Melody
         Internes Callback zur Überprüfung und ggf. Durchführung des Abspielens.
     """
 
@@ -50,7 +51,7 @@ class AngelusPlayer:
         return times
 
     def _play_angelus(
-        self, melody: Melody, hours: int, quarters: int
+        self, melody: Melody, hours: int, quarters: int, day: date
     ) -> Melody:
         """Callback zum ggf. nötigen Abspielen des Angelus."""
         if melody is None: return None
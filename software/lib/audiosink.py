@@ -0,0 +1,151 @@
+from importlib import import_module
+from pathlib import Path
+import shlex
+import subprocess
+import wave
+
+
+class AudioSink:
+    """
+    Basisklasse für Ziele, an die gerenderte Audioblöcke (16 Bit, mono)
+    gestreamt werden.
+
+    Attributes
+    ----------
+    realtime : bool
+        Ob das Ziel die Blöcke selbst im Echtzeittakt abnimmt (etwa eine
+        Soundkarte). Andernfalls muss der Renderer das Tempo vorgeben.
+    samplerate : int
+        Abtastrate der Blöcke.
+
+    Methods
+    -------
+    close()
+        Schließt das Ziel.
+    write(block)
+        Schreibt einen Audioblock.
+
+    Static Methods
+    --------------
+    open(spec, samplerate, blocksize) : AudioSink
+        Öffnet ein Ziel anhand einer Beschreibung aus den Einstellungen.
+    """
+
+    realtime: bool = False
+
+    def __init__(self, samplerate: int):
+        """
+        Bereitet das Ziel vor.
+
+        Parameters
+        ----------
+        samplerate : int
+            Abtastrate der Blöcke.
+        """
+        self.samplerate: int = samplerate
+
+    def close(self) -> None:
+        """Schließt das Ziel."""
+
+    def write(self, block: bytes) -> None:
+        """
+        Schreibt einen Audioblock.
+
+        Parameters
+        ----------
+        block : bytes
+            PCM-Daten (16 Bit, Little Endian, mono).
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def open(spec: str, samplerate: int, blocksize: int) -> 'AudioSink':
+        """
+        Öffnet ein Ziel anhand einer Beschreibung, wie sie in den Einstellungen
+        steht:
+
+        * `device`: Standard-Soundkarte (benötigt `sounddevice`).
+        * `wav:<pfad>`: WAV-Datei.
+        * `pipe:<befehl>`: Rohe PCM-Daten an die Standardeingabe eines Befehls,
+          etwa `pipe:aplay -q -t raw -f S16_LE -r 44100 -c 1`.
+
+        Parameters
+        ----------
+        spec : str
+            Beschreibung des Ziels.
+        samplerate : int
+            Abtastrate der Blöcke.
+        blocksize : int
+            Anzahl der Samples je Block.
+        """
+        kind, _, target = spec.partition(':')
+        if kind == 'device': return DeviceSink(samplerate, blocksize)
+        if kind == 'wav': return WavSink(samplerate, target)
+        if kind == 'pipe': return PipeSink(samplerate, target)
+        raise ValueError(f'Unbekanntes Audioziel: {spec}')
+
+
+class DeviceSink(AudioSink):
+    """Gibt die Audioblöcke direkt über die Soundkarte aus."""
+
+    realtime: bool = True
+
+    def __init__(self, samplerate: int, blocksize: int):
+        """Öffnet die Standard-Soundkarte über `sounddevice`."""
+        super().__init__(samplerate)
+        sounddevice = import_module('sounddevice')
+        self.stream = sounddevice.RawOutputStream(
+            samplerate=samplerate, blocksize=blocksize, channels=1,
+            dtype='int16')
+        self.stream.start()
+
+    def close(self) -> None:
+        """Schließt den Audiostream."""
+        self.stream.stop()
+        self.stream.close()
+
+    def write(self, block: bytes) -> None:
+        """Schreibt einen Block und blockiert, bis die Soundkarte ihn nimmt."""
+        self.stream.write(block)
+
+
+class PipeSink(AudioSink):
+    """Schreibt rohe PCM-Daten in die Standardeingabe eines Befehls."""
+
+    realtime: bool = True
+
+    def __init__(self, samplerate: int, command: str):
+        """Startet den Befehl, der die Daten entgegennimmt."""
+        super().__init__(samplerate)
+        self.process = subprocess.Popen(
+            shlex.split(command), stdin=subprocess.PIPE)
+
+    def close(self) -> None:
+        """Schließt die Pipe und wartet auf das Ende des Befehls."""
+        self.process.stdin.close()
+        self.process.wait()
+
+    def write(self, block: bytes) -> None:
+        """Schreibt einen Block in die Pipe."""
+        self.process.stdin.write(block)
+        self.process.stdin.flush()
+
+
+class WavSink(AudioSink):
+    """Schreibt die Audioblöcke in eine WAV-Datei."""
+
+    def __init__(self, samplerate: int, path: str):
+        """Legt die WAV-Datei an."""
+        super().__init__(samplerate)
+        self.file = wave.open(str(Path(path)), 'wb')
+        self.file.setnchannels(1)
+        self.file.setsampwidth(2)
+        self.file.setframerate(samplerate)
+
+    def close(self) -> None:
+        """Schließt die WAV-Datei."""
+        self.file.close()
+
+    def write(self, block: bytes) -> None:
+        """Hängt einen Block an die WAV-Datei an."""
+        self.file.writeframes(block)
@@ -1,53 +1,162 @@
+from array import array
+from concurrent.futures import Future
+import heapq
+from importlib import import_module
+import itertools
+import math
 import mido
-from mido.backends.rtmidi import Output
 import time
-from threading import Thread
+from threading import Condition, Event, Thread
+from typing import Any, Dict, List, NamedTuple, Tuple
 
+from .fanout import FanOut
 from .melody import Melody
+from .settings import CarillonSettings, Settings
+from .virtualport import VirtualPort
+from .wireport import WirePort
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from mido.backends.rtmidi import Output
+
+
+class Request(NamedTuple):
+    """
+    Eintrag in der Warteschlange des Carillons.
+
+    Attributes
+    ----------
+    melody : Melody
+        Die abzuspielende Melodie.
+    priority : int
+        Priorität der Melodie.
+    enqueued : float
+        Zeitpunkt (`time.monotonic`), zu dem die Melodie angefragt wurde.
+    deadline : float
+        Zeitpunkt (`time.monotonic`), nach dem die Melodie verworfen wird,
+        falls sie bis dahin nicht begonnen hat.
+    audio : Any
+        Vorab gerenderte Fassung der Melodie, die der Port stattdessen
+        abspielen kann, oder `None`.
+    start : float
+        Zeitpunkt (`time.perf_counter`), zu dem der erste Ton erklingen soll,
+        oder `None` für sofort.
+    started : Future
+        Wird mit der Verspätung des ersten Tons in Sekunden erfüllt bzw. mit
+        `None`, falls die Melodie nie begonnen hat. Optional.
+    """
+    melody: Melody
+    priority: int
+    enqueued: float
+    deadline: float
+    audio: Any = None
+    start: float = None
+    started: Future = None
 
 
 class Carillon:
     """
     Klasse, die die Kommunikation zu GrandOrgue über MIDI-Messages abstrahiert
-    zur Verfügung stellt.
+    zur Verfügung stellt. Ein einziger, dauerhaft laufender Thread spielt die
+    Melodien nacheinander aus einer Prioritätswarteschlange ab.
 
     Attributes
     ----------
+    current : Request
+        Die gerade gespielte Anfrage bzw. `None`, wenn nichts spielt.
+    lateness : array
+        Verspätung jedes Anschlags (Gruppe gleichzeitiger Nachrichten) der
+        aktuellen bzw. zuletzt gespielten Melodie gegenüber seinem
+        Sollzeitpunkt in Sekunden. Daran lässt sich die Genauigkeit der
+        Wiedergabe ablesen.
+    output : WirePort
+        Adapter, über den vorkodierte Nachrichten an den Port gehen.
     port : Output
         MIDI-Port, an den die Nachrichten gesendet werden.
     priority : int
-        Priorität der zuletzt gespielten Melodie. Sofern eine neue Melodie mit
-        geringerer Priorität abgespielt werden soll, wird abgewiesen.
+        Priorität der zuletzt gespielten Melodie.
+    settings : CarillonSettings
+        Einstellungsobjekt mit Anpassungen für die Wiedergabe.
+    stopped : Event
+        Wird gesetzt, wenn die aktuelle Melodie abgebrochen werden soll, und
+        weckt den Wiedergabethread dabei sofort auf.
     thread : Thread
-        Thread, der asynchron die Melodie abspielt.
+        Dauerhaft laufender Thread, der die Melodien abspielt.
     volume : float
         Lautstärke des Carillons zwischen 0 und 1.
+    _condition : Condition
+        Sichert Warteschlange und Zustand zwischen den Threads ab.
+    _counter : itertools.count
+        Laufende Nummer, die gleiche Prioritäten in Eingangsreihenfolge hält.
+    _queue : List[Tuple[int, int, Request]]
+        Heap der wartenden Anfragen.
+    _silenced : List[Future]
+        Futures, die erfüllt werden, sobald das Carillon verstummt ist.
+    _stop_time : float
+        Zeitpunkt (`time.perf_counter`) der ältesten unerledigten
+        Stopp-Anfrage.
+    _stats : Dict[str, float]
+        Interne Zähler für die Warteschlangenstatistik.
 
     Methods
     -------
-    play(melody, priority) : bool
-        Spielt eine Melodie auf dem Carillon.
-    stop()
-        Bricht das Spielen der aktuellen Melodie ab.
-    _threaded_play(melody)
-        Eigentliche Abspielmethode, die zum Threaden genutzt wird.
+    play(melody, priority, preempt, timeout, audio, start, started) : bool
+        Spielt eine Melodie auf dem Carillon oder reiht sie ein und gibt
+        zurück, ob sie sofort an der Reihe ist.
+    stats() : Dict[str, Any]
+        Gibt Statistiken über die Warteschlange zurück.
+    stop() : Future
+        Bricht das Spielen der aktuellen Melodie ab und leert die
+        Warteschlange, ohne darauf zu warten.
+    _next() : Request
+        Wartet auf die nächste abzuspielende Anfrage.
+    _threaded_play(melody, audio, start, started)
+        Eigentliche Abspielmethode, die vom Wiedergabethread genutzt wird.
+    _wait(deadline) : bool
+        Wartet bis zu einem absoluten Zeitpunkt oder einem Abbruch.
+    _work()
+        Schleife des Wiedergabethreads.
     """
-    def __init__(self, port: Output = None):
+    def __init__(self, port: 'Output' = None):
         """
-        Erzeugt das Carillon und belegt es mit einem MIDI-Port vor.
+        Erzeugt das Carillon, belegt es mit einem MIDI-Port vor und startet
+        den Wiedergabethread.
 
         Parameters
         ----------
         port : mido.backends.rtmidi.Output (optional)
             MIDI-Port, der genutzt werden soll. Sofern keiner übergeben wird,
-            wird ein Standardport geöffnet.
+            werden je nach Einstellung die unter `ports` angegebenen Ports,
+            ein Standardport oder der eingebaute Renderer geöffnet.
         """
+        self.settings: CarillonSettings = Settings().carillon
+        if port is None and self.settings.ports:
+            port = FanOut.open(self.settings)
+        elif port is None and self.settings.backend == 'virtual':
+            port = VirtualPort()
+        elif port is None and self.settings.backend == 'renderer':
+            # NumPy wird nur geladen, wenn der Renderer auch genutzt wird
+            renderer = import_module('.renderer', __package__)
+            port = renderer.Renderer.open(self.settings)
         self.port = mido.open_output() if port is None else port
+        self.output: WirePort = WirePort(self.port)
+        self.lateness: array = array('d')
         self.priority: int = 0
-        self.thread: Thread = None
-        self.stopped: bool = False
+        self.current: Request = None
+        self.stopped: Event = Event()
         self.volume = 1
 
+        self._condition: Condition = Condition()
+        self._counter: itertools.count = itertools.count()
+        self._queue: List[Tuple[int, int, Request]] = list()
+        self._silenced: List[Future] = list()
+        self._stop_time: float = None
+        self._stats: Dict[str, float] = dict(
+            played=0, dropped=0, max_depth=0, wait_sum=0, wait_max=0,
+            stops=0, stop_latency_last=0, stop_latency_max=0)
+        self.thread: Thread = Thread(target=self._work, daemon=True)
+        self.thread.start()
+
     @property
     def volume(self) -> float:
         """Die aktuell eingestellte Lautstärke des Carillons."""
@@ -71,14 +180,18 @@ class Carillon:
         # Mappen auf MIDI-Value zwischen 0 und 127
         val = int(self._volume * 127)
 
-        msg = mido.Message('control_change', control=7, value=val)
-        self.port.send(msg)
+        self.output.send(bytes((0xB0, 7, val)))
 
-    def play(self, melody: Melody, priority: int = 0) -> bool:
+    def play(
+        self, melody: Melody, priority: int = 0, preempt: bool = True,
+        timeout: float = None, audio: Any = None, start: float = None,
+        started: Future = None
+    ) -> bool:
         """
         Spielt eine übergebene Melodie auf dem Carillon. Spielt bereits eine
-        Melodie, wird erst überprüft, ob deren Priorität höher ist. In dem
-        Falle wird abgewiesen.
+        Melodie mit mindestens gleicher Priorität (oder ist `preempt` nicht
+        gesetzt), wird die neue Melodie in die Warteschlange eingereiht und
+        nach Priorität abgespielt, sobald das Carillon frei wird.
 
         Parameters
         ----------
@@ -89,38 +202,238 @@ class Carillon:
             Priorität mindestens genauso hoch ist wie die der gerade
             abgespielten Melodie wird diese abgebrochen und jene angefangen. Im
             Normalfall 0.
+        preempt : bool (optional)
+            Ob eine laufende Melodie geringerer Priorität abgebrochen werden
+            darf. Andernfalls wird gewartet, bis sie zu Ende gespielt ist.
+        timeout : float (optional)
+            Anzahl an Sekunden, die die Melodie höchstens warten darf, bevor
+            sie verworfen wird. Standardmäßig gilt `queuetimeout` aus den
+            Einstellungen. Bei 0 wird eine Melodie, die nicht sofort beginnen
+            kann, gar nicht erst eingereiht, sondern abgelehnt.
+        audio : Any (optional)
+            Vorab gerenderte Fassung der Melodie. Unterstützt der Port das
+            Abspielen solcher Puffer (wie der eingebaute Renderer), wird
+            statt der einzelnen Nachrichten nur dieser Puffer abgespielt.
+        start : float (optional)
+            Zeitpunkt (`time.perf_counter`), zu dem der erste Ton erklingen
+            soll. Die Melodie sollte kurz vorher übergeben werden; bis dahin
+            belegt sie das Carillon bereits.
+        started : Future (optional)
+            Wird mit der Verspätung des ersten Tons gegenüber dem Sollzeitpunkt
+            in Sekunden erfüllt, sobald dieser gesendet ist, bzw. mit `None`,
+            falls die Melodie nie begonnen hat.
 
         Returns
         -------
-        Wenn die Melodie gespielt wird `True`, ansonsten `False`. Dann spielte
-        bereits eine Melodie mit höherer Priorität.
-        """
-        if self.thread and self.thread.is_alive():
-            if self.priority > priority: return False
-            self.stop()
-        self.priority = priority
-        self.thread = Thread(target=self._threaded_play, args=([melody]))
-        self.thread.start()
-        return True
+        `True`, falls die Melodie als nächste an der Reihe ist und sofort
+        bzw. zu `start` beginnt; `False`, falls sie hinter einer anderen
+        Melodie wartet und nach Ablauf von `timeout` noch verworfen werden
+        kann oder ohne Wartezeit abgelehnt wurde.
+        """
+        if timeout is None: timeout = self.settings.queuetimeout
+        if audio is None and hasattr(self.port, 'prepare'):
+            self.port.prepare(melody)
+        now = time.monotonic()
+
+        with self._condition:
+            preempts = self.current is not None and preempt \
+                and self.priority <= priority
+            first = not self._queue or -priority < self._queue[0][0]
+            starts = first and (self.current is None or preempts)
+            if timeout == 0 and not starts:
+                self._stats['dropped'] += 1
+                if started is not None: started.set_result(None)
+                return False
+
+            deadline = now + timeout if timeout != 0 else math.inf
+            request = Request(melody, priority, now, deadline, audio, start,
+                              started)
+            heapq.heappush(
+                self._queue, (-priority, next(self._counter), request))
+            depth = len(self._queue)
+            self._stats['max_depth'] = max(self._stats['max_depth'], depth)
+            if preempts: self.stopped.set()
+            self._condition.notify_all()
+            return starts
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Gibt Statistiken über die Warteschlange zurück: aktuelle und maximale
+        Tiefe, Anzahl gespielter und verworfener Melodien, mittlere und
+        maximale Wartezeit sowie die Latenz vom Stoppen bis zur Stille in
+        Sekunden. Beim eingebauten Renderer kommen Belegung und Trefferquote
+        der Samples hinzu, bei mehreren Ports die Sendestatistik je Port.
+        """
+        with self._condition:
+            played = self._stats['played']
+            return {
+                'depth': len(self._queue),
+                'max_depth': self._stats['max_depth'],
+                'played': played,
+                'dropped': self._stats['dropped'],
+                'wait_mean': self._stats['wait_sum'] / played if played else 0,
+                'wait_max': self._stats['wait_max'],
+                'stops': self._stats['stops'],
+                'stop_latency_last': self._stats['stop_latency_last'],
+                'stop_latency_max': self._stats['stop_latency_max'],
+                **({'samples': self.port.bank.stats()}
+                   if hasattr(self.port, 'bank') else {}),
+                **({'ports': self.port.stats()}
+                   if hasattr(self.port, 'stats') else {}),
+            }
+
+    def stop(self) -> Future:
+        """
+        Bricht die aktuell gespielte Melodie ab und verwirft alle wartenden
+        Melodien. Die Methode kehrt sofort zurück, der Wiedergabethread wird
+        dabei auch aus längeren Pausen heraus geweckt.
+
+        Returns
+        -------
+        Future, das erfüllt wird, sobald das Carillon verstummt ist. Als
+        Ergebnis liefert es die Latenz vom Stoppen bis zur Stille in Sekunden.
+        In asyncio lässt es sich über `asyncio.wrap_future` abwarten.
+        """
+        future = Future()
+        with self._condition:
+            for _, _, request in self._queue:
+                if request.started is not None:
+                    request.started.set_result(None)
+            self._queue.clear()
+            if self.current is None:
+                future.set_result(0)
+                return future
+            if self._stop_time is None: self._stop_time = time.perf_counter()
+            self._silenced.append(future)
+            self.stopped.set()
+            self._condition.notify_all()
+        return future
 
-    def stop(self) -> None:
-        """Bricht die aktuell gespielte Melodie ab."""
-        self.stopped = True
-        self.thread.join()
-        self.stopped = False
-        self.port.reset()
+    def _next(self) -> Request:
+        """
+        Interne Methode, die auf die nächste abzuspielende Anfrage wartet.
+        Anfragen, deren Frist abgelaufen ist, werden dabei verworfen. Muss mit
+        gehaltener Sperre aufgerufen werden.
+        """
+        while True:
+            while not self._queue: self._condition.wait()
+            request = heapq.heappop(self._queue)[2]
+            now = time.monotonic()
+            if now > request.deadline:
+                self._stats['dropped'] += 1
+                if request.started is not None:
+                    request.started.set_result(None)
+                continue
+            wait = now - request.enqueued
+            self._stats['played'] += 1
+            self._stats['wait_sum'] += wait
+            self._stats['wait_max'] = max(self._stats['wait_max'], wait)
+            return request
 
-    def _threaded_play(self, melody: Melody) -> None:
+    def _work(self) -> None:
+        """
+        Interne Schleife des Wiedergabethreads, die die Warteschlange
+        abarbeitet.
         """
-        Interne Methode zum Abspielen der Melodie innerhalb eines Threads.
+        while True:
+            with self._condition:
+                request = self._next()
+                self.current = request
+                self.priority = request.priority
+                self.stopped.clear()
+
+            self._threaded_play(request.melody, request.audio, request.start,
+                                request.started)
+            if self.stopped.is_set(): self.output.reset()
+            if request.started is not None and not request.started.done():
+                request.started.set_result(None)
+
+            with self._condition:
+                if self._stop_time is not None:
+                    latency = time.perf_counter() - self._stop_time
+                    self._stats['stops'] += 1
+                    self._stats['stop_latency_last'] = latency
+                    self._stats['stop_latency_max'] = max(
+                        self._stats['stop_latency_max'], latency)
+                    for future in self._silenced: future.set_result(latency)
+                    self._silenced.clear()
+                    self._stop_time = None
+                self.stopped.clear()
+                self.current = None
+                self._condition.notify_all()
+
+    def _threaded_play(
+        self, melody: Melody, audio: Any = None, start: float = None,
+        started: Future = None
+    ) -> None:
+        """
+        Interne Methode zum Abspielen der Melodie im Wiedergabethread. Alle
+        Nachrichten werden gegen absolute Sollzeitpunkte ab Melodiebeginn auf
+        einer monotonen Uhr abgespielt, sodass sich Ungenauigkeiten beim
+        Schlafen und Senden nicht über die Melodie aufsummieren. Gesendet
+        werden die vorkodierten Bytes der Partituren, gleichzeitige Töne dabei
+        als eine Gruppe. Die Lautstärke-Controller der Melodie werden mit der
+        Lautstärke des Carillons skaliert.
+
+        Liegt eine vorab gerenderte Fassung vor und kann der Port sie
+        abspielen, wird nur diese übergeben und die Dauer der Melodie
+        abgewartet.
 
         Parameters
         ----------
         melody : Melody
             Abzuspielende Melodie.
+        audio : Any (optional)
+            Vorab gerenderte Fassung der Melodie.
+        start : float (optional)
+            Zeitpunkt (`time.perf_counter`), zu dem die Melodie beginnen soll.
+            Standardmäßig sofort.
+        started : Future (optional)
+            Wird direkt nach dem ersten Anschlag mit dessen Verspätung
+            erfüllt.
+        """
+        self.lateness = lateness = array('d')
+        if start is None: start = time.perf_counter()
+        if audio is not None and hasattr(self.port, 'play'):
+            if not self._wait(start): return
+            lateness.append(time.perf_counter() - start)
+            self.port.play(audio)
+            if started is not None: started.set_result(lateness[0])
+            self._wait(start + melody.duration)
+            return
+
+        send, volume = self.output.send, self.volume
+        for offset, score, transpose, tempo in melody.segments():
+            times, groups = score.wire(transpose, volume)
+            offset += start
+            for t, data in zip(times, groups):
+                deadline = offset + t / tempo
+                if not self._wait(deadline): return
+                lateness.append(time.perf_counter() - deadline)
+                send(data)
+                if started is not None and len(lateness) == 1:
+                    started.set_result(lateness[0])
+
+    def _wait(self, deadline: float) -> bool:
+        """
+        Interne Methode, die bis zum übergebenen Zeitpunkt (bezogen auf
+        `time.perf_counter`) wartet. Die letzten `busywait` Sekunden wird dabei
+        aktiv gewartet, um das Überschießen des Schlafens zu vermeiden. Ein
+        Abbruch über `stopped` beendet das Warten sofort.
+
+        Parameters
+        ----------
+        deadline : float
+            Zeitpunkt, bis zu dem gewartet werden soll.
+
+        Returns
+        -------
+        `False`, wenn die Wiedergabe abgebrochen wurde, sonst `True`.
         """
-        for msg in melody.messages:
-            if self.stopped: return
-            time.sleep(msg.time)
-            if self.stopped: return
-            if not msg.is_meta: self.port.send(msg)
+        busywait = self.settings.busywait
+        remaining = deadline - time.perf_counter() - busywait
+        if remaining > 0 and self.stopped.wait(remaining): return False
+        if busywait > 0:
+            while time.perf_counter() < deadline:
+                if self.stopped.is_set(): return False
+        return not self.stopped.is_set()
@@ -0,0 +1,69 @@
+from datetime import date, datetime
+import time
+
+
+class Clock:
+    """
+    Uhr, über die alle zeitgesteuerten Teile die aktuelle Zeit beziehen. Die
+    Grundklasse liest die Uhren des Systems; eine `VirtualClock` lässt sich an
+    ihrer Stelle in die Zeitsteuerung einsetzen.
+
+    Methods
+    -------
+    now() : datetime
+        Aktuelle Ortszeit.
+    perf_counter() : float
+        Monotone Uhr in Sekunden, auf die sich das Carillon bezieht.
+    time() : float
+        Aktuelle Wanduhrzeit als Unix-Zeitstempel.
+    today() : date
+        Heutiges Datum in Ortszeit.
+    """
+
+    def now(self) -> datetime:
+        """Aktuelle Ortszeit."""
+        return datetime.fromtimestamp(self.time())
+
+    def perf_counter(self) -> float:
+        """Monotone Uhr in Sekunden, auf die sich das Carillon bezieht."""
+        return time.perf_counter()
+
+    def time(self) -> float:
+        """Aktuelle Wanduhrzeit als Unix-Zeitstempel."""
+        return time.time()
+
+    def today(self) -> date:
+        """Heutiges Datum in Ortszeit."""
+        return self.now().date()
+
+
+class VirtualClock(Clock):
+    """
+    Virtuelle Uhr, die nur vorrückt, wenn die Zeitsteuerung es verlangt.
+    Wanduhr und monotone Uhr fallen dabei zusammen. Damit lässt sich das
+    Schlagwerk samt Observern im Zeitraffer durchspielen.
+
+    Attributes
+    ----------
+    current : float
+        Aktuelle virtuelle Zeit als Unix-Zeitstempel.
+    """
+
+    def __init__(self, start: float):
+        """
+        Erstellt die Uhr.
+
+        Parameters
+        ----------
+        start : float
+            Startzeitpunkt als Unix-Zeitstempel.
+        """
+        self.current: float = start
+
+    def perf_counter(self) -> float:
+        """Monotone Uhr, die hier mit der virtuellen Wanduhr übereinstimmt."""
+        return self.current
+
+    def time(self) -> float:
+        """Aktuelle virtuelle Zeit als Unix-Zeitstempel."""
+        return self.current
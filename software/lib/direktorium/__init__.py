@@ -1,15 +1,17 @@
 """
 Das Direktorium hält eine aktuelle Liste über tagesaktuelle Feste bereit. Es
 fragt dazu die API https://www.eucharistiefeier.de/lk/ ab und cached Ergebnisse
-optional.
+optional. Ohne Netz wird der Kalender lokal berechnet.
 """
 
+from .calendarstore import CalendarStore
 from .color import Color
 from .direktorium import Direktorium
 from .event import Event
+from .localcalendar import LocalCalendar
 from .rank import Rank
 from .season import Season
 from .todaydirektorium import TodayDirektorium
 
-__all__ = ['Color', 'Direktorium', 'Rank', 'Event', 'Season',
-           'TodayDirektorium', ]
+__all__ = ['CalendarStore', 'Color', 'Direktorium', 'Rank', 'Event',
+           'LocalCalendar', 'Season', 'TodayDirektorium', ]
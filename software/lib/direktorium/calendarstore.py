@@ -0,0 +1,230 @@
+from datetime import date
+import json
+import sqlite3
+from threading import Lock
+from typing import Dict, List
+
+from .event import Event
+from .rank import Rank
+
+
+class CalendarStore:
+    """
+    Dauerhafter, nach Datum und Rang indizierter Speicher der Zelebrationen
+    eines Kalenders. Jedes Jahr wird einmalig aus dem API-Format übernommen;
+    Abfragen nach einem Tag, einem Zeitraum oder einem Rang laufen danach über
+    die Indizes der SQLite-Datenbank, ohne das ganze Jahr zu laden. Bereits
+    interpretierte Events werden im Speicher vorgehalten. Die übrigen Angaben
+    der Antwort eines Jahres werden unverändert daneben abgelegt.
+
+    Attributes
+    ----------
+    path : str
+        Pfad der Datenbankdatei.
+    _db : sqlite3.Connection
+        Verbindung zur Datenbank.
+    _events : Dict[int, Event]
+        Bereits interpretierte Events je Zeilennummer.
+    _lock : Lock
+        Sichert die Verbindung zwischen Threads ab.
+    _revisions : Dict[int, int]
+        Anzahl der Übernahmen je Jahr seit dem Öffnen.
+    _years : set
+        Bereits vollständig übernommene Jahre.
+
+    Methods
+    -------
+    close()
+        Schließt die Datenbank.
+    get(d) : List[Event]
+        Gibt die Events eines Tages zurück.
+    has(year) : bool
+        Ob ein Jahr bereits übernommen wurde.
+    insert(year, data)
+        Übernimmt ein Jahr im API-Format.
+    meta(year) : dict
+        Gibt die übrigen Angaben eines Jahres im API-Format zurück.
+    range(start, end) : List[Event]
+        Gibt die Events eines Zeitraums zurück.
+    rank(year, rank) : List[Event]
+        Gibt alle Events eines Jahres mit einem Rang zurück.
+    raw(d) : Dict[str, dict]
+        Gibt die Zelebrationen eines Tages im API-Format zurück.
+    revision(year) : int
+        Gibt den Stand eines Jahres zurück.
+    _select(where, params) : List[Event]
+        Interne Abfrage, die Events interpretiert und vorhält.
+    """
+
+    def __init__(self, path: str):
+        """
+        Öffnet die Datenbank und legt sie ggf. an.
+
+        Parameters
+        ----------
+        path : str
+            Pfad der Datenbankdatei.
+        """
+        self.path: str = path
+        self._db: sqlite3.Connection = sqlite3.connect(
+            path, check_same_thread=False)
+        self._events: Dict[int, Event] = dict()
+        self._lock: Lock = Lock()
+        self._revisions: Dict[int, int] = dict()
+        with self._lock, self._db:
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS years (year INTEGER PRIMARY KEY);
+                CREATE TABLE IF NOT EXISTS meta (
+                    year INTEGER PRIMARY KEY,
+                    data TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY,
+                    year INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    importance INTEGER NOT NULL,
+                    rank INTEGER NOT NULL,
+                    key TEXT NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS events_day
+                    ON events (day, importance);
+                CREATE INDEX IF NOT EXISTS events_rank
+                    ON events (year, rank, day);
+            """)
+            self._years: set = {
+                y for y, in self._db.execute('SELECT year FROM years')}
+
+    def close(self) -> None:
+        """Schließt die Datenbank."""
+        with self._lock: self._db.close()
+
+    def get(self, d: date) -> List[Event]:
+        """
+        Gibt die Events eines Tages nach Wichtigkeit sortiert zurück.
+
+        Parameters
+        ----------
+        d : date
+            Abzufragender Tag.
+        """
+        return self._select('day = ?', (d.isoformat(),))
+
+    def has(self, year: int) -> bool:
+        """Ob ein Jahr bereits vollständig übernommen wurde."""
+        return year in self._years
+
+    def insert(self, year: int, data: dict) -> None:
+        """
+        Übernimmt ein Jahr im API-Format und ersetzt dabei einen älteren Stand
+        desselben Jahres. Das geschieht in einer Transaktion, sodass
+        Abfragen nie ein halbes Jahr sehen.
+
+        Parameters
+        ----------
+        year : int
+            Zu übernehmendes Jahr.
+        data : dict
+            Antwort der API für das ganze Jahr.
+        """
+        rows = [(year, e['Datum'], e['Grad'], int(Rank.parse(e['Rang']) or 0),
+                 k, json.dumps(e, ensure_ascii=False))
+                for k, e in data['Zelebrationen'].items()]
+        meta = {k: v for k, v in data.items() if k != 'Zelebrationen'}
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM events WHERE year = ?', (year,))
+            self._db.executemany(
+                'INSERT INTO events (year, day, importance, rank, key, data) '
+                'VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self._db.execute(
+                'INSERT OR REPLACE INTO meta (year, data) VALUES (?, ?)',
+                (year, json.dumps(meta, ensure_ascii=False)))
+            self._db.execute(
+                'INSERT OR IGNORE INTO years (year) VALUES (?)', (year,))
+            self._events.clear()
+            self._revisions[year] = self._revisions.get(year, 0) + 1
+            self._years.add(year)
+
+    def meta(self, year: int) -> dict:
+        """
+        Gibt die Angaben der Antwort eines Jahres außer den Zelebrationen
+        zurück, etwa Kalenderbezeichnung und Kopfdaten der API.
+
+        Parameters
+        ----------
+        year : int
+            Abzufragendes Jahr.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT data FROM meta WHERE year = ?', (year,)).fetchone()
+        return json.loads(row[0]) if row is not None else dict()
+
+    def range(self, start: date, end: date) -> List[Event]:
+        """
+        Gibt die Events eines Zeitraums nach Datum und Wichtigkeit sortiert
+        zurück.
+
+        Parameters
+        ----------
+        start : date
+            Erster Tag des Zeitraums.
+        end : date
+            Letzter Tag des Zeitraums (einschließlich).
+        """
+        return self._select('day BETWEEN ? AND ?',
+                            (start.isoformat(), end.isoformat()))
+
+    def rank(self, year: int, rank: Rank) -> List[Event]:
+        """
+        Gibt alle Events eines Jahres mit einem Rang nach Datum sortiert
+        zurück, etwa alle Hochfeste.
+
+        Parameters
+        ----------
+        year : int
+            Abzufragendes Jahr.
+        rank : Rank
+            Gesuchter Rang.
+        """
+        return self._select('year = ? AND rank = ?', (year, int(rank)))
+
+    def raw(self, d: date) -> Dict[str, dict]:
+        """
+        Gibt die Zelebrationen eines Tages im Format der API zurück.
+
+        Parameters
+        ----------
+        d : date
+            Abzufragender Tag.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT key, data FROM events WHERE day = ? '
+                'ORDER BY importance', (d.isoformat(),)).fetchall()
+        return {k: json.loads(data) for k, data in rows}
+
+    def revision(self, year: int) -> int:
+        """
+        Gibt den Stand eines Jahres zurück, der mit jeder Übernahme wächst.
+        So lässt sich daraus Abgeleitetes nur bei geänderten Daten neu
+        berechnen.
+        """
+        return self._revisions.get(year, 0)
+
+    def _select(self, where: str, params: tuple) -> List[Event]:
+        """
+        Interne Abfrage, die Events nach Datum und Wichtigkeit sortiert
+        zurückgibt. Jede Zeile wird nur einmal interpretiert.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT id, data FROM events WHERE {where} '
+                'ORDER BY day, importance', params).fetchall()
+            events = list()
+            for id, data in rows:
+                event = self._events.get(id)
+                if event is None:
+                    event = self._events[id] = Event.parse(json.loads(data))
+                events.append(event)
+        return events
@@ -0,0 +1,270 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import json
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from threading import get_ident
+import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+
+class DirektoriumClient:
+    """
+    Client der Kalender-API für beliebig viele Kalender und Jahre. Alle
+    Anfragen laufen über eine gemeinsame Session mit einem Pool wieder
+    verwendeter Verbindungen, mehrere Jahre und Kalender werden parallel
+    geladen. Liegt ein Jahr bereits im Cache, wird über `ETag` bzw.
+    `Last-Modified` nur nachgefragt, ob es sich geändert hat. Der Cache lässt
+    sich von mehreren Prozessen gemeinsam nutzen: Jede Datei wird unter einer
+    Dateisperre geladen und atomar ersetzt.
+
+    Attributes
+    ----------
+    URL : str
+        Adresse der öffentlichen API.
+    cache_dir : str
+        Verzeichnis, in dem je Kalender die Jahre abgelegt werden, oder
+        `None`.
+    session : requests.Session
+        Gemeinsame Session mit Verbindungspool.
+    timeout : float
+        Zeitlimit für Anfragen in Sekunden.
+    url : str
+        Adresse der API.
+    workers : int
+        Anzahl paralleler Anfragen und Größe des Verbindungspools.
+
+    Methods
+    -------
+    fetch(kalender, year, retries, backoff, maxage) : Tuple[dict, bool]
+        Lädt ein Jahr eines Kalenders.
+    fetch_many(pairs, retries, backoff, maxage) : Dict
+        Lädt viele Jahre und Kalender parallel.
+    file(kalender, year) : str
+        Pfad der Cachedatei eines Jahres.
+    request(kalender, year, month, day, headers) : requests.Response
+        Fragt die API direkt ab.
+    _fetch(kalender, year, maxage) : Tuple[dict, bool]
+        Lädt ein Jahr in einem Versuch.
+
+    Static Methods
+    --------------
+    _locked(path) : Iterator[None]
+        Hält eine Dateisperre zwischen Prozessen.
+    _parse(content) : dict
+        Prüft und liest eine Antwort der API.
+    _write(path, content)
+        Schreibt eine Datei atomar.
+    """
+
+    URL: str = 'http://www.eucharistiefeier.de/lk/api.php'
+
+    def __init__(
+        self, cache_dir: str = None, url: str = URL, timeout: float = 10,
+        workers: int = 4
+    ):
+        """
+        Erstellt den Client samt Verbindungspool.
+
+        Parameters
+        ----------
+        cache_dir : str (optional)
+            Verzeichnis für den Cache, ohne wird nichts abgelegt.
+        url : str (optional)
+            Adresse der API, etwa die eines lokalen Ersatzservers.
+        timeout : float (optional)
+            Zeitlimit für Anfragen in Sekunden.
+        workers : int (optional)
+            Anzahl paralleler Anfragen.
+        """
+        self.cache_dir: str = cache_dir
+        self.url: str = url
+        self.timeout: float = timeout
+        self.workers: int = workers
+        self.session: requests.Session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(
+        self, kalender: str, year: int, retries: int = 0, backoff: float = 1,
+        maxage: float = None
+    ) -> Tuple[dict, bool]:
+        """
+        Lädt ein Jahr eines Kalenders und legt es ggf. im Cache ab.
+
+        Parameters
+        ----------
+        kalender : str
+            Kalenderbezeichnung der API.
+        year : int
+            Zu ladendes Jahr.
+        retries : int (optional)
+            Anzahl weiterer Versuche nach einem Fehlschlag.
+        backoff : float (optional)
+            Wartezeit vor dem ersten weiteren Versuch in Sekunden; sie
+            verdoppelt sich mit jedem Versuch.
+        maxage : float (optional)
+            Ist die Cachedatei jünger als so viele Sekunden (etwa weil ein
+            anderer Prozess sie gerade geladen hat), wird nicht angefragt.
+
+        Returns
+        -------
+        Die Daten im API-Format und ob sie sich gegenüber dem Cache geändert
+        haben.
+
+        Raises
+        ------
+        requests.RequestException
+            Falls die API auch im letzten Versuch nicht oder mit einem Fehler
+            antwortet.
+        ValueError
+            Falls die Antwort keine gültigen Zelebrationen enthält.
+        """
+        for attempt in range(retries + 1):
+            try:
+                return self._fetch(kalender, year, maxage)
+            except (requests.RequestException, ValueError) as e:
+                print(f'Direktorium {kalender}/{year} not fetched: {e!r}')
+                if attempt == retries: raise
+                time.sleep(backoff * 2 ** attempt)
+
+    def fetch_many(
+        self, pairs: Iterable[Tuple[str, int]], retries: int = 0,
+        backoff: float = 1, maxage: float = None
+    ) -> Dict[Tuple[str, int], Optional[bool]]:
+        """
+        Lädt viele Jahre und Kalender parallel über den Verbindungspool.
+        Parameter wie bei `fetch`.
+
+        Returns
+        -------
+        Je Paar aus Kalender und Jahr, ob sich die Daten geändert haben, bzw.
+        `None`, falls das Laden fehlgeschlagen ist.
+        """
+        pairs = list(dict.fromkeys(pairs))
+
+        def load(pair: Tuple[str, int]) -> Optional[bool]:
+            try:
+                return self.fetch(*pair, retries, backoff, maxage)[1]
+            except (requests.RequestException, ValueError):
+                return None
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            return dict(zip(pairs, pool.map(load, pairs)))
+
+    def file(self, kalender: str, year: int) -> str:
+        """Pfad der Cachedatei eines Jahres."""
+        return os.path.join(self.cache_dir, kalender, f'{year}.json')
+
+    def request(
+        self, kalender: str, year: int, month: int = None, day: int = None,
+        headers: Dict[str, str] = None
+    ) -> requests.Response:
+        """
+        Fragt die API direkt ab, optional können Monat und Tag angegeben
+        werden.
+        """
+        params = {'format': 'json', 'info': 'wdtrgflu', 'dup': 'e',
+                  'bahn': 'j', 'kal': kalender, 'jahr': year}
+        if month: params['monat'] = month
+        if month and day: params['tag'] = day
+        return self.session.get(self.url, params=params, headers=headers,
+                                timeout=self.timeout)
+
+    def _fetch(
+        self, kalender: str, year: int, maxage: float
+    ) -> Tuple[dict, bool]:
+        """
+        Interne Methode, die ein Jahr in einem Versuch lädt. Neben der
+        Cachedatei liegen in `<Jahr>.json.meta` die Validatoren der letzten
+        Antwort; antwortet die API mit 304, wird die Datei nur als aktuell
+        markiert.
+        """
+        if self.cache_dir is None:
+            r = self.request(kalender, year)
+            r.raise_for_status()
+            return self._parse(r.content), True
+
+        file = self.file(kalender, year)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        with self._locked(f'{file}.lock'):
+            cached = None
+            try:
+                with open(file, 'rb') as f: cached = self._parse(f.read())
+                with open(f'{file}.meta') as f: meta = json.load(f)
+            except (OSError, ValueError):
+                meta = dict()
+            if cached is not None and maxage is not None \
+                    and time.time() - os.path.getmtime(file) < maxage:
+                return cached, False
+
+            headers = dict()
+            if cached is not None and meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if cached is not None and meta.get('modified'):
+                headers['If-Modified-Since'] = meta['modified']
+            r = self.request(kalender, year, headers=headers)
+            if r.status_code == 304 and cached is not None:
+                os.utime(file)
+                return cached, False
+            r.raise_for_status()
+            data = self._parse(r.content)
+            self._write(file, r.content)
+            self._write(f'{file}.meta', json.dumps({
+                'etag': r.headers.get('ETag'),
+                'modified': r.headers.get('Last-Modified')}).encode())
+            return data, True
+
+    @staticmethod
+    @contextmanager
+    def _locked(path: str) -> Iterator[None]:
+        """
+        Interne Methode, die für die Dauer des Blocks eine Dateisperre hält,
+        sodass mehrere Prozesse dasselbe Jahr nicht gleichzeitig laden. Ohne
+        `fcntl` (etwa unter Windows) wird nicht gesperrt.
+        """
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _parse(content: bytes) -> dict:
+        """
+        Interne Methode, die eine Antwort der API liest und prüft.
+
+        Raises
+        ------
+        ValueError
+            Falls die Antwort keine gültigen Zelebrationen enthält.
+        """
+        data = json.loads(content)
+        if not isinstance(data, dict) or \
+                not isinstance(data.get('Zelebrationen'), dict):
+            raise ValueError('Antwort enthält keine Zelebrationen')
+        return data
+
+    @staticmethod
+    def _write(path: str, content: bytes) -> None:
+        """
+        Interne Methode, die eine Datei über eine temporäre Datei atomar
+        schreibt, sodass nie eine halb geschriebene Datei gelesen wird.
+        """
+        tmp = f'{path}.{os.getpid()}.{get_ident()}.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp): os.remove(tmp)
@@ -1,11 +1,17 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date, timedelta
 import json
 import os
 import requests
-from typing import List
+from threading import Lock
+import time
+from typing import List, Tuple
 
+from .calendarstore import CalendarStore
+from .client import DirektoriumClient
 from .event import Event
+from .localcalendar import LocalCalendar
+from .rank import Rank
 from .season import Season
 
 
@@ -13,7 +19,10 @@ from .season import Season
 class Direktorium:
     """
     Stellt das Direktorium mit einem Cache und einem Regionalkalender zur
-    Verfügung.
+    Verfügung. Ist `blocking` abgeschaltet, wird bei Abfragen nie das Netz
+    befragt: Liegt ein Jahr nicht lokal vor, antwortet der lokal berechnete
+    Kalender (`LocalCalendar`), bis es über `fetch` nachgeladen wurde. Mit
+    `source='local'` wird ausschließlich lokal berechnet.
 
     Attributes
     ----------
@@ -22,17 +31,64 @@ class Direktorium:
         https://www.eucharistiefeier.de/lk/api-abfrage.php.
     cache_dir : str
         Verzeichnis, in dem Ergebnisse zwischengespeichert werden sollen.
+    blocking : bool
+        Ob fehlende Jahre bei einer Abfrage direkt von der API geladen werden.
+    timeout : float
+        Zeitlimit für Anfragen an die API in Sekunden.
+    source : str
+        Quelle der Angaben: `'api'` oder `'local'` für den lokal berechneten
+        Kalender.
+    regional : str
+        Pfad zu einer eigenen Tabelle regionaler Feiern für die lokale
+        Berechnung.
+    url : str
+        Adresse der API, etwa die eines lokalen Ersatzservers.
+    client : DirektoriumClient
+        Client der API; mehrere Direktorien können sich einen Client und
+        damit Verbindungspool und Cache teilen.
+    _local : LocalCalendar
+        Lokal berechneter Kalender.
+    _lock : Lock
+        Sichert das Anlegen und Befüllen des Speichers ab.
+    _store : CalendarStore
+        Indizierter Speicher der bereits geladenen Jahre.
 
     Methods
     -------
+    available(year) : bool
+        Ob ein Jahr lokal vorliegt.
+    fallback(d) : List[Event]
+        Ermittelt ohne Daten der API lokal Angaben zu einem Tag.
+    fetch(year, retries, backoff) : bool
+        Lädt ein Jahr von der API und übernimmt es.
+    fresh(year, maxage) : bool
+        Ob ein Jahr jünger als ein Höchstalter im Cache liegt.
     get(d) : List[Event]
         Gibt eine Liste von Events für ein Datum zurück.
+    local() : LocalCalendar
+        Gibt den lokal berechneten Kalender zurück.
+    range(start, end) : List[Event]
+        Gibt die Events eines Zeitraums zurück.
+    rank(year, rank) : List[Event]
+        Gibt alle Events eines Jahres mit einem Rang zurück.
     request_api(year, month, day) : requests.models.Response
         Fragt die API online über ein Datum ab.
     request_cache(d) : dict
         Erstellt das API-Format aus dem Cache.
     season(d) : Season
         Ermittelt die Zeit im Kirchenjahr, in die das Datum fällt.
+    store(year) : CalendarStore
+        Gibt den Speicher zurück, nachdem ein Jahr übernommen wurde.
+    version(year) : Tuple
+        Gibt den Stand der Angaben zu einem Jahr zurück.
+    _file(year) : str
+        Pfad der Cachedatei eines Jahres.
+    _insert(year, data)
+        Übernimmt ein Jahr in den Speicher.
+    _open() : CalendarStore
+        Öffnet den Speicher bei Bedarf.
+    _read(year) : dict
+        Liest ein Jahr aus dem Cache.
 
     Static Methods
     --------------
@@ -42,13 +98,146 @@ class Direktorium:
 
     kalender: str = 'deutschland'
     cache_dir: str = None
+    blocking: bool = True
+    timeout: float = 10
+    source: str = 'api'
+    regional: str = None
+    url: str = DirektoriumClient.URL
+    client: DirektoriumClient = field(default=None, repr=False, compare=False)
+    _local: LocalCalendar = field(
+        default=None, init=False, repr=False, compare=False)
+    _lock: Lock = field(
+        default_factory=Lock, init=False, repr=False, compare=False)
+    _store: CalendarStore = field(
+        default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """
+        Erstellt ggf. einen eigenen Client der API. Ein übergebener Client
+        bestimmt auch das Cacheverzeichnis.
+        """
+        if self.client is None:
+            self.client = DirektoriumClient(
+                self.cache_dir, self.url, self.timeout, workers=1)
+        self.cache_dir = self.client.cache_dir
+
+    def available(self, year: int) -> bool:
+        """
+        Ob ein Jahr lokal vorliegt. Liegt es nur als Datei im Cache, wird es
+        dabei übernommen; das Netz wird nie befragt.
+        """
+        if self.source == 'local': return True
+        with self._lock:
+            store = self._open()
+            if store.has(year): return True
+            data = self._read(year)
+            if data is None: return False
+            store.insert(year, data)
+            return True
+
+    def fallback(self, d: date) -> List[Event]:
+        """
+        Ermittelt ohne Daten der API die Events eines Tages aus dem lokal
+        berechneten Kalender.
+        """
+        return self.local().get(d)
+
+    def fetch(self, year: int, retries: int = 0, backoff: float = 1) -> bool:
+        """
+        Lädt ein Jahr über den Client, der es atomar im Cache ablegt, und
+        übernimmt es in den Speicher. Ein älterer Stand desselben Jahres wird
+        dabei ersetzt, bleibt bei einem Fehlschlag aber erhalten. Hat sich
+        das Jahr laut API nicht geändert, wird nur der Cache als aktuell
+        markiert.
+
+        Parameters
+        ----------
+        year : int
+            Zu ladendes Jahr.
+        retries : int (optional)
+            Anzahl weiterer Versuche nach einem Fehlschlag.
+        backoff : float (optional)
+            Wartezeit vor dem ersten weiteren Versuch in Sekunden; sie
+            verdoppelt sich mit jedem Versuch.
+
+        Returns
+        -------
+        Ob das Jahr vorliegt.
+        """
+        try:
+            data, changed = self.client.fetch(
+                self.kalender, year, retries, backoff)
+        except (requests.RequestException, ValueError):
+            return False
+        with self._lock:
+            store = self._open()
+            if changed or not store.has(year): store.insert(year, data)
+        return True
+
+    def fresh(self, year: int, maxage: float) -> bool:
+        """
+        Ob ein Jahr im Cache liegt und nicht älter als `maxage` Sekunden ist.
+        Ohne Cache zählt jedes bereits geladene Jahr als aktuell.
+        """
+        if self.cache_dir is None:
+            with self._lock: return self._open().has(year)
+        try:
+            return time.time() - os.path.getmtime(self._file(year)) < maxage
+        except OSError:
+            return False
 
     def get(self, d: date) -> List[Event]:
         """Gibt eine Liste von Events für ein angegebenes Datum zurück."""
-        r = self.request_cache(d)
-        entries = [Event.parse(e) for e in r['Zelebrationen'].values()]
-        entries.sort(key=lambda e: e.importance)
-        return entries
+        try:
+            return self.store(d.year).get(d)
+        except LookupError:
+            return self.fallback(d)
+
+    def local(self) -> LocalCalendar:
+        """
+        Gibt den lokal berechneten Kalender zurück und legt ihn ggf. an.
+
+        Raises
+        ------
+        ValueError
+            Falls die Tabelle regionaler Feiern ungültig ist.
+        """
+        with self._lock:
+            if self._local is None:
+                self._local = LocalCalendar(self.kalender, self.regional)
+            return self._local
+
+    def range(self, start: date, end: date) -> List[Event]:
+        """
+        Gibt die Events eines Zeitraums nach Datum und Wichtigkeit sortiert
+        zurück.
+
+        Parameters
+        ----------
+        start : date
+            Erster Tag des Zeitraums.
+        end : date
+            Letzter Tag des Zeitraums (einschließlich).
+        """
+        events = list()
+        for year in range(start.year, end.year + 1):
+            first = max(start, date(year, 1, 1))
+            last = min(end, date(year, 12, 31))
+            try:
+                events += self.store(year).range(first, last)
+            except LookupError:
+                events += self.local().range(first, last)
+        return events
+
+    def rank(self, year: int, rank: Rank) -> List[Event]:
+        """
+        Gibt alle Events eines Jahres mit einem Rang nach Datum sortiert
+        zurück, etwa alle Hochfeste.
+        """
+        try:
+            return self.store(year).rank(year, rank)
+        except LookupError:
+            return self.local().rank(year, rank)
 
     def request_api(
         self, year: int, month: int = None, day: int = None
@@ -57,37 +246,21 @@ class Direktorium:
         Fragt die API online direkt ab, optional können Monat und Tag angegeben
         werden.
         """
-        url = 'http://www.eucharistiefeier.de/lk/api.php?format=json&' \
-              f'info=wdtrgflu&dup=e&bahn=j&kal={self.kalender}&jahr={year}&'
-        if month: url += f'monat={month}&'
-        if month and day: url += f'tag={day}&'
-        return requests.get(url)
+        return self.client.request(self.kalender, year, month, day)
 
     def request_cache(self, d: date) -> dict:
         """
-        Erstellt das API-Format aus dem Cache. Falls benötigt wird dazu der
-        Cache angelegt. Sollte kein Cache vorgesehen sein, wird direkt die
-        Online-API abgefragt.
+        Erstellt das API-Format eines Tages aus dem Cache: alle Angaben der
+        Antwort des Jahres, wobei die Zelebrationen auf den Tag beschränkt
+        sind. Falls benötigt wird dazu das Jahr in den Cache übernommen.
+
+        Raises
+        ------
+        LookupError
+            Falls das Jahr ohne `blocking` nicht lokal vorliegt.
         """
-        if self.cache_dir is None:
-            return self.request_api(d.year, d.month, d.day).json()
-
-        # Daten einlesen (ggf. herunterladen)
-        dir = os.path.join(self.cache_dir, self.kalender)
-        file = os.path.join(dir, f'{d.year}.json')
-        if not os.path.exists(file):
-            if not os.path.exists(dir): os.makedirs(dir)
-            r = self.request_api(d.year)
-            with open(file, 'wb') as f: f.write(r.content)
-            data = r.json()
-        else:
-            with open(file) as f: data = json.load(f)
-
-        # Dictionary für aktuellen Tag konstruieren
-        datestr = d.isoformat()
-        data['Zelebrationen'] = {k: v for k, v in data['Zelebrationen'].items()
-                                 if datestr == v['Datum']}
-        return data
+        store = self.store(d.year)
+        return {**store.meta(d.year), 'Zelebrationen': store.raw(d)}
 
     def season(self, d: date) -> Season:
         """
@@ -110,6 +283,75 @@ class Direktorium:
 
         return Season.ORDINARY
 
+    def store(self, year: int) -> CalendarStore:
+        """
+        Gibt den indizierten Speicher zurück und übernimmt zuvor ggf. das
+        angefragte Jahr. Der Speicher liegt als `calendar.sqlite` im
+        Kalenderordner des Caches; ist kein Cache vorgesehen, nur im
+        Arbeitsspeicher.
+
+        Raises
+        ------
+        LookupError
+            Falls das Jahr ohne `blocking` nicht lokal vorliegt oder lokal
+            berechnet wird.
+        """
+        if self.source == 'local':
+            raise LookupError('Direktorium wird lokal berechnet')
+        if not self.available(year):
+            if not self.blocking:
+                raise LookupError(f'Kein Direktorium für {year} vorhanden')
+            self._insert(year, self.client.fetch(self.kalender, year)[0])
+        return self._store
+
+    def version(self, year: int) -> Tuple:
+        """
+        Gibt den Stand der Angaben zu einem Jahr zurück: ob sie aus der API
+        oder der lokalen Berechnung stammen und wie oft das Jahr übernommen
+        wurde. Ändert sich der Stand, haben sich die Angaben ggf. geändert.
+        Das Netz wird dabei nie befragt.
+        """
+        if self.source == 'local' or not self.available(year):
+            return 'local', self.regional
+        with self._lock: return 'api', self._open().revision(year)
+
+    def _file(self, year: int) -> str:
+        """Interne Methode, die den Pfad der Cachedatei eines Jahres angibt."""
+        return self.client.file(self.kalender, year)
+
+    def _insert(self, year: int, data: dict) -> None:
+        """Interne Methode, die ein Jahr in den Speicher übernimmt."""
+        with self._lock: self._open().insert(year, data)
+
+    def _open(self) -> CalendarStore:
+        """
+        Interne Methode, die den Speicher bei Bedarf öffnet. Sie wird nur mit
+        gehaltenem `_lock` aufgerufen.
+        """
+        if self._store is None:
+            path = ':memory:'
+            if self.cache_dir is not None:
+                dir = os.path.join(self.cache_dir, self.kalender)
+                os.makedirs(dir, exist_ok=True)
+                path = os.path.join(dir, 'calendar.sqlite')
+            self._store = CalendarStore(path)
+        return self._store
+
+    def _read(self, year: int) -> dict:
+        """
+        Interne Methode, die ein Jahr aus dem Cache liest. Fehlt die Datei
+        oder ist sie unlesbar, wird `None` zurückgegeben.
+        """
+        if self.cache_dir is None: return None
+        try:
+            with open(self._file(year)) as f: data = json.load(f)
+            if isinstance(data.get('Zelebrationen'), dict): return data
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, AttributeError) as e:
+            print(f'Direktorium cache {self._file(year)} unreadable: {e!r}')
+        return None
+
     @staticmethod
     def easter(year: int) -> date:
         """Ermittelt das Osterdatum für ein Jahr."""
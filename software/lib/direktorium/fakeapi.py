@@ -0,0 +1,191 @@
+from datetime import date
+from email.utils import formatdate, parsedate_to_datetime
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from threading import Lock, Thread
+import time
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .color import Color
+from .localcalendar import LocalCalendar
+from .rank import Rank
+
+
+class FakeApi:
+    """
+    Lokaler Ersatz der Kalender-API, mit dem sich Client, Cache und
+    Direktorium ohne Netz testen und vermessen lassen. Die Antworten werden
+    im Format der API aus dem lokal berechneten Kalender erzeugt und tragen
+    `ETag` und `Last-Modified`, sodass auch bedingte Anfragen beantwortet
+    werden.
+
+    Attributes
+    ----------
+    delay : float
+        Künstliche Antwortzeit je Anfrage in Sekunden.
+    requests : int
+        Anzahl beantworteter Anfragen.
+    unchanged : int
+        Davon mit 304 beantwortete Anfragen.
+    _bodies : Dict[Tuple[str, int], Tuple[bytes, str, float]]
+        Antwort, ETag und Änderungszeit je Kalender und Jahr.
+    _calendars : Dict[str, LocalCalendar]
+        Lokale Kalender je Bezeichnung.
+    _lock : Lock
+        Sichert Zähler und Antworten zwischen Threads ab.
+    _server : ThreadingHTTPServer
+        Der HTTP-Server.
+
+    Methods
+    -------
+    start() : FakeApi
+        Startet den Server im Hintergrund.
+    stop()
+        Beendet den Server.
+    touch(kalender, year)
+        Markiert ein Jahr als geändert.
+    url() : str
+        Adresse der API.
+    _body(kalender, year) : Tuple[bytes, str, float]
+        Erzeugt die Antwort für ein Jahr.
+    _handle(handler)
+        Beantwortet eine Anfrage.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 delay: float = 0):
+        """
+        Erstellt den Server, ohne ihn zu starten.
+
+        Parameters
+        ----------
+        host : str (optional)
+            Adresse, an die der Server gebunden wird.
+        port : int (optional)
+            Port des Servers, bei 0 ein freier.
+        delay : float (optional)
+            Künstliche Antwortzeit je Anfrage in Sekunden.
+        """
+        self.delay: float = delay
+        self.requests: int = 0
+        self.unchanged: int = 0
+        self._bodies: Dict[Tuple[str, int], Tuple[bytes, str, float]] = dict()
+        self._calendars: Dict[str, LocalCalendar] = dict()
+        self._lock: Lock = Lock()
+
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            def do_GET(self): api._handle(self)
+            def log_message(self, *args): pass
+
+        self._server: ThreadingHTTPServer = ThreadingHTTPServer(
+            (host, port), Handler)
+        self._server.daemon_threads = True
+
+    def start(self) -> 'FakeApi':
+        """Startet den Server in einem Hintergrundthread."""
+        Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Beendet den Server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def touch(self, kalender: str, year: int) -> None:
+        """
+        Markiert ein Jahr als geändert: Es erhält einen neuen ETag und eine
+        neue Änderungszeit.
+        """
+        with self._lock: self._bodies.pop((kalender, year), None)
+
+    def url(self) -> str:
+        """Adresse der API, wie sie dem Client übergeben wird."""
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/lk/api.php'
+
+    def _body(self, kalender: str, year: int) -> Tuple[bytes, str, float]:
+        """
+        Interne Methode, die die Antwort für ein Jahr im Format der API samt
+        ETag und Änderungszeit erzeugt und vorhält.
+        """
+        with self._lock:
+            cached = self._bodies.get((kalender, year))
+            if cached is not None: return cached
+            calendar = self._calendars.get(kalender)
+            if calendar is None:
+                calendar = self._calendars[kalender] = LocalCalendar(kalender)
+
+        colors = {Color.WHITE: 'w', Color.RED: 'r', Color.GREEN: 'g',
+                  Color.VIOLET: 'v', Color.NONE: ''}
+        ranks = {Rank.HOCHFEST: 'H', Rank.FEST: 'F', Rank.GEBOTEN: 'G',
+                 Rank.NICHTGEBOTEN: 'g', Rank.NONE: ''}
+        modified = time.time()
+        events = calendar.range(date(year, 1, 1), date(year, 12, 31))
+        data = {'Kalender': kalender, 'Jahr': year, 'Stand': int(modified),
+                'Zelebrationen': {str(n): {
+                    'Tl': e.title, 'Datum': e.date.isoformat(),
+                    'Bem': e.comment, 'L1': e.lecture1, 'AP': e.psalm,
+                    'L2': e.lecture2, 'EV': e.gospel,
+                    'Farbe': colors[e.color], 'Grad': e.importance,
+                    'Rang': ranks[e.rank]} for n, e in enumerate(events)}}
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        with self._lock:
+            return self._bodies.setdefault(
+                (kalender, year), (body, etag, modified))
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        """
+        Interne Methode, die eine Anfrage beantwortet. Monat und Tag filtern
+        wie bei der API die Zelebrationen.
+        """
+        if self.delay: time.sleep(self.delay)
+        with self._lock: self.requests += 1
+        url = urlparse(handler.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            if not url.path.endswith('api.php'): raise KeyError
+            kalender, year = query['kal'], int(query['jahr'])
+            prefix = f'{year:04d}'
+            if 'monat' in query: prefix += f'-{int(query["monat"]):02d}'
+            if 'monat' in query and 'tag' in query:
+                prefix += f'-{int(query["tag"]):02d}'
+        except (KeyError, ValueError):
+            handler.send_error(400)
+            return
+
+        body, etag, modified = self._body(kalender, year)
+        match = handler.headers.get('If-None-Match') == etag
+        since = handler.headers.get('If-Modified-Since')
+        if since is not None and handler.headers.get('If-None-Match') is None:
+            try:
+                match = parsedate_to_datetime(since).timestamp() >= \
+                    int(modified)
+            except (TypeError, ValueError):
+                pass
+        if match:
+            with self._lock: self.unchanged += 1
+            handler.send_response(304)
+            handler.send_header('ETag', etag)
+            handler.end_headers()
+            return
+
+        if 'monat' in query:
+            data = json.loads(body)
+            data['Zelebrationen'] = {
+                k: v for k, v in data['Zelebrationen'].items()
+                if v['Datum'].startswith(prefix)}
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json; charset=utf-8')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.send_header('ETag', etag)
+        handler.send_header('Last-Modified', formatdate(modified, usegmt=True))
+        handler.end_headers()
+        handler.wfile.write(body)
@@ -0,0 +1,555 @@
+from datetime import date, timedelta
+import json
+import numpy as np
+import os
+from typing import Dict, List, NamedTuple, Tuple
+
+from .color import Color
+from .event import Event
+from .rank import Rank
+
+
+class Celebration(NamedTuple):
+    """
+    Eine Feier des Kalenders.
+
+    Attributes
+    ----------
+    title : str
+        Bezeichnung der Feier.
+    rank : Rank
+        Rang der Feier.
+    color : Color
+        Liturgische Farbe.
+    grade : int
+        Stufe in der Rangordnung der liturgischen Tage (1 bis 13, kleiner ist
+        wichtiger).
+    """
+    title: str
+    rank: Rank
+    color: Color
+    grade: int
+
+
+class CalendarYear(NamedTuple):
+    """
+    Ein berechnetes Kalenderjahr. Alle Arrays haben einen Eintrag je Tag.
+
+    Attributes
+    ----------
+    start : date
+        Erster Tag des Jahres.
+    celebration : np.ndarray
+        Nummer der begangenen Feier oder -1 für den einfachen Tag.
+    grade : np.ndarray
+        Stufe des begangenen Tages in der Rangordnung.
+    period : np.ndarray
+        Abschnitt des Kirchenjahres (siehe `LocalCalendar.ADVENT` usw.).
+    week : np.ndarray
+        Woche innerhalb des Abschnitts.
+    extra : Dict[int, List[int]]
+        Weitere, nicht gebotene Feiern je Tag des Jahres.
+    """
+    start: date
+    celebration: np.ndarray
+    grade: np.ndarray
+    period: np.ndarray
+    week: np.ndarray
+    extra: Dict[int, List[int]]
+
+
+class LocalCalendar:
+    """
+    Berechnet den allgemeinen römischen Kalender (in der Fassung des
+    deutschen Sprachgebiets) für beliebige Jahre ohne Netzverbindung:
+    bewegliche Feste relativ zu Ostern, Advent und Erscheinung, feste
+    Hochfeste, Feste und gebotene Gedenktage sowie Sonn- und Wochentage samt
+    Rang. Alle Tage eines oder mehrerer Jahre werden in einem Durchgang mit
+    NumPy berechnet, indem alle in Frage kommenden Feiern nach Tag, Stufe der
+    Rangordnung und Herkunft sortiert werden; verdrängte Hochfeste werden auf
+    den nächsten freien Tag verlegt. Regionale Ergänzungen stammen aus einer
+    kleinen Tabelle (`regional.json`) und optional einer eigenen Datei im
+    gleichen Format.
+
+    Attributes
+    ----------
+    FIXED : Tuple
+        Feste Feiern als (Monat, Tag, Titel, Rang, Farbe, Stufe).
+    GRADES : Dict[str, Tuple[int, int]]
+        Stufe je Rang für allgemeine und regionale Feiern.
+    MOVABLE : Tuple
+        Bewegliche Feiern als (Bezug, Abstand, Titel, Rang, Farbe, Stufe).
+    celebrations : List[Celebration]
+        Alle bekannten Feiern.
+    kalender : str
+        Bezeichnung des Regionalkalenders.
+    _events : Dict[date, List[Event]]
+        Bereits erstellte Events je Tag.
+    _fixed : Tuple[np.ndarray, np.ndarray, np.ndarray]
+        Monate, Tage und Nummern der festen Feiern.
+    _movable : Tuple[List[str], np.ndarray, np.ndarray]
+        Bezüge, Abstände und Nummern der beweglichen Feiern.
+    _ranks : np.ndarray
+        Rang je Feier.
+    _years : Dict[int, CalendarYear]
+        Bereits berechnete Jahre.
+
+    Methods
+    -------
+    build(first, last)
+        Berechnet einen Bereich von Jahren in einem Durchgang.
+    get(d) : List[Event]
+        Gibt die Events eines Tages zurück.
+    range(start, end) : List[Event]
+        Gibt die Events eines Zeitraums zurück.
+    rank(year, rank) : List[Event]
+        Gibt alle Events eines Jahres mit einem Rang zurück.
+    year(year) : CalendarYear
+        Gibt ein berechnetes Jahr zurück.
+    _day(year, i) : List[Event]
+        Erstellt die Events eines Tages.
+    _title(d, period, week) : str
+        Benennt einen Tag ohne eigene Feier.
+
+    Static Methods
+    --------------
+    table(kalender, path) : List[dict]
+        Liest die regionalen Einträge eines Kalenders.
+    """
+
+    ADVENT, CHRISTMAS, LENT, HOLYWEEK, EASTER, ORDINARY = range(6)
+
+    FIXED: Tuple = (
+        (1, 1, 'Hochfest der Gottesmutter Maria', 'H', 'w', 3),
+        (1, 2, 'Hl. Basilius der Große und hl. Gregor von Nazianz', 'G', 'w',
+         10),
+        (1, 6, 'Erscheinung des Herrn', 'H', 'w', 2),
+        (1, 17, 'Hl. Antonius', 'G', 'w', 10),
+        (1, 21, 'Hl. Agnes', 'G', 'r', 10),
+        (1, 24, 'Hl. Franz von Sales', 'G', 'w', 10),
+        (1, 25, 'Bekehrung des hl. Apostels Paulus', 'F', 'w', 7),
+        (1, 26, 'Hl. Timotheus und hl. Titus', 'G', 'w', 10),
+        (1, 28, 'Hl. Thomas von Aquin', 'G', 'w', 10),
+        (1, 31, 'Hl. Johannes Bosco', 'G', 'w', 10),
+        (2, 2, 'Darstellung des Herrn', 'F', 'w', 5),
+        (2, 10, 'Hl. Scholastika', 'G', 'w', 10),
+        (2, 22, 'Kathedra Petri', 'F', 'w', 7),
+        (2, 23, 'Hl. Polykarp', 'G', 'r', 10),
+        (3, 19, 'Hl. Josef, Bräutigam der Gottesmutter Maria', 'H', 'w', 3),
+        (3, 25, 'Verkündigung des Herrn', 'H', 'w', 3),
+        (4, 7, 'Hl. Johannes Baptist de La Salle', 'G', 'w', 10),
+        (4, 11, 'Hl. Stanislaus', 'G', 'r', 10),
+        (4, 25, 'Hl. Markus, Evangelist', 'F', 'r', 7),
+        (4, 29, 'Hl. Katharina von Siena', 'G', 'w', 10),
+        (5, 2, 'Hl. Athanasius', 'G', 'w', 10),
+        (5, 3, 'Hl. Philippus und hl. Jakobus, Apostel', 'F', 'r', 7),
+        (5, 14, 'Hl. Matthias, Apostel', 'F', 'r', 7),
+        (5, 26, 'Hl. Philipp Neri', 'G', 'w', 10),
+        (5, 31, 'Mariä Heimsuchung', 'F', 'w', 7),
+        (6, 1, 'Hl. Justin', 'G', 'r', 10),
+        (6, 3, 'Hl. Karl Lwanga und Gefährten', 'G', 'r', 10),
+        (6, 5, 'Hl. Bonifatius', 'G', 'r', 10),
+        (6, 11, 'Hl. Barnabas, Apostel', 'G', 'r', 10),
+        (6, 13, 'Hl. Antonius von Padua', 'G', 'w', 10),
+        (6, 24, 'Geburt des hl. Johannes des Täufers', 'H', 'w', 3),
+        (6, 28, 'Hl. Irenäus', 'G', 'r', 10),
+        (6, 29, 'Hl. Petrus und hl. Paulus, Apostel', 'H', 'r', 3),
+        (7, 3, 'Hl. Thomas, Apostel', 'F', 'r', 7),
+        (7, 11, 'Hl. Benedikt von Nursia', 'G', 'w', 10),
+        (7, 22, 'Hl. Maria Magdalena', 'F', 'w', 7),
+        (7, 25, 'Hl. Jakobus, Apostel', 'F', 'r', 7),
+        (7, 26, 'Hl. Joachim und hl. Anna', 'G', 'w', 10),
+        (7, 29, 'Hl. Marta, hl. Maria und hl. Lazarus', 'G', 'w', 10),
+        (7, 31, 'Hl. Ignatius von Loyola', 'G', 'w', 10),
+        (8, 1, 'Hl. Alfons Maria von Liguori', 'G', 'w', 10),
+        (8, 6, 'Verklärung des Herrn', 'F', 'w', 5),
+        (8, 8, 'Hl. Dominikus', 'G', 'w', 10),
+        (8, 10, 'Hl. Laurentius', 'F', 'r', 7),
+        (8, 11, 'Hl. Klara von Assisi', 'G', 'w', 10),
+        (8, 14, 'Hl. Maximilian Kolbe', 'G', 'r', 10),
+        (8, 15, 'Mariä Aufnahme in den Himmel', 'H', 'w', 3),
+        (8, 20, 'Hl. Bernhard von Clairvaux', 'G', 'w', 10),
+        (8, 21, 'Hl. Pius X.', 'G', 'w', 10),
+        (8, 22, 'Maria Königin', 'G', 'w', 10),
+        (8, 24, 'Hl. Bartholomäus, Apostel', 'F', 'r', 7),
+        (8, 27, 'Hl. Monika', 'G', 'w', 10),
+        (8, 28, 'Hl. Augustinus', 'G', 'w', 10),
+        (8, 29, 'Enthauptung Johannes des Täufers', 'G', 'r', 10),
+        (9, 3, 'Hl. Gregor der Große', 'G', 'w', 10),
+        (9, 8, 'Mariä Geburt', 'F', 'w', 7),
+        (9, 13, 'Hl. Johannes Chrysostomus', 'G', 'w', 10),
+        (9, 14, 'Kreuzerhöhung', 'F', 'r', 5),
+        (9, 15, 'Gedächtnis der Schmerzen Mariens', 'G', 'w', 10),
+        (9, 16, 'Hl. Kornelius und hl. Cyprian', 'G', 'r', 10),
+        (9, 21, 'Hl. Matthäus, Apostel und Evangelist', 'F', 'r', 7),
+        (9, 23, 'Hl. Pio von Pietrelcina', 'G', 'w', 10),
+        (9, 27, 'Hl. Vinzenz von Paul', 'G', 'w', 10),
+        (9, 29, 'Hl. Michael, hl. Gabriel und hl. Rafael, Erzengel', 'F',
+         'w', 7),
+        (9, 30, 'Hl. Hieronymus', 'G', 'w', 10),
+        (10, 1, 'Hl. Theresia vom Kinde Jesus', 'G', 'w', 10),
+        (10, 2, 'Heilige Schutzengel', 'G', 'w', 10),
+        (10, 4, 'Hl. Franz von Assisi', 'G', 'w', 10),
+        (10, 7, 'Unsere Liebe Frau vom Rosenkranz', 'G', 'w', 10),
+        (10, 15, 'Hl. Teresa von Ávila', 'G', 'w', 10),
+        (10, 17, 'Hl. Ignatius von Antiochien', 'G', 'r', 10),
+        (10, 18, 'Hl. Lukas, Evangelist', 'F', 'r', 7),
+        (10, 28, 'Hl. Simon und hl. Judas, Apostel', 'F', 'r', 7),
+        (11, 1, 'Allerheiligen', 'H', 'w', 3),
+        (11, 2, 'Allerseelen', '', 'v', 3),
+        (11, 4, 'Hl. Karl Borromäus', 'G', 'w', 10),
+        (11, 9, 'Weihetag der Lateranbasilika', 'F', 'w', 5),
+        (11, 10, 'Hl. Leo der Große', 'G', 'w', 10),
+        (11, 11, 'Hl. Martin von Tours', 'G', 'w', 10),
+        (11, 12, 'Hl. Josaphat', 'G', 'r', 10),
+        (11, 17, 'Hl. Elisabeth von Thüringen', 'G', 'w', 10),
+        (11, 21, 'Unsere Liebe Frau in Jerusalem', 'G', 'w', 10),
+        (11, 22, 'Hl. Cäcilia', 'G', 'r', 10),
+        (11, 30, 'Hl. Andreas, Apostel', 'F', 'r', 7),
+        (12, 3, 'Hl. Franz Xaver', 'G', 'w', 10),
+        (12, 7, 'Hl. Ambrosius', 'G', 'w', 10),
+        (12, 8, 'Hochfest der ohne Erbsünde empfangenen Jungfrau und '
+         'Gottesmutter Maria', 'H', 'w', 3),
+        (12, 13, 'Hl. Luzia', 'G', 'r', 10),
+        (12, 14, 'Hl. Johannes vom Kreuz', 'G', 'w', 10),
+        (12, 25, 'Hochfest der Geburt des Herrn', 'H', 'w', 2),
+        (12, 26, 'Hl. Stephanus', 'F', 'r', 7),
+        (12, 27, 'Hl. Johannes, Apostel und Evangelist', 'F', 'w', 7),
+        (12, 28, 'Unschuldige Kinder', 'F', 'r', 7),
+    )
+
+    MOVABLE: Tuple = (
+        ('easter', -46, 'Aschermittwoch', '', 'v', 2),
+        ('easter', -7, 'Palmsonntag', '', 'r', 2),
+        ('easter', -3, 'Gründonnerstag', '', 'w', 1),
+        ('easter', -2, 'Karfreitag', '', 'r', 1),
+        ('easter', -1, 'Karsamstag', '', '', 1),
+        ('easter', 0, 'Hochfest der Auferstehung des Herrn', 'H', 'w', 1),
+        ('easter', 39, 'Christi Himmelfahrt', 'H', 'w', 2),
+        ('easter', 49, 'Pfingstsonntag', 'H', 'r', 2),
+        ('easter', 50, 'Maria, Mutter der Kirche', 'G', 'w', 10),
+        ('easter', 56, 'Dreifaltigkeitssonntag', 'H', 'w', 3),
+        ('easter', 60, 'Hochfest des Leibes und Blutes Christi', 'H', 'w', 3),
+        ('easter', 68, 'Heiligstes Herz Jesu', 'H', 'w', 3),
+        ('easter', 69, 'Unbeflecktes Herz Mariä', 'G', 'w', 10),
+        ('advent', -7, 'Christkönigssonntag', 'H', 'w', 3),
+        ('baptism', 0, 'Taufe des Herrn', 'F', 'w', 5),
+        ('holyfamily', 0, 'Fest der Heiligen Familie', 'F', 'w', 5),
+    )
+
+    GRADES: Dict[str, Tuple[int, int]] = {
+        'H': (3, 4), 'F': (7, 8), 'G': (10, 11), 'g': (12, 12), '': (13, 13)}
+
+    def __init__(self, kalender: str = 'deutschland', regional: str = None):
+        """
+        Stellt die Feiern aus allgemeinem und regionalem Kalender zusammen.
+
+        Parameters
+        ----------
+        kalender : str (optional)
+            Bezeichnung des Regionalkalenders in den Tabellen.
+        regional : str (optional)
+            Pfad zu einer eigenen Tabelle, etwa mit Patrozinium und Kirchweih.
+
+        Raises
+        ------
+        ValueError
+            Falls ein Eintrag der Tabellen ungültig ist.
+        """
+        self.kalender: str = kalender
+        self.celebrations: List[Celebration] = list()
+        fixed, movable = list(), list()
+
+        entries = self.table(kalender)
+        if regional is not None: entries += self.table(kalender, regional)
+        replaced = {e['replaces'] for e in entries if 'replaces' in e}
+        for month, day, title, rank, color, grade in self.FIXED:
+            if f'{month:02d}-{day:02d}' in replaced: continue
+            fixed.append((month, day, len(self.celebrations)))
+            self.celebrations.append(Celebration(
+                title, Rank.parse(rank), Color.parse(color), grade))
+        for anchor, offset, title, rank, color, grade in self.MOVABLE:
+            movable.append((anchor, offset, len(self.celebrations)))
+            self.celebrations.append(Celebration(
+                title, Rank.parse(rank), Color.parse(color), grade))
+
+        for e in entries:
+            try:
+                celebration = Celebration(
+                    e['title'], Rank.parse(e.get('rank', '')),
+                    Color.parse(e.get('color', '')),
+                    int(e.get('grade', self.GRADES[e.get('rank', '')][1])))
+                if celebration.rank is None or celebration.color is None:
+                    raise ValueError
+                if 'easter' in e:
+                    movable.append(
+                        ('easter', int(e['easter']), len(self.celebrations)))
+                else:
+                    month, day = (int(v) for v in e['date'].split('-'))
+                    date(2000, month, day)
+                    fixed.append((month, day, len(self.celebrations)))
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f'Ungültiger Kalendereintrag: {e!r}') \
+                    from None
+            self.celebrations.append(celebration)
+
+        self._fixed: Tuple[np.ndarray, np.ndarray, np.ndarray] = tuple(
+            np.array(v, dtype=np.int64) for v in zip(*fixed))
+        self._movable: Tuple[List[str], np.ndarray, np.ndarray] = (
+            [m[0] for m in movable],
+            np.array([m[1] for m in movable], dtype=np.int64),
+            np.array([m[2] for m in movable], dtype=np.int64))
+        self._ranks: np.ndarray = np.array(
+            [int(c.rank) for c in self.celebrations], dtype=np.int8)
+        self._years: Dict[int, CalendarYear] = dict()
+        self._events: Dict[date, List[Event]] = dict()
+
+    def build(self, first: int, last: int) -> None:
+        """
+        Berechnet alle Jahre von `first` bis einschließlich `last` in einem
+        Durchgang und hält sie vor.
+
+        Parameters
+        ----------
+        first : int
+            Erstes zu berechnendes Jahr.
+        last : int
+            Letztes zu berechnendes Jahr.
+        """
+        years = np.arange(first, last + 1)
+        months = (years - 1970).astype('datetime64[Y]').astype('datetime64[M]')
+        start = months[0].astype('datetime64[D]')
+        days = np.arange(start, np.datetime64(f'{last + 1:04d}-01-01'))
+        t = np.arange(len(days))
+        y = days.astype('datetime64[Y]').astype(np.int64) + 1970 - first
+        wd = (days.astype(np.int64) + 3) % 7
+
+        def at(month, day):
+            """Tagesnummer eines Datums je Jahr."""
+            d = (months + (month - 1)).astype('datetime64[D]') + (day - 1)
+            return (d - start).astype(np.int64)
+
+        # Bezugstage je Jahr
+        a, b, c = years % 19, years // 100, years % 100
+        d = (19 * a + b - b // 4 - ((b - (b + 8) // 25 + 1) // 3) + 15) % 30
+        e = (32 + 2 * (b % 4) + 2 * (c // 4) - d - (c % 4)) % 7
+        f = d + e - 7 * ((a + 11 * d + 22 * e) // 451) + 114
+        easter = at(f // 31, f % 31 + 1)
+        christmas = at(12, 25)
+        advent = christmas - 22 - wd[christmas]
+        epiphany = at(1, 6)
+        baptism = epiphany + 7 - (wd[epiphany] + 1) % 7
+        holyfamily = np.where(
+            wd[christmas] == 6, christmas + 5, christmas + 6 - wd[christmas])
+        anchors = {'easter': easter, 'advent': advent, 'baptism': baptism,
+                   'holyfamily': holyfamily}
+
+        # Abschnitte des Kirchenjahres und Wochen je Tag
+        E, A, B, C = easter[y], advent[y], baptism[y], christmas[y]
+        period = np.full(len(t), self.ORDINARY, dtype=np.int8)
+        period[t >= A] = self.ADVENT
+        period[(t >= C) | (t <= B)] = self.CHRISTMAS
+        period[(t >= E - 46) & (t < E - 7)] = self.LENT
+        period[(t >= E - 7) & (t < E)] = self.HOLYWEEK
+        period[(t >= E) & (t <= E + 49)] = self.EASTER
+        ordinary = period == self.ORDINARY
+        week = np.select(
+            [period == self.ADVENT, period == self.LENT,
+             period == self.EASTER, ordinary & (t < E), ordinary],
+            [(t - A) // 7 + 1, (t - E + 42) // 7 + 1, (t - E) // 7 + 1,
+             (t - B) // 7 + 1, 34 - (A - 7 - t + 6) // 7], 0)
+
+        # Rangstufen der Tage ohne eigene Feier
+        sunday = wd == 6
+        strong = np.isin(period, (self.ADVENT, self.LENT, self.HOLYWEEK,
+                                  self.EASTER))
+        grade = np.where(sunday, np.where(strong, 2, 6), 13)
+        weekday = ~sunday
+        grade[weekday & (period == self.LENT)] = 9
+        grade[weekday & (period == self.ADVENT) & (t >= C - 8)] = 9
+        grade[(period == self.CHRISTMAS) & (t > C)] = 9
+        grade[weekday & (period == self.HOLYWEEK)] = 2
+        grade[(t > E) & (t < E + 7)] = 2
+
+        # Alle Kandidaten nach Tag, Stufe und Herkunft sortieren
+        fmonths, fdays, fids = self._fixed
+        fixed = at(fmonths[:, None], fdays[:, None])
+        names, offsets, mids = self._movable
+        movable = np.stack([anchors[n] for n in names]) + offsets[:, None]
+        cgrades = np.array([c.grade for c in self.celebrations])
+        idx = np.concatenate([t, fixed.ravel(), movable.ravel()])
+        ids = np.concatenate([np.full(len(t), -1), np.repeat(fids, len(years)),
+                              np.repeat(mids, len(years))])
+        grades = np.concatenate([grade, cgrades[ids[len(t):]]])
+        base = np.concatenate([np.ones(len(t)), np.zeros(len(ids) - len(t))])
+        valid = (idx >= 0) & (idx < len(t))
+        idx, ids, grades, base = idx[valid], ids[valid], grades[valid], \
+            base[valid]
+        order = np.lexsort((base, grades, idx))
+        idx, ids, grades = idx[order], ids[order], grades[order]
+        first_of_day = np.r_[True, idx[1:] != idx[:-1]]
+        celebration, grade = ids[first_of_day], grades[first_of_day]
+
+        # Verdrängte Hochfeste auf den nächsten freien Tag verlegen
+        losers = np.flatnonzero(~first_of_day & (grades <= 4) & (ids >= 0))
+        for i in losers:
+            free = np.flatnonzero(grade[idx[i] + 1:] > 8)
+            if not len(free): continue
+            j = idx[i] + 1 + free[0]
+            celebration[j], grade[j] = ids[i], grades[i]
+
+        # Nichtgebotene Gedenktage an einfachen Wochentagen
+        extras = np.flatnonzero(~first_of_day & (grades == 12)
+                                & (grade[idx] == 13))
+
+        bounds = np.append(at(1, 1), len(t))
+        for n, year in enumerate(years):
+            lo, hi = bounds[n], bounds[n + 1]
+            extra: Dict[int, List[int]] = dict()
+            for i in extras[(idx[extras] >= lo) & (idx[extras] < hi)]:
+                extra.setdefault(int(idx[i] - lo), list()).append(int(ids[i]))
+            self._years[int(year)] = CalendarYear(
+                date(int(year), 1, 1), celebration[lo:hi], grade[lo:hi],
+                period[lo:hi], week[lo:hi], extra)
+
+    def get(self, d: date) -> List[Event]:
+        """
+        Gibt die Events eines Tages nach Wichtigkeit sortiert zurück.
+
+        Parameters
+        ----------
+        d : date
+            Abzufragender Tag.
+        """
+        events = self._events.get(d)
+        if events is None:
+            year = self.year(d.year)
+            events = self._day(year, (d - year.start).days)
+            if len(self._events) > 4000: self._events.clear()
+            self._events[d] = events
+        return list(events)
+
+    def range(self, start: date, end: date) -> List[Event]:
+        """
+        Gibt die Events eines Zeitraums nach Datum und Wichtigkeit sortiert
+        zurück.
+
+        Parameters
+        ----------
+        start : date
+            Erster Tag des Zeitraums.
+        end : date
+            Letzter Tag des Zeitraums (einschließlich).
+        """
+        missing = [y for y in range(start.year, end.year + 1)
+                   if y not in self._years]
+        if missing: self.build(min(missing), max(missing))
+        return [e for n in range((end - start).days + 1)
+                for e in self.get(start + timedelta(days=n))]
+
+    def rank(self, year: int, rank: Rank) -> List[Event]:
+        """
+        Gibt alle Events eines Jahres mit einem Rang nach Datum sortiert
+        zurück, etwa alle Hochfeste.
+
+        Parameters
+        ----------
+        year : int
+            Abzufragendes Jahr.
+        rank : Rank
+            Gesuchter Rang.
+        """
+        y = self.year(year)
+        ranks = np.where(y.celebration >= 0, self._ranks[y.celebration], 0)
+        days = set(np.flatnonzero(ranks == int(rank)).tolist()) | set(y.extra)
+        return [e for i in sorted(days)
+                for e in self.get(y.start + timedelta(days=i))
+                if e.rank == rank]
+
+    def year(self, year: int) -> CalendarYear:
+        """
+        Gibt ein berechnetes Jahr zurück und berechnet es ggf.
+
+        Parameters
+        ----------
+        year : int
+            Gewünschtes Jahr.
+        """
+        if year not in self._years: self.build(year, year)
+        return self._years[year]
+
+    def _day(self, year: CalendarYear, i: int) -> List[Event]:
+        """Interne Methode, die die Events eines Tages erstellt."""
+        d = year.start + timedelta(days=i)
+        events = list()
+        for c in [int(year.celebration[i])] + year.extra.get(i, list()):
+            if c >= 0:
+                celebration = self.celebrations[c]
+                events.append(Event(
+                    title=celebration.title, date=d, color=celebration.color,
+                    importance=celebration.grade, rank=celebration.rank))
+                continue
+            period = int(year.period[i])
+            color = Color.WHITE
+            if period in (self.ADVENT, self.LENT, self.HOLYWEEK):
+                color = Color.VIOLET
+            elif period == self.ORDINARY:
+                color = Color.GREEN
+            events.append(Event(
+                title=self._title(d, period, int(year.week[i])), date=d,
+                color=color, importance=int(year.grade[i])))
+        return events
+
+    def _title(self, d: date, period: int, week: int) -> str:
+        """Interne Methode, die einen Tag ohne eigene Feier benennt."""
+        name = ('Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag',
+                'Samstag', 'Sonntag')[d.weekday()]
+        if d.weekday() == 6:
+            if period == self.ADVENT: return f'{week}. Adventssonntag'
+            if period == self.LENT: return f'{week}. Fastensonntag'
+            if period == self.EASTER: return f'{week}. Sonntag der Osterzeit'
+            if period == self.CHRISTMAS: return '2. Sonntag nach Weihnachten'
+            return f'{week}. Sonntag im Jahreskreis'
+        if period == self.ADVENT: return f'{name} der {week}. Adventswoche'
+        if period == self.CHRISTMAS: return f'{name} der Weihnachtszeit'
+        if period == self.LENT:
+            if not week: return f'{name} nach Aschermittwoch'
+            return f'{name} der {week}. Fastenwoche'
+        if period == self.HOLYWEEK: return f'{name} der Karwoche'
+        if period == self.EASTER:
+            if week == 1: return f'{name} der Osteroktav'
+            return f'{name} der {week}. Osterwoche'
+        return f'{name} der {week}. Woche im Jahreskreis'
+
+    @staticmethod
+    def table(kalender: str, path: str = None) -> List[dict]:
+        """
+        Liest die regionalen Einträge eines Kalenders aus einer Tabelle,
+        standardmäßig der mitgelieferten `regional.json`. Ein Kalender kann
+        über `extends` die Einträge eines anderen übernehmen.
+
+        Parameters
+        ----------
+        kalender : str
+            Bezeichnung des Kalenders.
+        path : str (optional)
+            Pfad zu einer Tabelle im gleichen Format.
+
+        Raises
+        ------
+        ValueError
+            Falls die Tabelle nicht gelesen werden kann.
+        """
+        if path is None:
+            path = os.path.join(os.path.dirname(__file__), 'regional.json')
+        try:
+            with open(path, encoding='utf-8') as f: tables = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f'Kalendertabelle {path} unlesbar: {e}') \
+                from None
+        entries, seen = list(), set()
+        while kalender in tables and kalender not in seen:
+            seen.add(kalender)
+            entries = list(tables[kalender].get('entries', ())) + entries
+            kalender = tables[kalender].get('extends')
+        return entries
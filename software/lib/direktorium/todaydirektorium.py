@@ -1,6 +1,7 @@
 from datetime import date, timedelta
 from typing import List
 
+from ..clock import Clock
 from .direktorium import Direktorium
 from .event import Event
 from .season import Season
@@ -9,10 +10,12 @@ from .season import Season
 class TodayDirektorium(Direktorium):
     """
     Eine Erweiterung der Direktoriumsklasse, die Ausgaben auf den heutigen Tag
-    bezieht und cacht.
+    bezieht und cacht. Welcher Tag heute ist, bestimmt die übergebene Uhr.
 
     Attributes
     ----------
+    clock : Clock
+        Uhr, nach der sich der heutige Tag richtet.
     _last_date : date
         Letztes Datum, zu dem gecacht wurde.
     _last_get : List[Event]
@@ -26,42 +29,70 @@ class TodayDirektorium(Direktorium):
     -------
     easter() : date
         Cacht das aktuelle Osterdatum.
-    get() : List[Event]
-        Gibt die Events des heutigen Tages zurück.
-    season() : Season
-        Gibt die Zeit im Kirchenjahr des heutigen Tages zurück.
+    get(d) : List[Event]
+        Gibt die Events des heutigen oder eines anderen Tages zurück.
+    season(d) : Season
+        Gibt die Zeit im Kirchenjahr des heutigen oder eines anderen Tages
+        zurück.
     _check()
         Interne Methode, die das cachen nachhält.
     """
 
-    def __init__(self, *params, **kwargs):
-        """Erstellt das Objekt und bereitet das Caching vor."""
+    def __init__(self, *params, clock: Clock = None, **kwargs):
+        """
+        Erstellt das Objekt und bereitet das Caching vor.
+
+        Parameters
+        ----------
+        clock : Clock (optional)
+            Uhr, nach der sich der heutige Tag richtet, standardmäßig die
+            Systemuhr.
+        """
         super().__init__(*params, **kwargs)
-        self._last_date = date.today() - timedelta(days=1)
+        self.clock: Clock = clock or Clock()
+        self._last_date = self.clock.today() - timedelta(days=1)
 
     def easter(self) -> date:
         """Cacht das Osterdatum für das aktuelle Jahr."""
         self._check()
         return self._last_easter
 
-    def get(self) -> List[Event]:
-        """Gibt eine Liste von heute stattfindenden Events zurück."""
+    def get(self, d: date = None) -> List[Event]:
+        """
+        Gibt eine Liste von Events zurück. Nur der heutige Tag wird gecacht.
+
+        Parameters
+        ----------
+        d : date (optional)
+            Abzufragender Tag, standardmäßig heute.
+        """
+        if d is not None and d != self.clock.today(): return super().get(d)
         self._check()
         return self._last_get
 
-    def season(self) -> Season:
-        """Ermittelt die aktuelle Zeit im Kirchenjahr."""
+    def season(self, d: date = None) -> Season:
+        """
+        Ermittelt die Zeit im Kirchenjahr. Nur der heutige Tag wird gecacht.
+
+        Parameters
+        ----------
+        d : date (optional)
+            Abzufragender Tag, standardmäßig heute.
+        """
+        if d is not None and d != self.clock.today():
+            return super().season(d)
         self._check()
         return self._last_season
 
     def _check(self) -> None:
         """
         Interne Methode, die überprüft, ob gecacht werden muss und dies ggf.
-        tut.
+        tut. Liegt das Jahr noch nicht vor, wird bis zu seinem Eintreffen bei
+        jeder Abfrage erneut nachgesehen.
         """
-        today = date.today()
+        today = self.clock.today()
         if self._last_date >= today: return
         self._last_get = super().get(today)
         self._last_season = super().season(today)
         self._last_easter = Direktorium.easter(today.year)
-        self._last_date = today
+        if self.available(today.year): self._last_date = today
@@ -1,13 +1,15 @@
-from datetime import date, timedelta
-import schedule
+from datetime import date
+from threading import Lock, Thread
+from typing import Dict
 
-from .direktorium.rank import Rank
-from .direktorium.season import Season
 from .direktorium.todaydirektorium import TodayDirektorium
 
+from .clock import Clock
 from .melody import Melody
 from .striker import Striker
 from .settings import DirektoriumSettings, Settings
+from .timerservice import TimerService
+from .timetable import Timetable, TimetableDay
 
 
 class DirektoriumProxy:
@@ -17,6 +19,8 @@ class DirektoriumProxy:
 
     Attributes
     ----------
+    clock : Clock
+        Uhr der Zeitsteuerung, nach der sich der Tag richtet.
     direktorium : TodayDirektorium
         Ein gecachtes Direktorium, das über den liturgischen Kalender Auskunft
         gibt.
@@ -27,13 +31,29 @@ class DirektoriumProxy:
     theme_modified : bool
         Ob das Theme vom Schlagwerk angepasst wurde - das erlaubt eine
         nachträgliche Rückanpassung.
+    timetables : Dict[int, Timetable]
+        Bereits berechnete Jahresfahrpläne.
+    _entry : TimetableDay
+        Zuletzt nachgeschlagener Tag des Fahrplans.
+    _prefetching : Lock
+        Wird gehalten, solange im Hintergrund geladen wird.
+    _timetabling : Lock
+        Sichert das Berechnen der Fahrpläne zwischen Threads ab.
 
     Methods
     -------
-    _marianic_antiphon(melody, hours, quarters) : Melody
+    entry(day) : TimetableDay
+        Gibt den Eintrag eines Tages im Jahresfahrplan zurück.
+    timetable(year) : Timetable
+        Gibt den Jahresfahrplan zurück und berechnet ihn bei Bedarf neu.
+    _fetch_ahead()
+        Lädt fehlende oder veraltete Jahre des Direktoriums.
+    _marianic_antiphon(melody, hours, quarters, day) : Melody
         Fügt bei Bedarf die passende marianische Antiphon an die Melodie an.
-    _mute_easter(melody, hours, quarters) : Melody
+    _mute_easter(melody, hours, quarters, day) : Melody
         Stellt sicher, dass das Stundengeläut zum Triduum Paschale ruhig ist.
+    _prefetch()
+        Startet das Laden des Direktoriums im Hintergrund.
     _theme_selector()
         Kann das Stundengeläut-Theme für Festtage anpassen.
     """
@@ -50,31 +70,98 @@ class DirektoriumProxy:
         """
         self.striker: Striker = striker
         self.settings: DirektoriumSettings = Settings().direktorium
+        timers = TimerService.shared()
+        self.clock: Clock = timers.clock
         self.direktorium: TodayDirektorium = TodayDirektorium(
-            kalender=self.settings.kalender, cache_dir=self.settings.cachedir)
+            kalender=self.settings.kalender, cache_dir=self.settings.cachedir,
+            blocking=False, timeout=self.settings.timeout,
+            source=self.settings.source, regional=self.settings.regional,
+            url=self.settings.api, clock=self.clock)
+
+        self.timetables: Dict[int, Timetable] = dict()
+        self._entry: TimetableDay = None
+        self._timetabling: Lock = Lock()
 
         if self.settings.eastermute: self.striker.subscribe(self._mute_easter)
         if self.settings.antiphon is not None:
             self.striker.subscribe(self._marianic_antiphon)
 
         self.theme_modified: bool = False
-        schedule.every().day.at('00:00').do(self._theme_selector)
+        timers.add(TimerService.daily(0, 0), self._theme_selector)
+
+        self._prefetching: Lock = Lock()
+        if self.settings.source == 'local': return
+        timers.add(TimerService.daily(3, 0), self._prefetch,
+                   'direktorium prefetch')
+        self._prefetch()
+
+    def entry(self, day: date) -> TimetableDay:
+        """
+        Gibt den Eintrag eines Tages im Jahresfahrplan zurück. Der zuletzt
+        nachgeschlagene Tag wird vorgehalten, sodass die Observer je
+        Viertelstunde nur noch einen Vergleich kosten.
+        """
+        entry = self._entry
+        if entry is not None and entry.day == day: return entry
+        entry = self._entry = self.timetable(day.year).get(day)
+        return entry
+
+    def timetable(self, year: int) -> Timetable:
+        """
+        Gibt den Jahresfahrplan zurück. Er wird nur neu berechnet, wenn sich
+        die Kalenderdaten des Jahres oder die Einstellungen des Direktoriums
+        seit der letzten Berechnung geändert haben.
+
+        Parameters
+        ----------
+        year : int
+            Jahr des Fahrplans.
+        """
+        signature = (self.settings.json(), self.direktorium.version(year))
+        with self._timetabling:
+            table = self.timetables.get(year)
+            if table is not None and table.signature == signature:
+                return table
+            table = Timetable.compile(
+                year, self.direktorium, self.settings, signature)
+            self.timetables[year] = table
+            self._entry = None
+        print(f'Compiled timetable for {year}')
+        return table
+
+    def _fetch_ahead(self) -> None:
+        """
+        Lädt das aktuelle Jahr und ab `prefetch` Tagen vor Jahresende das
+        Folgejahr, sofern sie fehlen oder älter als `maxage` Tage sind. Ändert
+        sich dadurch der Fahrplan des aktuellen Jahres, werden Theme und
+        Tagesplan neu bestimmt.
+        """
+        with self._prefetching:
+            today, maxage = self.clock.today(), self.settings.maxage * 86400
+            years = [today.year]
+            left = (date(today.year, 12, 31) - today).days
+            if left < self.settings.prefetch: years.append(today.year + 1)
+            for year in years:
+                if self.direktorium.fresh(year, maxage): continue
+                before = self.timetables.get(year)
+                if not self.direktorium.fetch(
+                        year, self.settings.retries, self.settings.backoff):
+                    continue
+                print(f'Direktorium {year} fetched')
+                if self.timetable(year) is before or year != today.year:
+                    continue
+                self._theme_selector()
+                self.striker.replan(today)
 
     def _marianic_antiphon(
-        self, melody: Melody, hours: int, quarters: int
+        self, melody: Melody, hours: int, quarters: int, day: date
     ) -> Melody:
         """Callback, das bei Bedarf eine marianische Antiphon anhängt."""
         h, q = self.settings.antiphon.split(':')
         if hours != int(h) or quarters != int(q) // 15: return melody
 
-        season = self.direktorium.season()
-        apath = self.settings.antiphon_ordinary
-        if season == Season.CHRISTMAS:
-            apath = self.settings.antiphon_christmas
-        elif season == Season.LENT:
-            apath = self.settings.antiphon_lent
-        elif season == Season.EASTER:
-            apath = self.settings.antiphon_easter
+        apath = self.entry(day).antiphon
+        if apath is None: return melody
         antiphon = Melody.from_file(apath)
         antiphon.transpose = self.settings.antiphon_transpose
         antiphon.tempo = self.settings.antiphon_tempo
@@ -82,34 +169,31 @@ class DirektoriumProxy:
         return melody + antiphon
 
     def _mute_easter(
-        self, melody: Melody, hours: int, quarters: int
+        self, melody: Melody, hours: int, quarters: int, day: date
     ) -> Melody:
         """Callback, das vor Ostern für Ruhe sorgt."""
-        easter = self.direktorium.easter()
-        if date.today() == easter - timedelta(days=1): return None
-        if date.today() == easter - timedelta(days=2): return None
-        return melody
+        return None if self.entry(day).eastermute else melody
+
+    def _prefetch(self) -> None:
+        """
+        Startet das Laden des Direktoriums in einem Hintergrundthread, sodass
+        Schlagwerk und Zeitsteuerung nie auf das Netz warten. Läuft bereits
+        ein Ladevorgang, passiert nichts.
+        """
+        if self._prefetching.locked(): return
+        Thread(target=self._fetch_ahead, daemon=True).start()
 
     def _theme_selector(self) -> None:
-        """Wählt ggf. nach Tagesrang ein anderes Theme aus."""
-        event = self.direktorium.get()[0]
-        rank = event.rank
-        if rank == Rank.HOCHFEST and self.settings.theme_hochfest is not None:
-            self.striker.theme = self.settings.theme_hochfest
-            self.theme_modified = True
-        elif rank == Rank.FEST and self.settings.theme_fest is not None:
-            self.striker.theme = self.settings.theme_fest
-            self.theme_modified = True
-        elif rank == Rank.GEBOTEN and self.settings.theme_geboten is not None:
-            self.striker.theme = self.settings.theme_geboten
-            self.theme_modified = True
-        elif rank == Rank.NICHTGEBOTEN and \
-                self.settings.theme_nichtgeboten is not None:
-            self.striker.theme = self.settings.theme_nichtgeboten
-            self.theme_modified = True
-        elif 'sonntag' in event.title.lower():
-            self.striker.theme = self.settings.theme_sonntag
-            self.theme_modified = True
-        elif self.theme_modified:
-            self.striker.theme = Settings().striker.theme
-            self.theme_modified = False
+        """
+        Wählt ggf. laut Jahresfahrplan ein anderes Theme aus. Lehnt das
+        Schlagwerk das Theme ab, bleibt das bisherige aktiv.
+        """
+        theme = self.entry(self.clock.today()).theme
+        if theme is None and not self.theme_modified: return
+
+        try:
+            self.striker.theme = theme or Settings().striker.theme
+        except ValueError as e:
+            print(f'Rejected theme: {e}')
+            return
+        self.theme_modified = theme is not None
@@ -0,0 +1,349 @@
+from collections import deque
+from importlib import import_module
+import mido
+from threading import Condition, Thread
+import time
+from typing import Any, Deque, Dict, List, Tuple
+
+from .melody import Melody
+from .settings import CarillonSettings, PortSettings
+from .wireport import WirePort
+
+
+class FanOutPort:
+    """
+    Ein Ausgang des `FanOut` mit eigener Warteschlange und eigenem Thread. Ein
+    langsamer oder blockierender Port hält so nur sich selbst auf.
+
+    Attributes
+    ----------
+    delay : float
+        Anzahl an Sekunden, um die Nachrichten an diesen Port verzögert
+        werden, damit alle Ports trotz unterschiedlicher Latenz gleichzeitig
+        erklingen.
+    limit : int
+        Maximale Länge der Warteschlange. Läuft sie über, werden die ältesten
+        Nachrichten verworfen.
+    name : str
+        Name des Ports für die Statistik.
+    output : WirePort
+        Adapter, über den die Nachrichten an den Port gehen.
+    thread : Thread
+        Thread, der die Warteschlange abarbeitet.
+    transpose : int
+        Anzahl an Halbtönen, um die alle Noten an diesem Port transponiert
+        werden.
+    _condition : Condition
+        Sichert die Warteschlange zwischen den Threads ab.
+    _queue : Deque[Tuple[float, bytes]]
+        Wartende Nachrichten samt Sendezeitpunkt (`time.perf_counter`); `None`
+        statt Bytes steht für ein Zurücksetzen.
+    _stats : Dict[str, float]
+        Interne Zähler für die Sendestatistik.
+
+    Methods
+    -------
+    prepare(melody)
+        Gibt eine demnächst gespielte Melodie an den Port weiter.
+    reset()
+        Verwirft wartende Nachrichten und setzt den Port zurück.
+    send(data, now)
+        Reiht eine Gruppe von Nachrichten ein.
+    stats() : Dict[str, Any]
+        Gibt die Sendestatistik des Ports zurück.
+    _work()
+        Schleife des Sendethreads.
+
+    Static Methods
+    --------------
+    transposed(data, transpose) : bytes
+        Transponiert die Noten einer Gruppe von Nachrichten.
+    """
+
+    def __init__(
+        self, port: Any, name: str, delay: float = 0, transpose: int = 0,
+        limit: int = 1024
+    ):
+        """
+        Erstellt den Ausgang und startet seinen Sendethread.
+
+        Parameters
+        ----------
+        port : Any
+            Der eigentliche MIDI-Port.
+        name : str
+            Name des Ports für die Statistik.
+        delay : float (optional)
+            Verzögerung der Nachrichten an diesen Port in Sekunden.
+        transpose : int (optional)
+            Transponierung der Noten an diesem Port in Halbtönen.
+        limit : int (optional)
+            Maximale Länge der Warteschlange.
+        """
+        self.output: WirePort = WirePort(port)
+        self.name: str = name
+        self.delay: float = delay
+        self.transpose: int = transpose
+        self.limit: int = limit
+        self._condition: Condition = Condition()
+        self._queue: Deque[Tuple[float, bytes]] = deque()
+        self._stats: Dict[str, float] = dict(
+            sent=0, dropped=0, send_sum=0, send_max=0, late_sum=0,
+            late_max=0, max_depth=0)
+        self.thread: Thread = Thread(target=self._work, daemon=True)
+        self.thread.start()
+
+    def prepare(self, melody: Melody) -> None:
+        """
+        Gibt eine demnächst gespielte Melodie an den Port weiter, sofern er
+        sich darauf vorbereiten kann (wie der eingebaute Renderer, der dann
+        die benötigten Samples wandelt).
+        """
+        port = self.output.port
+        if hasattr(port, 'prepare'): port.prepare(melody)
+
+    def reset(self) -> None:
+        """
+        Verwirft alle wartenden Nachrichten und lässt den Port im Sendethread
+        zurücksetzen, ohne darauf zu warten.
+        """
+        with self._condition:
+            self._queue.clear()
+            self._queue.append((0, None))
+            self._condition.notify()
+
+    def send(self, data: bytes, now: float) -> None:
+        """
+        Reiht eine Gruppe vorkodierter Nachrichten ein, die nach der
+        Verzögerung des Ports gesendet wird.
+
+        Parameters
+        ----------
+        data : bytes
+            Aneinandergereihte, vollständige MIDI-Nachrichten.
+        now : float
+            Sollzeitpunkt (`time.perf_counter`) der Nachrichten.
+        """
+        if self.transpose: data = self.transposed(data, self.transpose)
+        with self._condition:
+            if len(self._queue) >= self.limit:
+                self._queue.popleft()
+                self._stats['dropped'] += 1
+            self._queue.append((now + self.delay, data))
+            self._stats['max_depth'] = max(
+                self._stats['max_depth'], len(self._queue))
+            self._condition.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Gibt die Sendestatistik des Ports zurück: Anzahl gesendeter und
+        verworfener Gruppen, aktuelle und maximale Tiefe der Warteschlange,
+        mittlere und maximale Dauer eines Sendeaufrufs sowie mittlere und
+        maximale Verspätung gegenüber dem Sendezeitpunkt in Sekunden. Beim
+        eingebauten Renderer kommen Belegung und Trefferquote der Samples
+        hinzu.
+        """
+        port = self.output.port
+        samples = {'samples': port.bank.stats()} \
+            if hasattr(port, 'bank') else {}
+        with self._condition:
+            sent = self._stats['sent']
+            return {
+                'delay': self.delay,
+                'transpose': self.transpose,
+                'sent': sent,
+                'dropped': self._stats['dropped'],
+                'depth': len(self._queue),
+                'max_depth': self._stats['max_depth'],
+                'send_mean': self._stats['send_sum'] / sent if sent else 0,
+                'send_max': self._stats['send_max'],
+                'late_mean': self._stats['late_sum'] / sent if sent else 0,
+                'late_max': self._stats['late_max'],
+                **samples,
+            }
+
+    def _work(self) -> None:
+        """
+        Interne Schleife des Sendethreads, die jede Gruppe zu ihrem
+        Sendezeitpunkt an den Port übergibt.
+        """
+        while True:
+            with self._condition:
+                while True:
+                    if not self._queue:
+                        self._condition.wait()
+                        continue
+                    due = self._queue[0][0]
+                    remaining = due - time.perf_counter()
+                    if remaining <= 0: break
+                    self._condition.wait(remaining)
+                data = self._queue.popleft()[1]
+
+            if data is None:
+                self.output.reset()
+                continue
+            start = time.perf_counter()
+            self.output.send(data)
+            end = time.perf_counter()
+
+            with self._condition:
+                duration, late = end - start, start - due
+                self._stats['sent'] += 1
+                self._stats['send_sum'] += duration
+                self._stats['send_max'] = max(
+                    self._stats['send_max'], duration)
+                self._stats['late_sum'] += late
+                self._stats['late_max'] = max(self._stats['late_max'], late)
+
+    @staticmethod
+    def transposed(data: bytes, transpose: int) -> bytes:
+        """
+        Transponiert alle `note_on`- und `note_off`-Nachrichten einer Gruppe.
+
+        Parameters
+        ----------
+        data : bytes
+            Aneinandergereihte, vollständige MIDI-Nachrichten.
+        transpose : int
+            Anzahl an Halbtönen.
+        """
+        out = bytearray(data)
+        i = 0
+        for msg in WirePort.split(data):
+            if msg[0] & 0xE0 == 0x80:
+                out[i + 1] = max(0, min(127, msg[1] + transpose))
+            i += len(msg)
+        return bytes(out)
+
+
+class FanOut:
+    """
+    Port, der jede Nachricht des Carillons an mehrere Ausgänge verteilt, etwa
+    an das Turmcarillon, ein Übungsinstrument und einen Kontrollsynthesizer.
+    Jeder Ausgang hat eine eigene Latenz und Transponierung und sendet aus
+    einem eigenen Thread, sodass ein langsamer Ausgang die übrigen nicht
+    aufhält.
+
+    Die Latenz eines Ausgangs gibt an, wie lange er vom Empfang einer
+    Nachricht bis zum Erklingen braucht. Ausgänge mit geringerer Latenz
+    erhalten ihre Nachrichten um die Differenz zur größten Latenz später,
+    damit alle gleichzeitig erklingen.
+
+    Vorab gerenderte Puffer (`play`, `bounce`) bietet die Verteilung nicht
+    an, da sie nur für einen Renderer, nicht aber für die übrigen Ausgänge
+    gelten. Melodien werden jedoch über `prepare` an alle Ausgänge
+    weitergegeben, die sich darauf vorbereiten können.
+
+    Attributes
+    ----------
+    ports : List[FanOutPort]
+        Die einzelnen Ausgänge.
+    renderers : List[Any]
+        Ausgänge, die vorab gerenderte Puffer abspielen könnten.
+
+    Methods
+    -------
+    close()
+        Schließt alle Ports, die geschlossen werden können.
+    prepare(melody)
+        Gibt eine demnächst gespielte Melodie an alle Ausgänge weiter.
+    reset()
+        Setzt alle Ausgänge zurück.
+    send(msg)
+        Verteilt eine `mido.Message`.
+    send_bytes(data)
+        Verteilt vorkodierte MIDI-Nachrichten.
+    stats() : Dict[str, Dict[str, Any]]
+        Gibt die Sendestatistik je Ausgang zurück.
+
+    Class Methods
+    -------------
+    open(settings) : FanOut
+        Öffnet alle in den Einstellungen angegebenen Ports.
+
+    Static Methods
+    --------------
+    _open_port(cfg, settings) : Any
+        Öffnet einen einzelnen Port.
+    """
+
+    def __init__(self, ports: List[FanOutPort]):
+        """
+        Erstellt die Verteilung auf die übergebenen Ausgänge.
+
+        Parameters
+        ----------
+        ports : List[FanOutPort]
+            Die einzelnen Ausgänge.
+        """
+        self.ports: List[FanOutPort] = ports
+
+    def close(self) -> None:
+        """Schließt alle Ports, die geschlossen werden können."""
+        for p in self.ports:
+            if hasattr(p.output.port, 'close'): p.output.port.close()
+
+    @property
+    def renderers(self) -> List[Any]:
+        """Ausgänge, die vorab gerenderte Puffer abspielen könnten."""
+        return [p.output.port for p in self.ports
+                if hasattr(p.output.port, 'bounce')]
+
+    def prepare(self, melody: Melody) -> None:
+        """
+        Gibt eine demnächst gespielte Melodie an alle Ausgänge weiter, die
+        sich darauf vorbereiten können.
+        """
+        for p in self.ports: p.prepare(melody)
+
+    def reset(self) -> None:
+        """Setzt alle Ausgänge zurück, ohne auf langsame Ports zu warten."""
+        for p in self.ports: p.reset()
+
+    def send(self, msg: mido.Message) -> None:
+        """Verteilt eine `mido.Message` an alle Ausgänge."""
+        self.send_bytes(bytes(msg.bytes()))
+
+    def send_bytes(self, data: bytes) -> None:
+        """
+        Verteilt vorkodierte MIDI-Nachrichten an alle Ausgänge.
+
+        Parameters
+        ----------
+        data : bytes
+            Aneinandergereihte, vollständige MIDI-Nachrichten.
+        """
+        now = time.perf_counter()
+        for p in self.ports: p.send(data, now)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Gibt die Sendestatistik je Ausgang zurück."""
+        return {p.name: p.stats() for p in self.ports}
+
+    @classmethod
+    def open(cls, settings: CarillonSettings) -> 'FanOut':
+        """
+        Öffnet alle unter `ports` in den Einstellungen angegebenen Ports. Der
+        Name `renderer` startet den eingebauten Renderer, alle anderen Namen
+        werden über `mido.open_output` geöffnet (leer für den Standardport).
+
+        Parameters
+        ----------
+        settings : CarillonSettings
+            Einstellungen mit der Liste der Ports.
+        """
+        latency = max(p.latency for p in settings.ports)
+        ports = list()
+        for i, cfg in enumerate(settings.ports):
+            ports.append(FanOutPort(
+                cls._open_port(cfg, settings), cfg.name or f'port{i}',
+                latency - cfg.latency, cfg.transpose))
+        return cls(ports)
+
+    @staticmethod
+    def _open_port(cfg: PortSettings, settings: CarillonSettings) -> Any:
+        """Interne Methode, die einen einzelnen Port öffnet."""
+        if cfg.name == 'renderer':
+            renderer = import_module('.renderer', __package__)
+            return renderer.Renderer.open(settings)
+        return mido.open_output(cfg.name)
@@ -19,7 +19,7 @@ class FestivePlayer:
 
     Methods
     -------
-    _festive_play(melody, hours, quarters) : Melody
+    _festive_play(melody, hours, quarters, day) : Melody
         Internes Callback, um die Melodie zu injizieren.
     """
 
@@ -41,10 +41,10 @@ class FestivePlayer:
         for d in data: self.festives[(d['day'], d['month'])].append(d)
 
     def _festive_play(
-        self, melody: Melody, hours: int, quarters: int
+        self, melody: Melody, hours: int, quarters: int, day: date
     ) -> Melody:
         """Callback, das bei bestimmten Festen eine Melodie anhängt."""
-        today = (date.today().day, date.today().month)
+        today = (day.day, day.month)
         if today not in self.festives: return melody
 
         for d in self.festives[today]:
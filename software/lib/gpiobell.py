@@ -1,5 +1,4 @@
 from importlib import import_module
-from threading import Thread
 import time
 
 from .carillon import Carillon
@@ -9,28 +8,30 @@ from .settings import BellSettings, Settings
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    import board
-    import digitalio
+    from RPi import GPIO
 
 
 class GpioBell:
     """
     Klasse, die für die Verwendung im RaspberryPi geeignet ist, um auf
-    Knopfdruck (etwa eine Klingel) zu reagieren.
+    Knopfdruck (etwa eine Klingel) zu reagieren. Der Knopf wird nicht
+    abgefragt: Jeder Flankenwechsel am Eingang löst einen Callback aus.
 
     Attributes
     ----------
-    button : digitalio.DigitalInOut
-        GPIO-Objekt, mit dem der Knopf abgefragt werden kann.
     carillon : Carillon
         Carillon, über das die Melodie gespielt wird.
     client : MqttClient
         MQTT-Client, über den der Knopfzustand mitgeteilt wird.
+    pin : int
+        BCM-Nummer des GPIO-Eingangs, an dem der Knopf liegt.
     played_time : float
         Letzter Zeitpunkt, zu dem die Melodie abgespielt wurde. Wird benötigt,
         um eine Totzeit für die Melodie zu ermitteln.
     pressed : bool
         Abstrahiert den Knopfzustand.
+    was_pressed : bool
+        Zuletzt mitgeteilter Knopfzustand.
     settings : BellSettings
         Einstellungsobjekt, das individuelle Anpassungen enthält.
 
@@ -38,15 +39,15 @@ class GpioBell:
     -------
     play()
         Spielt die Klingelmelodie ab.
-    _loop()
-        Interne Methode, die immer wieder den Status prüft.
+    _edge(channel)
+        Interner Callback, der auf Flankenwechsel am Knopf reagiert.
     _publish_btn_state(state)
         Teilt dem MQTT-Server einen bestimmten Status mit.
     """
 
     def __init__(self, carillon: Carillon, client: MqttClient):
         """
-        Erstellt das Objekt und einen Thread, der auf Knopfänderungen reagiert.
+        Erstellt das Objekt und meldet eine Flankenerkennung für den Knopf an.
 
         Parameters
         ----------
@@ -61,14 +62,13 @@ class GpioBell:
         self.settings: BellSettings = Settings().bell
         if self.settings.button is None: return
 
-        # Nachträgliches Importieren der RPi-spezifischen Bibliotheken
-        globals()['board'] = import_module('board')
-        globals()['digitalio'] = import_module('digitalio')
+        # Nachträgliches Importieren der RPi-spezifischen Bibliothek
+        globals()['GPIO'] = import_module('RPi.GPIO')
 
-        # Knopf-Eingang vorbereiten
-        self.button = digitalio.DigitalInOut(
-            board.__dict__[self.settings.button])
-        self.button.direction = digitalio.Direction.INPUT
+        # Knopf-Eingang vorbereiten (`D26` entspricht BCM 26)
+        self.pin: int = int(self.settings.button.lstrip('D'))
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(self.pin, GPIO.IN)
 
         # Vorbereiten des MQTT-Clients
         self.client: MqttClient = client
@@ -76,7 +76,9 @@ class GpioBell:
 
         self.carillon: Carillon = carillon
         self.played_time: float = 0
-        Thread(target=self._loop, daemon=True).start()
+        self.was_pressed: bool = False
+        GPIO.add_event_detect(self.pin, GPIO.BOTH, callback=self._edge,
+                              bouncetime=20)
 
     @property
     def pressed(self) -> bool:
@@ -84,7 +86,7 @@ class GpioBell:
         Abstrahiert den Knopfzustand: hier nämlich invertiert (`False` bedeutet
         gedrückt).
         """
-        return not self.button.value
+        return not GPIO.input(self.pin)
 
     def play(self) -> None:
         """
@@ -101,17 +103,17 @@ class GpioBell:
         melody.tempo = self.settings.tempo
         self.carillon.play(melody, self.settings.priority)
 
-    def _loop(self) -> None:
-        """Interne Methode, die dauerhaft läuft und den Knopfstatus prüft."""
-        while True:
-            time.sleep(0.1)
-
-            if self.pressed:
-                self._publish_btn_state(True)
-                self.play()
-                while self.pressed:
-                    time.sleep(0.1)
-                self._publish_btn_state(False)
+    def _edge(self, channel: int) -> None:
+        """
+        Interner Callback, der bei einem Flankenwechsel am Knopf aus dem
+        Thread von `RPi.GPIO` aufgerufen wird. Er liest den Knopfstatus und
+        publiziert ihn bei einer Änderung, beim Drücken spielt er die Melodie.
+        """
+        pressed = self.pressed
+        if pressed == self.was_pressed: return
+        self.was_pressed = pressed
+        self._publish_btn_state(pressed)
+        if pressed: self.play()
 
     def _publish_btn_state(self, state: bool) -> None:
         """Interne Methode, die einen Knopf-Status published."""
@@ -0,0 +1,127 @@
+import ctypes
+import ctypes.util
+import os
+from pathlib import Path
+import select
+import struct
+from typing import Dict, List, Tuple
+
+
+class Inotify:
+    """
+    Schlanke Anbindung an die Dateiüberwachung `inotify` des Linux-Kernels
+    über `ctypes`, damit keine zusätzliche Abhängigkeit nötig ist. Auf anderen
+    Systemen schlägt bereits das Erstellen mit einem `OSError` fehl.
+
+    Attributes
+    ----------
+    CHANGED : int
+        Ereignisse, nach denen eine Datei neu eingelesen werden muss.
+    CREATED : int
+        Ereignis, wenn ein Eintrag angelegt wurde.
+    GONE : int
+        Ereignisse, nach denen ein überwachtes Verzeichnis selbst gelöscht
+        oder verschoben wurde.
+    IGNORED : int
+        Ereignis, wenn der Kernel eine Überwachung aufgehoben hat.
+    ISDIR : int
+        Markiert Ereignisse, die ein Verzeichnis betreffen.
+    MASK : int
+        Ereignisse, auf die alle Verzeichnisse überwacht werden.
+    OVERFLOW : int
+        Ereignis, wenn der Kernel Ereignisse verworfen hat.
+    REMOVED : int
+        Ereignisse, nach denen eine Datei verschwunden ist.
+    fd : int
+        Dateideskriptor der Überwachung.
+    _libc : ctypes.CDLL
+        Geladene C-Bibliothek.
+    _watches : Dict[int, Path]
+        Überwachte Verzeichnisse je Watch-Deskriptor.
+
+    Methods
+    -------
+    close()
+        Beendet die Überwachung.
+    read(timeout) : List[Tuple[Path, int]]
+        Wartet auf Ereignisse und gibt sie zurück.
+    watch(path)
+        Überwacht ein Verzeichnis.
+    """
+
+    CHANGED: int = 0x008 | 0x080  # IN_CLOSE_WRITE | IN_MOVED_TO
+    CREATED: int = 0x100  # IN_CREATE
+    GONE: int = 0x400 | 0x800  # IN_DELETE_SELF | IN_MOVE_SELF
+    IGNORED: int = 0x8000  # IN_IGNORED
+    ISDIR: int = 0x40000000  # IN_ISDIR
+    OVERFLOW: int = 0x4000  # IN_Q_OVERFLOW
+    REMOVED: int = 0x040 | 0x200  # IN_MOVED_FROM | IN_DELETE
+    MASK: int = CHANGED | CREATED | REMOVED | GONE
+
+    def __init__(self):
+        """
+        Erstellt die Überwachung.
+
+        Raises
+        ------
+        OSError
+            Falls `inotify` auf diesem System nicht zur Verfügung steht.
+        """
+        name = ctypes.util.find_library('c')
+        self._libc: ctypes.CDLL = ctypes.CDLL(name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError('inotify wird nicht unterstützt')
+        self.fd: int = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0: raise OSError(ctypes.get_errno(), 'inotify_init1')
+        self._watches: Dict[int, Path] = dict()
+
+    def close(self) -> None:
+        """Beendet die Überwachung."""
+        os.close(self.fd)
+
+    def read(self, timeout: float = None) -> List[Tuple[Path, int]]:
+        """
+        Wartet auf Ereignisse und gibt sie zurück.
+
+        Parameters
+        ----------
+        timeout : float (optional)
+            Maximale Wartezeit in Sekunden, standardmäßig unbegrenzt.
+
+        Returns
+        -------
+        Betroffene Pfade samt Ereignismaske; bei einem Überlauf ein einzelner
+        Eintrag ohne Pfad. Wurde ein überwachtes Verzeichnis selbst gelöscht
+        oder verschoben, wird seine Überwachung aufgehoben; gemeldet wird das
+        über das Ereignis im übergeordneten Verzeichnis.
+        """
+        if not select.select([self.fd], [], [], timeout)[0]: return []
+        data, events, pos = os.read(self.fd, 64 * 1024), list(), 0
+        while pos < len(data):
+            wd, mask, _, size = struct.unpack_from('iIII', data, pos)
+            name = data[pos + 16:pos + 16 + size].rstrip(b'\0')
+            pos += 16 + size
+            if mask & self.OVERFLOW:
+                events.append((None, mask))
+            elif mask & self.IGNORED:
+                self._watches.pop(wd, None)
+            elif mask & self.GONE:
+                if self._watches.pop(wd, None) is not None:
+                    self._libc.inotify_rm_watch(self.fd, wd)
+            elif wd in self._watches:
+                events.append((self._watches[wd] / os.fsdecode(name), mask))
+        return events
+
+    def watch(self, path: Path) -> None:
+        """
+        Überwacht ein Verzeichnis (nicht rekursiv).
+
+        Parameters
+        ----------
+        path : Path
+            Zu überwachendes Verzeichnis.
+        """
+        wd = self._libc.inotify_add_watch(
+            self.fd, os.fsencode(path), self.MASK)
+        if wd < 0: raise OSError(ctypes.get_errno(), 'inotify_add_watch')
+        self._watches[wd] = Path(path)
@@ -1,8 +1,7 @@
-from glob import glob
-from pathlib import Path
 from typing import List
 
 from .carillon import Carillon
+from .library import Library
 from .melody import Melody
 from .mqttclient import MqttClient
 from .settings import JukeboxSettings, Settings
@@ -19,6 +18,8 @@ class Jukebox:
         Carillon, auf dem gespielt wird.
     client : MqttClient
         MqttClient, der die Verbindung zum Server herstellt.
+    library : Library
+        Index der Melodiedateien, aus dem die Lieder stammen.
     settings : JukeboxSettings
         Eintellungsobjekt, das globale Einstellungen beibehält.
     transpose : int
@@ -30,6 +31,8 @@ class Jukebox:
         Listet alle verfügbaren Lieder ab.
     play(song)
         Spielt ein bestimmtes Lied ab.
+    _publish_list(payload)
+        Interne Methode, die die verfügbaren Lieder via MQTT broadcastet.
     _publish_transpose()
         Interne Methode, die die aktuelle Transponierung via MQTT broadcastet.
     _on_message(topic, payload)
@@ -50,6 +53,7 @@ class Jukebox:
         self.settings: JukeboxSettings = Settings().jukebox
         self.carillon: Carillon = carillon
         self.client: MqttClient = client
+        self.library: Library = Library.shared()
         self.transpose: int = 0
 
         topics = ('play', 'stop', 'list/get', 'transpose/set', 'transpose/get')
@@ -58,15 +62,14 @@ class Jukebox:
 
     def list(self) -> List[str]:
         """
-        Listet alle verfügbaren Melodien auf, die der Jukebox zur Verfügung
-        stehen.
+        Listet alle verfügbaren Melodien, die der Jukebox zur Verfügung
+        stehen, sortiert aus dem Index auf.
 
         Returns
         -------
         Liste aller Melodien, die zur Verfügung stehen.
         """
-        songs = glob(f'{self.settings.basefolder}/*.mid')
-        return [Path(s).stem for s in songs]
+        return [e.name for e in self.library.list('songs')[1]]
 
     def play(self, song: str) -> None:
         """
@@ -77,11 +80,31 @@ class Jukebox:
         song : str
             Name des Liedes, das abgespielt werden soll.
         """
-        path = Path(f'{self.settings.basefolder}/{song}.mid')
-        if not path.exists(): return
-        melody = Melody.from_file(path)
+        entry = self.library.find('songs', song)
+        if entry is None: return
+        melody = Melody.from_file(entry.path)
         melody.transpose = self.transpose
-        self.carillon.play(melody, self.settings.priority)
+        self.carillon.play(melody, self.settings.priority,
+                           preempt=self.settings.preempt)
+
+    def _publish_list(self, payload: bytes) -> None:
+        """
+        Interne Methode, die die verfügbaren Lieder broadcastet: ohne Payload
+        zeilenweise die Namen, mit einer Abfrage (siehe `Library.options`)
+        die passende Seite samt Dauer, Tonumfang und Prüfsumme als JSON.
+        """
+        if not payload.strip():
+            payload = '\n'.join(self.list()).encode('utf-8')
+            self.client.publish('jukebox/list', payload)
+            return
+        try:
+            options = Library.options(payload)
+        except ValueError as e:
+            print(f'Invalid list query: {e}')
+            return
+        total, entries = self.library.list('songs', **options)
+        self.client.publish('jukebox/list', Library.page(
+            total, options['offset'], [e.export() for e in entries]))
 
     def _publish_transpose(self) -> None:
         """Interne Methode, die die aktuelle Transponierung broadcasten."""
@@ -96,8 +119,7 @@ class Jukebox:
         elif topic == 'stop':
             self.carillon.stop()
         elif topic == 'list/get':
-            payload = '\n'.join(self.list()).encode('utf-8')
-            self.client.publish('jukebox/list', payload)
+            self._publish_list(payload)
         elif topic == 'transpose/set':
             self.transpose = int(payload.decode('utf-8'))
             self._publish_transpose()
@@ -0,0 +1,376 @@
+import hashlib
+import json
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .inotify import Inotify
+from .melody import Score
+from .settings import LibrarySettings, Settings
+from .timerservice import TimerService
+
+
+class LibraryEntry(NamedTuple):
+    """
+    Eine indizierte Melodiedatei.
+
+    Attributes
+    ----------
+    name : str
+        Name relativ zum Bibliotheksordner ohne Endung, etwa `mehrerau/q1`.
+    path : Path
+        Pfad der Datei.
+    duration : float
+        Dauer der Melodie in Sekunden.
+    low : int
+        Tiefste Note der Melodie.
+    high : int
+        Höchste Note der Melodie.
+    checksum : str
+        SHA1-Prüfsumme des Dateiinhalts.
+    mtime : int
+        Änderungszeit der Datei in Nanosekunden.
+    size : int
+        Größe der Datei in Bytes.
+
+    Methods
+    -------
+    export() : Dict[str, Any]
+        Beschreibt den Eintrag in JSON-tauglicher Form.
+    """
+    name: str
+    path: Path
+    duration: float
+    low: int
+    high: int
+    checksum: str
+    mtime: int
+    size: int
+
+    def export(self) -> Dict[str, Any]:
+        """Beschreibt den Eintrag in JSON-tauglicher Form."""
+        return {'name': self.name, 'duration': self.duration,
+                'low': self.low, 'high': self.high, 'checksum': self.checksum}
+
+
+class Library:
+    """
+    Index aller Melodiedateien in den Ordnern von Schlagwerk und Jukebox. Zu
+    jeder Datei werden Name, Dauer, Tonumfang und Prüfsumme im Speicher
+    gehalten, sodass Listenabfragen ohne Zugriff auf das Dateisystem
+    beantwortet werden. Änderungen werden über `inotify` einzeln nachgeführt;
+    steht das nicht zur Verfügung, werden die Ordner regelmäßig nach
+    geänderten Dateien abgesucht.
+
+    Attributes
+    ----------
+    depths : Dict[str, int]
+        Tiefe, in der die Melodien je Bibliothek liegen: 1 direkt im Ordner
+        (Jukebox), 2 in dessen Unterordnern (Themes des Schlagwerks).
+    roots : Dict[str, Path]
+        Indizierte Ordner je Bibliotheksname (`songs`, `striker`).
+    settings : LibrarySettings
+        Einstellungsobjekt, das die Art der Überwachung festlegt.
+    _entries : Dict[str, Dict[str, LibraryEntry]]
+        Einträge je Bibliothek und Name.
+    _inotify : Inotify
+        Dateiüberwachung oder `None`, falls abgefragt wird.
+    _lock : Lock
+        Sichert den Index zwischen Threads ab.
+    _shared : Library
+        Gemeinsam genutzte Instanz.
+
+    Methods
+    -------
+    find(root, name) : Optional[LibraryEntry]
+        Gibt den Eintrag einer Melodie zurück.
+    folders(root) : List[str]
+        Listet die Unterordner einer Bibliothek auf.
+    list(root, pattern, offset, limit, folder) : Tuple[int, List]
+        Listet Einträge sortiert, gefiltert und seitenweise auf.
+    scan()
+        Gleicht den Index mit allen Ordnern ab.
+    _index(root, path) : str
+        Nimmt eine Datei neu in den Index auf.
+    _level(root, path) : int
+        Ermittelt die Tiefe eines Pfads innerhalb einer Bibliothek.
+    _locate(path) : Optional[str]
+        Ermittelt die Bibliothek zu einem Pfad.
+    _watch()
+        Schleife des Überwachungsthreads.
+    _watch_tree(path)
+        Überwacht ein Verzeichnis samt Unterverzeichnissen mit Melodien.
+
+    Class Methods
+    -------------
+    shared() : Library
+        Gibt die gemeinsam genutzte Instanz zurück.
+
+    Static Methods
+    --------------
+    options(payload) : Dict[str, Any]
+        Liest Filter und Seite einer Listenabfrage aus.
+    page(total, offset, items) : bytes
+        Kodiert eine Seite einer Listenabfrage als JSON.
+    """
+
+    _shared: 'Library' = None
+
+    def __init__(
+        self, roots: Dict[str, Path], depths: Dict[str, int] = None
+    ):
+        """
+        Indiziert alle Ordner und startet die Überwachung.
+
+        Parameters
+        ----------
+        roots : Dict[str, Path]
+            Zu indizierende Ordner je Bibliotheksname.
+        depths : Dict[str, int] (optional)
+            Tiefe, in der die Melodien je Bibliothek liegen, standardmäßig
+            direkt im Ordner.
+        """
+        self.roots: Dict[str, Path] = {k: Path(v) for k, v in roots.items()}
+        self.depths: Dict[str, int] = {
+            k: (depths or dict()).get(k, 1) for k in self.roots}
+        self.settings: LibrarySettings = Settings().library
+        self._entries: Dict[str, Dict[str, LibraryEntry]] = {
+            k: dict() for k in self.roots}
+        self._lock: Lock = Lock()
+
+        self._inotify: Inotify = None
+        if self.settings.inotify:
+            try:
+                self._inotify = Inotify()
+                for root in self.roots.values(): self._watch_tree(root)
+            except OSError as e:
+                print(f'Library falls back to polling: {e}')
+                self._inotify = None
+        self.scan()
+
+        if self._inotify is not None:
+            Thread(target=self._watch, daemon=True).start()
+        elif self.settings.poll > 0:
+            TimerService.shared().add(
+                TimerService.interval(self.settings.poll), self.scan,
+                'library')
+
+    def find(self, root: str, name: str) -> Optional[LibraryEntry]:
+        """
+        Gibt den Eintrag einer Melodie zurück.
+
+        Parameters
+        ----------
+        root : str
+            Name der Bibliothek.
+        name : str
+            Name der Melodie relativ zum Bibliotheksordner ohne Endung.
+        """
+        with self._lock: return self._entries[root].get(name)
+
+    def folders(self, root: str) -> List[str]:
+        """
+        Listet sortiert alle Unterordner einer Bibliothek auf, die Melodien
+        enthalten, etwa die Themes des Schlagwerks.
+
+        Parameters
+        ----------
+        root : str
+            Name der Bibliothek.
+        """
+        with self._lock: names = list(self._entries[root])
+        return sorted({n.rpartition('/')[0] for n in names if '/' in n})
+
+    def list(
+        self, root: str, pattern: str = None, offset: int = 0,
+        limit: int = None, folder: str = None
+    ) -> Tuple[int, List[LibraryEntry]]:
+        """
+        Listet die Einträge einer Bibliothek nach Namen sortiert auf.
+
+        Parameters
+        ----------
+        root : str
+            Name der Bibliothek.
+        pattern : str (optional)
+            Nur Einträge, deren Name diese Zeichenfolge (ohne Beachtung der
+            Groß- und Kleinschreibung) enthält.
+        offset : int (optional)
+            Anzahl der zu überspringenden Einträge.
+        limit : int (optional)
+            Maximale Anzahl der zurückgegebenen Einträge.
+        folder : str (optional)
+            Nur Einträge direkt in diesem Unterordner.
+
+        Returns
+        -------
+        Anzahl aller passenden Einträge sowie die angefragte Seite.
+        """
+        with self._lock: entries = list(self._entries[root].values())
+        if folder is not None:
+            entries = [e for e in entries
+                       if e.name.rpartition('/')[0] == folder]
+        if pattern:
+            entries = [e for e in entries
+                       if pattern.lower() in e.name.lower()]
+        entries.sort(key=lambda e: e.name.lower())
+        end = None if limit is None else offset + limit
+        return len(entries), entries[offset:end]
+
+    def scan(self) -> None:
+        """
+        Gleicht den Index mit allen Ordnern ab: Neue und veränderte Dateien
+        werden eingelesen, verschwundene entfernt. Unveränderte Dateien werden
+        anhand von Änderungszeit und Größe erkannt und nicht gelesen.
+        """
+        for root, folder in self.roots.items():
+            seen = set()
+            pattern = '*/' * (self.depths[root] - 1) + '*.mid'
+            for path in folder.glob(pattern):
+                seen.add(self._index(root, path))
+            with self._lock:
+                for name in set(self._entries[root]) - seen:
+                    del self._entries[root][name]
+
+    def _index(self, root: str, path: Path) -> str:
+        """
+        Interne Methode, die eine Datei in den Index aufnimmt, sofern sie sich
+        geändert hat. Verschwundene oder nicht lesbare Dateien werden entfernt.
+
+        Returns
+        -------
+        Name des Eintrags.
+        """
+        name = path.relative_to(self.roots[root]).with_suffix('').as_posix()
+        with self._lock: entry = self._entries[root].get(name)
+        try:
+            stat = path.stat()
+            if entry is not None and entry.mtime == stat.st_mtime_ns \
+                    and entry.size == stat.st_size:
+                return name
+            checksum = hashlib.sha1(path.read_bytes()).hexdigest()
+            if entry is not None and entry.checksum == checksum:
+                entry = entry._replace(mtime=stat.st_mtime_ns)
+            else:
+                score = Score.from_file(path)
+                notes = [d1 for s, d1, d2 in zip(
+                    score.statuses, score.data1, score.data2)
+                    if s == 0x90 and d2 > 0]
+                entry = LibraryEntry(
+                    name, path, score.duration, min(notes, default=None),
+                    max(notes, default=None), checksum, stat.st_mtime_ns,
+                    stat.st_size)
+        except FileNotFoundError:
+            with self._lock: self._entries[root].pop(name, None)
+            return name
+        except Exception as e:
+            print(f'Library skips {path}: {e!r}')
+            with self._lock: self._entries[root].pop(name, None)
+            return name
+        with self._lock: self._entries[root][name] = entry
+        return name
+
+    def _level(self, root: str, path: Path) -> int:
+        """
+        Interne Methode, die die Tiefe eines Pfads innerhalb einer Bibliothek
+        ermittelt; Dateien direkt im Ordner liegen in Tiefe 1.
+        """
+        return len(path.relative_to(self.roots[root]).parts)
+
+    def _locate(self, path: Path) -> Optional[str]:
+        """
+        Interne Methode, die zu einem Pfad die Bibliothek ermittelt, in der er
+        liegt.
+        """
+        for root, folder in self.roots.items():
+            if folder == path or folder in path.parents: return root
+        return None
+
+    def _watch(self) -> None:
+        """
+        Interne Schleife, die Ereignisse der Dateiüberwachung in den Index
+        einarbeitet. Neue Verzeichnisse werden mitüberwacht; hat der Kernel
+        Ereignisse verworfen, wird der gesamte Index abgeglichen. Dateien
+        außerhalb der Tiefe einer Bibliothek werden übergangen.
+        """
+        while True:
+            for path, mask in self._inotify.read():
+                if path is None:
+                    self.scan()
+                    continue
+                root = self._locate(path)
+                if root is None: continue
+                if mask & Inotify.ISDIR:
+                    if mask & Inotify.CREATED or mask & Inotify.CHANGED:
+                        try: self._watch_tree(path)
+                        except OSError: pass
+                    self.scan()
+                elif path.suffix == '.mid' and \
+                        self._level(root, path) == self.depths[root]:
+                    if mask & (Inotify.CHANGED | Inotify.REMOVED):
+                        self._index(root, path)
+
+    def _watch_tree(self, path: Path) -> None:
+        """
+        Interne Methode, die ein Verzeichnis samt der Unterverzeichnisse
+        überwacht, in denen noch Melodien der Bibliothek liegen können.
+        """
+        root = self._locate(path)
+        if root is None: return
+        levels = self.depths[root] - 1 - self._level(root, path)
+        if levels < 0: return
+        self._inotify.watch(path)
+        for n in range(1, levels + 1):
+            for sub in path.glob('/'.join(['*'] * n)):
+                if sub.is_dir(): self._inotify.watch(sub)
+
+    @classmethod
+    def shared(cls) -> 'Library':
+        """
+        Gibt die gemeinsam genutzte Instanz über die Ordner von Schlagwerk und
+        Jukebox zurück und erstellt sie ggf.
+        """
+        if cls._shared is None:
+            settings = Settings()
+            cls._shared = cls({'songs': settings.jukebox.basefolder,
+                               'striker': settings.striker.basefolder},
+                              {'songs': 1, 'striker': 2})
+        return cls._shared
+
+    @staticmethod
+    def options(payload: bytes) -> Dict[str, Any]:
+        """
+        Liest Filter und Seite einer Listenabfrage über MQTT aus. Die Payload
+        ist ein JSON-Objekt mit den optionalen Schlüsseln `filter`, `offset`
+        und `limit`.
+
+        Parameters
+        ----------
+        payload : bytes
+            Payload der Abfrage.
+
+        Returns
+        -------
+        Schlüsselwortparameter `pattern`, `offset` und `limit` für `list`.
+
+        Raises
+        ------
+        ValueError
+            Falls die Payload kein gültiges JSON-Objekt ist.
+        """
+        query = json.loads(payload.decode('utf-8'))
+        if not isinstance(query, dict):
+            raise ValueError('Listenabfrage muss ein JSON-Objekt sein')
+        limit = query.get('limit')
+        return {'pattern': query.get('filter'),
+                'offset': max(0, int(query.get('offset', 0))),
+                'limit': None if limit is None else max(0, int(limit))}
+
+    @staticmethod
+    def page(total: int, offset: int, items: List[Dict[str, Any]]) -> bytes:
+        """
+        Kodiert eine Seite einer Listenabfrage als JSON mit der Gesamtzahl
+        passender Einträge, dem Versatz und den Einträgen der Seite.
+        """
+        result = {'total': total, 'offset': offset, 'items': items}
+        return json.dumps(result, ensure_ascii=False).encode('utf-8')
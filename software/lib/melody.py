@@ -1,26 +1,347 @@
+from array import array
 import mido
-from typing import List
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Tuple, Union
+
+from .melodycache import MelodyCache
+from .melodyfile import MelodyFile
+
+
+class Score:
+    """
+    Unveränderliche, kompilierte Form einer Melodie. Die MIDI-Nachrichten
+    werden einmalig in kompakte, parallele Arrays zerlegt, deren Zeitpunkte
+    bereits absolut (in Sekunden ab Melodiebeginn) vorliegen. Meta-Nachrichten
+    werden verworfen, fließen aber in die Gesamtdauer mit ein. Stammt die
+    Partitur aus einer vorkompilierten Datei, sind die Arrays schreibgeschützte
+    Sichten (`memoryview`) direkt in die gemappte Datei.
+
+    Attributes
+    ----------
+    channels : array
+        MIDI-Kanal jeder Nachricht.
+    data1 : array
+        Erstes Datenbyte jeder Nachricht (Note bzw. Controllernummer).
+    data2 : array
+        Zweites Datenbyte jeder Nachricht (Velocity bzw. Controllerwert).
+    duration : float
+        Gesamtdauer inklusive abschließender Pausen in Sekunden.
+    source : str
+        Pfad der MIDI-Datei, aus der die Partitur stammt, sofern bekannt.
+    statuses : array
+        Statusbyte ohne Kanal (etwa `0x90` für `note_on`).
+    times : array
+        Absolute Zeitpunkte der Nachrichten in Sekunden.
+    _encoded : Tuple[array, bytes, List[int], List[int], List[int]]
+        Einmalig kodierte Fassung: Zeitpunkte der Gruppen, Bytes, Gruppenenden
+        sowie Positionen der Noten- und Lautstärkebytes.
+    _messages : Dict[int, List[mido.Message]]
+        Interner Speicher der je Transponierung erzeugten Nachrichten.
+    _wire : Dict[Tuple[int, int], Tuple[array, List[bytes]]]
+        Interner Speicher der je Transponierung und Lautstärke vorkodierten
+        Nachrichtengruppen.
+
+    Methods
+    -------
+    __len__() : int
+        Anzahl der enthaltenen Nachrichten.
+    messages(transpose) : List[mido.Message]
+        Gibt die (transponierten) MIDI-Nachrichten ohne Zeitangaben zurück.
+    wire(transpose, volume) : Tuple[array, List[bytes]]
+        Gibt die vorkodierten, nach Zeitpunkten gruppierten Nachrichten zurück.
+
+    Class Methods
+    -------------
+    compile(path) : Path
+        Kompiliert eine MIDI-Datei in das vorkompilierte Binärformat.
+    from_file(path) : Score
+        Lädt eine MIDI-Datei, bevorzugt aus ihrer vorkompilierten Fassung.
+    from_messages(messages) : Score
+        Kompiliert eine Liste von MIDI-Nachrichten mit relativen Zeiten.
+    """
+
+    __slots__ = ('channels', 'data1', 'data2', 'duration', 'source',
+                 'statuses', 'times', '_encoded', '_messages', '_wire')
+
+    def __init__(
+        self, times: array = None, statuses: array = None,
+        channels: array = None, data1: array = None, data2: array = None,
+        duration: float = 0
+    ):
+        """
+        Erstellt die Partitur aus bereits zerlegten Arrays. Für die Erstellung
+        aus MIDI-Nachrichten bietet sich `from_messages` an.
+        """
+        self.times: array = array('d') if times is None else times
+        self.statuses: array = array('B') if statuses is None else statuses
+        self.channels: array = array('B') if channels is None else channels
+        self.data1: array = array('B') if data1 is None else data1
+        self.data2: array = array('B') if data2 is None else data2
+        self.duration: float = duration
+        self.source: str = None
+        self._encoded = None
+        self._messages = dict()
+        self._wire = dict()
+
+    def __len__(self) -> int:
+        """Anzahl der enthaltenen MIDI-Nachrichten."""
+        return len(self.times)
+
+    def messages(self, transpose: int = 0) -> List[mido.Message]:
+        """
+        Gibt die MIDI-Nachrichten der Partitur zurück. Sie werden einmalig je
+        Transponierung erzeugt und dann wiederverwendet, dürfen also nicht
+        verändert werden. Zeitangaben enthalten sie nicht, dafür ist `times`
+        zuständig. Noten, die durch die Transponierung den MIDI-Tonumfang
+        verlassen, werden wie bei `wire` auf 0 bzw. 127 begrenzt.
+
+        Parameters
+        ----------
+        transpose : int (optional)
+            Anzahl der Halbtöne, um die Noten transponiert werden sollen.
+
+        Returns
+        -------
+        Liste an MIDI-Nachrichten parallel zu `times`.
+        """
+        if transpose in self._messages: return self._messages[transpose]
+        messages = []
+        for s, c, d1, d2 in zip(
+                self.statuses, self.channels, self.data1, self.data2):
+            if s in (0x80, 0x90): d1 = max(0, min(127, d1 + transpose))
+            data = (s | c, d1) if s in (0xC0, 0xD0) else (s | c, d1, d2)
+            messages.append(mido.Message.from_bytes(data))
+        self._messages[transpose] = messages
+        return messages
+
+    def wire(
+        self, transpose: int = 0, volume: float = 1
+    ) -> Tuple[array, List[bytes]]:
+        """
+        Gibt die Partitur als rohe MIDI-Bytes zurück, wobei Nachrichten mit
+        gleichem Zeitpunkt (etwa Akkorde) zu einer Gruppe zusammengefasst sind,
+        die auf einmal gesendet werden kann. Die Kodierung geschieht einmalig;
+        Transponierung und Lautstärke werden danach nur noch als Bytes in eine
+        Kopie eingetragen. Noten, die durch die Transponierung den
+        MIDI-Tonumfang verlassen, werden wie bei `FanOut` auf 0 bzw. 127
+        begrenzt. Die Ergebnisse werden je Einstellung vorgehalten.
+
+        Parameters
+        ----------
+        transpose : int (optional)
+            Anzahl der Halbtöne, um die Noten transponiert werden sollen.
+        volume : float (optional)
+            Faktor zwischen 0 und 1, mit dem die Lautstärke-Controller (7) der
+            Partitur skaliert werden.
+
+        Returns
+        -------
+        Zeitpunkte der Gruppen sowie die zugehörigen Bytes.
+        """
+        key = (transpose, round(volume * 127))
+        if key in self._wire: return self._wire[key]
+        if len(self._wire) >= 8: self._wire.clear()
+
+        # Einmalige Kodierung; Positionen der zu patchenden Bytes merken
+        if self._encoded is None:
+            data, notes, volumes = bytearray(), [], []
+            times, ends = array('d'), []
+            for t, s, c, d1, d2 in zip(self.times, self.statuses,
+                                       self.channels, self.data1, self.data2):
+                if times and times[-1] == t: ends.pop()
+                else: times.append(t)
+                if s in (0x80, 0x90): notes.append(len(data) + 1)
+                if s == 0xB0 and d1 == 7: volumes.append(len(data) + 2)
+                data += bytes((s | c, d1)) if s in (0xC0, 0xD0) \
+                    else bytes((s | c, d1, d2))
+                ends.append(len(data))
+            self._encoded = (times, bytes(data), ends, notes, volumes)
+
+        times, data, ends, notes, volumes = self._encoded
+        data = bytearray(data)
+        if transpose:
+            for i in notes: data[i] = max(0, min(127, data[i] + transpose))
+        if key[1] != 127:
+            for i in volumes: data[i] = round(data[i] * key[1] / 127)
+        data = bytes(data)
+        groups = [data[a:b] for a, b in zip([0] + ends[:-1], ends)]
+        self._wire[key] = (times, groups)
+        return times, groups
+
+    @classmethod
+    def compile(cls, path: Path) -> Path:
+        """
+        Kompiliert eine MIDI-Datei in das Binärformat von `MelodyFile`, das
+        neben der MIDI-Datei abgelegt wird.
+
+        Parameters
+        ----------
+        path : Path
+            Pfad zur MIDI-Datei.
+
+        Returns
+        -------
+        Pfad der kompilierten Datei.
+        """
+        return MelodyFile.write(path, cls.from_messages(mido.MidiFile(path)))
+
+    @classmethod
+    def from_file(cls, path: Path) -> 'Score':
+        """
+        Lädt die Partitur einer MIDI-Datei. Liegt eine aktuelle vorkompilierte
+        Fassung vor, wird diese ohne Kopieren eingeblendet, ansonsten wird die
+        MIDI-Datei selbst eingelesen.
+
+        Parameters
+        ----------
+        path : Path
+            Pfad zur MIDI-Datei.
+        """
+        data = MelodyFile.read(path)
+        score = cls(*data) if data is not None \
+            else cls.from_messages(mido.MidiFile(path))
+        score.source = str(path)
+        return score
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[mido.Message]) -> 'Score':
+        """
+        Kompiliert MIDI-Nachrichten mit relativen Zeitangaben (wie sie etwa
+        `mido.MidiFile` liefert) in eine Partitur. System- und
+        Meta-Nachrichten werden nicht übernommen.
+
+        Parameters
+        ----------
+        messages : Iterable[mido.Message]
+            Nachrichten mit relativen Zeitangaben in Sekunden.
+        """
+        score = cls()
+        now = 0
+        for msg in messages:
+            now += msg.time
+            if msg.is_meta: continue
+            data = msg.bytes()
+            if data[0] >= 0xF0: continue
+            score.times.append(now)
+            score.statuses.append(data[0] & 0xF0)
+            score.channels.append(data[0] & 0x0F)
+            score.data1.append(data[1] if len(data) > 1 else 0)
+            score.data2.append(data[2] if len(data) > 2 else 0)
+        score.duration = now
+        return score
+
+
+class Part(NamedTuple):
+    """
+    Unveränderlicher Baustein einer zusammengesetzten Melodie: ein Knoten
+    samt eigenen Einstellungen und Wiederholungsanzahl.
+
+    Attributes
+    ----------
+    node : Union[Score, Chain]
+        Inhalt des Bausteins.
+    transpose : int
+        Anzahl der Halbtöne, um die der Inhalt transponiert wird.
+    tempo : float
+        Multiplikator für das Wiedergabetempo des Inhalts.
+    count : int
+        Anzahl der Wiederholungen des Inhalts.
+    """
+    node: Union[Score, 'Chain']
+    transpose: int = 0
+    tempo: float = 1
+    count: int = 1
+
+    @property
+    def duration(self) -> float:
+        """Dauer des Bausteins inklusive aller Wiederholungen."""
+        return self.node.duration * self.count / self.tempo
+
+
+class Chain:
+    """
+    Unveränderliche Verkettung von Bausteinen, die erst beim Abspielen
+    durchlaufen wird. Zusammensetzen und Wiederholen von Melodien kostet so
+    nur so viel wie die Anzahl der Bausteine, nicht wie die der Noten.
+
+    Attributes
+    ----------
+    duration : float
+        Gesamtdauer aller Bausteine.
+    parts : Tuple[Part, ...]
+        Die verketteten Bausteine in Abspielreihenfolge.
+    """
+
+    __slots__ = ('duration', 'parts')
+
+    def __init__(self, parts: Iterable[Part]):
+        """
+        Erstellt die Verkettung. Leere Bausteine werden dabei ausgelassen.
+
+        Parameters
+        ----------
+        parts : Iterable[Part]
+            Die zu verkettenden Bausteine.
+        """
+        self.parts: Tuple[Part, ...] = tuple(
+            p for p in parts if p.count > 0 and
+            (p.node.duration > 0 or len(p.node) > 0))
+        self.duration: float = sum(p.duration for p in self.parts)
+
+    def __len__(self) -> int:
+        """Anzahl der enthaltenen MIDI-Nachrichten."""
+        return sum(len(p.node) * p.count for p in self.parts)
+
+
+class Segment(NamedTuple):
+    """
+    Abschnitt einer Melodie, wie er beim Abspielen durchlaufen wird.
+
+    Attributes
+    ----------
+    offset : float
+        Startzeitpunkt des Abschnitts in Sekunden ab Melodiebeginn.
+    score : Score
+        Kompilierte Partitur des Abschnitts.
+    transpose : int
+        Anzahl der Halbtöne, um die transponiert werden soll.
+    tempo : float
+        Multiplikator für das Wiedergabetempo.
+    """
+    offset: float
+    score: Score
+    transpose: int
+    tempo: float
 
 
 class Melody:
     """
     Wrapper für eine Ansammlung an MIDI-Tönen, also eine Melodie. Die Herkunft
-    der MIDI-Daten wird dadurch abstrahiert.
+    der MIDI-Daten wird dadurch abstrahiert. Intern liegt die Melodie als
+    unveränderlicher Baum aus Partituren vor, Tempo und Transponierung werden
+    erst beim Abspielen eingerechnet. Zusammensetzen und Wiederholen erzeugt
+    nur neue Knoten, kopiert aber keine Nachrichten.
 
     Attributes
     ----------
+    cache : MelodyCache
+        Prozessweiter Cache der aus Dateien kompilierten Partituren.
+    duration : float
+        Dauer der Melodie in Sekunden, das Tempo ist bereits eingerechnet.
     messages : List[mido.Message]
         Liste an MIDI-Nachrichten, die diese Melodie enthält, dabei wurden alle
         Einstellungen bereits angewendet.
+    root : Union[Score, Chain]
+        Unbearbeiteter Inhalt der Melodie.
     tempo : float
         Multiplikator für das Wiedergabetempo.
     transpose : int
         Anzahl der Halbtöne, um die transponiert werden soll.
-    _messages : List[mido.Message]
-        Interner Speicher für die unbearbeiteten MIDI-Nachrichten.
 
     Methods
     -------
+    segments(offset) : Iterator[Segment]
+        Liefert die Abschnitte der Melodie zum Abspielen.
     __add__(other) : Melody
         Fügt zwei Melodien zusammen.
     __iadd__(other) : Melody
@@ -31,13 +352,22 @@ class Melody:
         Wiederholt die Melodie inline mehrmals.
     __rmul__(other) : Melody
         Wiederholt eine Melodie mehrmals.
+    _parts() : Tuple[Part, ...]
+        Zerlegt die Melodie samt Einstellungen in Bausteine.
 
     Class Methods
     -------------
     from_file(path) : Melody
         Erzeugt eine Melodie aus einer MIDI-Datei.
+
+    Static Methods
+    --------------
+    _walk(node, offset, transpose, tempo) : Iterator[Segment]
+        Durchläuft einen Knoten rekursiv.
     """
 
+    cache: MelodyCache = MelodyCache(Score.from_file)
+
     def __init__(self, messages: List[mido.Message] = None):
         """
         Erstellt die Melodie aus den übergebenen Nachrichten.
@@ -47,19 +377,41 @@ class Melody:
         messages : List[mido.Message] (optional)
             Nachrichten, die die Melodie ergeben.
         """
-        self._messages = [] if messages is None else messages
+        self.root: Union[Score, Chain] = Score.from_messages(messages or [])
         self.transpose: int = 0
         self.tempo: float = 1
 
+    @property
+    def duration(self) -> float:
+        """Dauer der Melodie mit Anpassung durch das Tempo."""
+        return self.root.duration / self.tempo
+
     @property
     def messages(self) -> List[mido.Message]:
         """MIDI-Nachrichten mit Anpassung durch Tempo und Transponierung."""
-        messages = [m.copy() for m in self._messages]
-        for m in messages:
-            m.time /= self.tempo
-            if m.type in ('note_on', 'note_off'): m.note += self.transpose
+        messages, last = [], 0
+        for offset, score, transpose, tempo in self.segments():
+            for t, m in zip(score.times, score.messages(transpose)):
+                t = offset + t / tempo
+                messages.append(m.copy(time=t - last))
+                last = t
+        messages.append(
+            mido.MetaMessage('end_of_track', time=self.duration - last))
         return messages
 
+    def segments(self, offset: float = 0) -> Iterator[Segment]:
+        """
+        Liefert die Abschnitte der Melodie, aus denen sich beim Abspielen die
+        absoluten Zeitpunkte aller Nachrichten ergeben. Der Baum wird dabei
+        erst während des Durchlaufens abgeschritten.
+
+        Parameters
+        ----------
+        offset : float (optional)
+            Zeitpunkt in Sekunden, an dem die Melodie beginnt.
+        """
+        return self._walk(self.root, offset, self.transpose, self.tempo)
+
     def __add__(self, other: 'Melody') -> 'Melody':
         """
         Fügt zwei Melodien zu einer neuen Melodie zusammen. Dabei werden die
@@ -75,10 +427,7 @@ class Melody:
         Zusammengefügte Melodie.
         """
         if not isinstance(other, Melody): return NotImplemented
-        melody = Melody(self.messages + other.messages)
-        melody.transpose = self.transpose
-        melody.tempo = self.tempo
-        return melody
+        return Melody._from_node(Chain(self._parts() + other._parts()))
 
     def __iadd__(self, other: 'Melody') -> 'Melody':
         """
@@ -95,7 +444,9 @@ class Melody:
         Das Objekt selbst.
         """
         if not isinstance(other, Melody): return NotImplemented
-        self._messages += other.messages
+        parts = self.root.parts if isinstance(self.root, Chain) \
+            else (Part(self.root),)
+        self.root = Chain(parts + other._parts())
         return self
 
     def __mul__(self, other: int) -> 'Melody':
@@ -114,7 +465,7 @@ class Melody:
         enthält.
         """
         if not isinstance(other, int): return NotImplemented
-        melody = Melody(self._messages * other)
+        melody = Melody._from_node(Chain([Part(self.root, count=other)]))
         melody.transpose = self.transpose
         melody.tempo = self.tempo
         return melody
@@ -134,7 +485,7 @@ class Melody:
         Das Objekt selbst.
         """
         if not isinstance(other, int): return NotImplemented
-        self._messages *= other
+        self.root = Chain([Part(self.root, count=other)])
         return self
 
     def __rmul__(self, other: int) -> 'Melody':
@@ -155,14 +506,53 @@ class Melody:
         """
         return self * other
 
+    def _parts(self) -> Tuple[Part, ...]:
+        """
+        Interne Methode, die die Melodie samt ihrer aktuellen Einstellungen
+        als Bausteine festhält. Verkettungen ohne eigene Einstellungen werden
+        dabei aufgelöst, damit der Baum flach bleibt.
+        """
+        if isinstance(self.root, Chain) and self.transpose == 0 \
+                and self.tempo == 1:
+            return self.root.parts
+        return (Part(self.root, self.transpose, self.tempo),)
+
+    @staticmethod
+    def _walk(
+        node: Union[Score, Chain], offset: float, transpose: int, tempo: float
+    ) -> Iterator[Segment]:
+        """
+        Interne Methode, die einen Knoten rekursiv durchläuft und seine
+        Partituren als Segmente mit absoluten Einstellungen liefert.
+        """
+        if isinstance(node, Score):
+            yield Segment(offset, node, transpose, tempo)
+            return
+        for part in node.parts:
+            ptempo = tempo * part.tempo
+            step = part.node.duration / ptempo
+            for i in range(part.count):
+                yield from Melody._walk(part.node, offset + i * step,
+                                        transpose + part.transpose, ptempo)
+            offset += part.count * step
+
+    @classmethod
+    def _from_node(cls, node: Union[Score, Chain]) -> 'Melody':
+        """Interne Factory-Methode, die einen Knoten direkt übernimmt."""
+        melody = cls()
+        melody.root = node
+        return melody
+
     @classmethod
     def from_file(cls, path: str) -> 'Melody':
         """
-        Factory-Methode, die eine Melodie aus einer MIDI-Datei extrahiert.
+        Factory-Methode, die eine Melodie aus einer MIDI-Datei extrahiert. Die
+        kompilierte Partitur wird dabei prozessweit gecacht, nur veränderte
+        Dateien werden neu eingelesen.
 
         Parameters
         ----------
         path : str
             Pfad zur MIDI-Datei.
         """
-        return cls(list(mido.MidiFile(path)))
+        return cls._from_node(cls.cache.get(path))
@@ -0,0 +1,104 @@
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Tuple, Union
+
+
+class MelodyCache:
+    """
+    Prozessweiter, begrenzter LRU-Cache für eingelesene Melodiedateien. Als
+    Schlüssel dient der aufgelöste Pfad, über Änderungszeit und Dateigröße wird
+    erkannt, ob eine Datei seit dem Einlesen verändert wurde. Die gecachten
+    Objekte werden unverändert herausgegeben und müssen daher unveränderlich
+    sein.
+
+    Attributes
+    ----------
+    hits : int
+        Anzahl der Anfragen, die aus dem Cache beantwortet wurden.
+    loader : Callable[[Path], Any]
+        Funktion, die eine Datei bei einem Cache-Fehltreffer einliest.
+    maxsize : int
+        Maximale Anzahl an vorgehaltenen Dateien.
+    misses : int
+        Anzahl der Anfragen, für die die Datei eingelesen werden musste.
+    _entries : OrderedDict[str, Tuple[Tuple[int, int], Any]]
+        Interner Speicher aus Dateisignatur und eingelesenem Objekt.
+    _lock : Lock
+        Sperre, die den Cache zwischen Threads absichert.
+
+    Methods
+    -------
+    clear()
+        Leert den Cache und setzt die Zähler zurück.
+    get(path) : Any
+        Gibt das eingelesene Objekt einer Datei zurück.
+    stats() : Dict[str, int]
+        Gibt die Zähler und die aktuelle Belegung zurück.
+    """
+
+    def __init__(self, loader: Callable[[Path], Any], maxsize: int = 32):
+        """
+        Erstellt einen leeren Cache.
+
+        Parameters
+        ----------
+        loader : Callable[[Path], Any]
+            Funktion, die eine Datei einliest.
+        maxsize : int (optional)
+            Maximale Anzahl an vorgehaltenen Dateien.
+        """
+        self.loader: Callable[[Path], Any] = loader
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[str, Tuple[Tuple[int, int], Any]] = \
+            OrderedDict()
+        self._lock: Lock = Lock()
+
+    def clear(self) -> None:
+        """Leert den Cache und setzt die Zähler zurück."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def get(self, path: Union[str, Path]) -> Any:
+        """
+        Gibt das eingelesene Objekt zu einer Datei zurück. Ist sie noch nicht
+        im Cache oder hat sie sich seither verändert, wird sie neu eingelesen.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Pfad zur Datei.
+
+        Returns
+        -------
+        Das (ggf. gecachte) eingelesene Objekt.
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        key, signature = str(path), (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Einlesen außerhalb der Sperre, damit andere Threads nicht warten
+        value = self.loader(path)
+        with self._lock:
+            self._entries[key] = (signature, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        """Gibt Treffer, Fehltreffer und die aktuelle Belegung zurück."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._entries), 'maxsize': self.maxsize}
@@ -0,0 +1,146 @@
+from array import array
+import mmap
+import os
+from pathlib import Path
+import struct
+import sys
+from typing import Optional, Sequence, Tuple, Union
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .melody import Score
+
+
+class MelodyFile:
+    """
+    Vorkompiliertes Binärformat für Melodien. Eine Datei `name.kmel` liegt
+    neben der zugehörigen MIDI-Datei `name.mid` und enthält deren Partitur mit
+    bereits aufgelösten, absoluten Zeitpunkten in einem flachen Layout, das
+    ohne Kopieren per `mmap` eingelesen werden kann:
+
+    * Kopf (40 Bytes, Little Endian): Kennung `KMEL`, Formatversion,
+      reserviert, Anzahl der Nachrichten, reserviert, Gesamtdauer (`double`)
+      sowie Änderungszeit in Nanosekunden und Größe der MIDI-Datei.
+    * Zeitpunkte aller Nachrichten als `double`.
+    * Statusbytes, Kanäle, erste und zweite Datenbytes als je ein Byte pro
+      Nachricht.
+
+    Über Änderungszeit und Größe wird erkannt, ob die kompilierte Datei noch
+    zur MIDI-Datei passt.
+
+    Attributes
+    ----------
+    HEADER : struct.Struct
+        Aufbau des Dateikopfs.
+    MAGIC : bytes
+        Kennung am Dateianfang.
+    SUFFIX : str
+        Dateiendung der kompilierten Dateien.
+    VERSION : int
+        Aktuelle Formatversion.
+
+    Static Methods
+    --------------
+    compiled_path(path) : Path
+        Ermittelt den Pfad der kompilierten Datei zu einer MIDI-Datei.
+    read(path) : Optional[Tuple[Sequence[float], ...]]
+        Liest die kompilierte Fassung einer MIDI-Datei, sofern aktuell.
+    write(path, score) : Path
+        Schreibt die kompilierte Fassung einer MIDI-Datei.
+    """
+
+    HEADER: struct.Struct = struct.Struct('<4sHHIIdqq')
+    MAGIC: bytes = b'KMEL'
+    SUFFIX: str = '.kmel'
+    VERSION: int = 1
+
+    @staticmethod
+    def compiled_path(path: Union[str, Path]) -> Path:
+        """Pfad der kompilierten Datei, die zu einer MIDI-Datei gehört."""
+        return Path(path).with_suffix(MelodyFile.SUFFIX)
+
+    @staticmethod
+    def read(
+        path: Union[str, Path]
+    ) -> Optional[Tuple[Sequence[float], Sequence[int], Sequence[int],
+                        Sequence[int], Sequence[int], float]]:
+        """
+        Liest die kompilierte Fassung einer MIDI-Datei ein. Die Arrays werden
+        dabei nicht kopiert, sondern verweisen direkt in die gemappte Datei.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Pfad zur MIDI-Datei (nicht zur kompilierten Datei).
+
+        Returns
+        -------
+        Zeitpunkte, Statusbytes, Kanäle, erste und zweite Datenbytes sowie die
+        Gesamtdauer, wie sie `Score` erwartet. `None`, wenn keine oder eine
+        veraltete kompilierte Datei vorliegt.
+        """
+        compiled = MelodyFile.compiled_path(path)
+        try:
+            source = Path(path).stat()
+            with compiled.open('rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        header = MelodyFile.HEADER
+        if len(data) < header.size: return None
+        magic, version, _, count, _, duration, mtime, size = \
+            header.unpack_from(data)
+        if magic != MelodyFile.MAGIC or version != MelodyFile.VERSION:
+            return None
+        if (mtime, size) != (source.st_mtime_ns, source.st_size): return None
+        if len(data) != header.size + 12 * count: return None
+
+        view = memoryview(data)
+        start, end = header.size, header.size + 8 * count
+        if sys.byteorder == 'little':
+            times = view[start:end].cast('d')
+        else:
+            # Auf Big-Endian-Systemen muss doch kopiert werden
+            times = array('d', view[start:end].tobytes())
+            times.byteswap()
+        fields = []
+        for _ in range(4):
+            start, end = end, end + count
+            fields.append(view[start:end])
+        return (times, *fields, duration)
+
+    @staticmethod
+    def write(path: Union[str, Path], score: 'Score') -> Path:
+        """
+        Schreibt die kompilierte Fassung einer MIDI-Datei. Die Datei wird
+        zunächst unter einem temporären Namen geschrieben und dann atomar
+        ersetzt, damit Leser nie eine halbe Datei sehen.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Pfad zur MIDI-Datei, aus der die Partitur stammt.
+        score : Score
+            Die kompilierte Partitur der MIDI-Datei.
+
+        Returns
+        -------
+        Pfad der geschriebenen Datei.
+        """
+        source = Path(path).stat()
+        compiled = MelodyFile.compiled_path(path)
+        count = len(score.times)
+        header = MelodyFile.HEADER.pack(
+            MelodyFile.MAGIC, MelodyFile.VERSION, 0, count, 0, score.duration,
+            source.st_mtime_ns, source.st_size)
+
+        tmp = compiled.with_name(f'.{compiled.name}.tmp')
+        with tmp.open('wb') as f:
+            f.write(header)
+            f.write(struct.pack(f'<{count}d', *score.times))
+            for field in (score.statuses, score.channels, score.data1,
+                          score.data2):
+                f.write(bytes(field))
+        os.replace(tmp, compiled)
+        return compiled
@@ -1,3 +1,8 @@
+from datetime import date
+import json
+
+from .direktoriumproxy import DirektoriumProxy
+from .library import Library
 from .mqttclient import MqttClient
 from .settings import MqttSettings, Settings
 from .striker import Striker
@@ -12,6 +17,11 @@ class MqttController:
     ----------
     client : MqttClient
         MQTT-Client, über den Nachrichten ausgetauscht werden.
+    direktorium : DirektoriumProxy
+        Anbindung des Direktoriums, deren Jahresfahrplan abgefragt werden
+        kann, oder `None`.
+    library : Library
+        Index der Melodiedateien, aus dem die Themes stammen.
     settings : MqttSettings
         Einstellungsobjekt mit Anpassungen.
     striker : Striker
@@ -21,13 +31,24 @@ class MqttController:
     -------
     _on_message(topic, payload)
         Interner Callback, der auf ankommende Nachrichten reagiert.
+    _publish_plan()
+        Teilt dem MQTT-Server den heutigen Plan des Schlagwerks mit.
+    _publish_stats()
+        Teilt dem MQTT-Server die Wiedergabestatistik des Carillons mit.
     _publish_theme()
         Teilt dem MQTT-Server das verwendete Theme mit.
+    _publish_themes(payload)
+        Teilt dem MQTT-Server die verfügbaren Themes mit.
+    _publish_timetable(payload)
+        Teilt dem MQTT-Server den Jahresfahrplan des Direktoriums mit.
     _publish_volume()
         Teilt dem MQTT-Server die eingestellte Lautstärke mit.
     """
 
-    def __init__(self, striker: Striker, client: MqttClient):
+    def __init__(
+        self, striker: Striker, client: MqttClient,
+        direktorium: DirektoriumProxy = None
+    ):
         """
         Bereitet das Objekt vor und registriert sich zur Vermittlung beim
         MQTT-Client.
@@ -38,17 +59,25 @@ class MqttController:
             Schlagwerk, das angepasst können werden soll.
         client : MqttClient
             MQTT-Client, über den Anfragen ankommen.
+        direktorium : DirektoriumProxy (optional)
+            Anbindung des Direktoriums, deren Fahrplan abgefragt werden kann.
         """
         self.striker: Striker = striker
         self.client: MqttClient = client
+        self.direktorium: DirektoriumProxy = direktorium
+        self.library: Library = Library.shared()
         self.settings: MqttSettings = Settings().mqtt
 
-        topics = ('volume/get', 'volume/set', 'stop', 'theme/get',
-                  'theme/list/get', 'theme/set')
+        topics = ('volume/get', 'volume/set', 'stop', 'stats/get',
+                  'plan/get', 'theme/get', 'theme/list/get', 'theme/set')
+        if direktorium is not None: topics += ('timetable/get',)
         topics = [f'control/{t}' for t in topics]
         self.client.subscribe(self._on_message, *topics)
 
         self.striker.carillon.volume = self.settings.control_volume
+        if self.striker.error is not None:
+            self.client.publish('control/theme/error',
+                                self.striker.error.encode('utf-8'))
 
     def _on_message(self, topic: str, payload: bytes) -> None:
         """Interner Callback, der auf ankommende Nachrichten reagiert."""
@@ -60,21 +89,93 @@ class MqttController:
             self._publish_volume()
         elif topic == 'stop':
             self.striker.carillon.stop()
+        elif topic == 'stats/get':
+            self._publish_stats()
+        elif topic == 'plan/get':
+            self._publish_plan()
         elif topic == 'theme/get':
             self._publish_theme()
         elif topic == 'theme/list/get':
-            dirs = list(self.striker.basefolder.glob('**'))[1:]
-            payload = '\n'.join([d.name for d in dirs]).encode('utf-8')
-            self.client.publish('theme/list', payload)
+            self._publish_themes(payload)
         elif topic == 'theme/set':
-            self.striker.theme = payload.decode('utf-8')
+            try:
+                self.striker.theme = payload.decode('utf-8')
+            except ValueError as e:
+                print(f'Rejected theme: {e}')
+                self.client.publish('control/theme/error',
+                                    str(e).encode('utf-8'))
             self._publish_theme()
+        elif topic == 'timetable/get':
+            self._publish_timetable(payload)
+
+    def _publish_plan(self) -> None:
+        """Teilt dem MQTT-Server den heutigen Plan des Schlagwerks mit."""
+        plan = self.striker.plan.json()
+        self.client.publish('control/plan', plan.encode('utf-8'))
+
+    def _publish_stats(self) -> None:
+        """Teilt dem MQTT-Server die Wiedergabestatistik des Carillons mit."""
+        stats = self.striker.carillon.stats()
+        self.client.publish('control/stats', json.dumps(stats).encode('utf-8'))
 
     def _publish_theme(self) -> None:
         """Teilt dem MQTT-Server das verwendete Theme mit."""
         theme = self.striker.theme
         self.client.publish('control/theme', theme.encode('utf-8'))
 
+    def _publish_themes(self, payload: bytes) -> None:
+        """
+        Teilt dem MQTT-Server die verfügbaren Themes mit: ohne Payload
+        zeilenweise die Namen, mit einer Abfrage (siehe `Library.options`)
+        die passende Seite samt den Angaben zu allen Dateien als JSON.
+        """
+        themes = self.library.folders('striker')
+        if not payload.strip():
+            payload = '\n'.join(themes).encode('utf-8')
+            self.client.publish('control/theme/list', payload)
+            return
+        try:
+            options = Library.options(payload)
+        except ValueError as e:
+            print(f'Invalid list query: {e}')
+            return
+
+        pattern, offset = options['pattern'], options['offset']
+        if pattern:
+            themes = [t for t in themes if pattern.lower() in t.lower()]
+        end = None if options['limit'] is None else offset + options['limit']
+        items = list()
+        for theme in themes[offset:end]:
+            files = self.library.list('striker', folder=theme)[1]
+            items.append({'name': theme,
+                          'files': [e.export() for e in files]})
+        self.client.publish('control/theme/list',
+                            Library.page(len(themes), offset, items))
+
+    def _publish_timetable(self, payload: bytes) -> None:
+        """
+        Teilt dem MQTT-Server den Jahresfahrplan als JSON mit: ohne Payload
+        den heutigen Tag, mit einem Datum (`2027-04-02`) diesen Tag und mit
+        einem Jahr (`2027`) das ganze Jahr.
+        """
+        query = payload.decode('utf-8').strip()
+        try:
+            if not query:
+                day = self.direktorium.clock.today()
+            elif query.isdigit():
+                table = self.direktorium.timetable(int(query))
+                self.client.publish('control/timetable',
+                                    table.json().encode('utf-8'))
+                return
+            else:
+                day = date.fromisoformat(query)
+        except ValueError as e:
+            print(f'Invalid timetable query: {e}')
+            return
+        entry = self.direktorium.entry(day).export()
+        self.client.publish('control/timetable', json.dumps(
+            entry, ensure_ascii=False).encode('utf-8'))
+
     def _publish_volume(self) -> None:
         """Teilt dem MQTT-Server die eingestellte Lautstärke mit."""
         vol = self.striker.carillon.volume
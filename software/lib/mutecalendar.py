@@ -0,0 +1,203 @@
+from datetime import date, timedelta
+from typing import Dict, FrozenSet, List, NamedTuple, Optional
+
+from .settings import MuteSettings, StrikerSettings
+
+
+class MuteWindow(NamedTuple):
+    """
+    Ein kompiliertes Zeitfenster, in dem das Schlagwerk schweigt.
+
+    Attributes
+    ----------
+    first : int
+        Erste stumme Viertelstunde des Tages (0 bis 95).
+    end : int
+        Erste wieder hörbare Viertelstunde (1 bis 96). Ist sie nicht größer
+        als `first`, reicht das Fenster in den Folgetag.
+    weekdays : Optional[FrozenSet[int]]
+        Wochentage, an denen das Fenster beginnt, oder `None` für alle.
+    dates : Optional[FrozenSet[str]]
+        Tage, an denen das Fenster ausschließlich beginnt, oder `None`.
+    exceptions : FrozenSet[str]
+        Tage, an denen das Fenster nicht beginnt.
+
+    Methods
+    -------
+    applies(day) : bool
+        Ob das Fenster an einem Tag beginnt.
+    """
+    first: int
+    end: int
+    weekdays: Optional[FrozenSet[int]] = None
+    dates: Optional[FrozenSet[str]] = None
+    exceptions: FrozenSet[str] = frozenset()
+
+    def applies(self, day: date) -> bool:
+        """Ob das Fenster am angegebenen Tag beginnt."""
+        keys = (day.isoformat(), day.isoformat()[5:])
+        if any(k in self.exceptions for k in keys): return False
+        if self.dates is not None and not any(k in self.dates for k in keys):
+            return False
+        return self.weekdays is None or day.weekday() in self.weekdays
+
+
+class MuteCalendar:
+    """
+    Kalender der stummen Viertelstunden. Alle Regeln werden einmalig in
+    Zeitfenster übersetzt und daraus je Tag eine 96-Bit-Maske berechnet, in
+    der jedes gesetzte Bit eine stumme Viertelstunde markiert. Die Prüfung
+    eines Schlags ist damit ein einzelner Bittest, unabhängig von der Anzahl
+    der Regeln.
+
+    Attributes
+    ----------
+    MAXDAYS : int
+        Anzahl der Tage, deren Masken vorgehalten werden.
+    windows : List[MuteWindow]
+        Kompilierte Zeitfenster.
+    _masks : Dict[date, int]
+        Bereits berechnete Masken je Tag.
+
+    Methods
+    -------
+    mask(day) : int
+        Gibt die Maske eines Tages zurück.
+    muted(day, hours, quarters) : bool
+        Ob eine Viertelstunde stumm ist.
+
+    Class Methods
+    -------------
+    from_settings(settings) : MuteCalendar
+        Kompiliert die Regeln aus den Einstellungen des Schlagwerks.
+
+    Static Methods
+    --------------
+    slot(value) : int
+        Übersetzt eine Uhrzeit in die Nummer ihrer Viertelstunde.
+    _dates(values) : Optional[FrozenSet[str]]
+        Prüft und vereinheitlicht Datumsangaben.
+    _weekdays(mute) : Optional[FrozenSet[int]]
+        Prüft die Wochentage eines Fensters.
+    """
+
+    MAXDAYS: int = 32
+
+    def __init__(self, windows: List[MuteWindow]):
+        """
+        Erstellt den Kalender aus bereits kompilierten Zeitfenstern.
+
+        Parameters
+        ----------
+        windows : List[MuteWindow]
+            Zeitfenster, in denen das Schlagwerk schweigt.
+        """
+        self.windows: List[MuteWindow] = windows
+        self._masks: Dict[date, int] = dict()
+
+    def mask(self, day: date) -> int:
+        """
+        Gibt die Maske eines Tages zurück, in der Bit `4 * Stunde +
+        Viertelstunde` für jede stumme Viertelstunde gesetzt ist. Fenster des
+        Vortags, die über Mitternacht reichen, sind eingerechnet.
+
+        Parameters
+        ----------
+        day : date
+            Tag, dessen Maske benötigt wird.
+        """
+        mask = self._masks.get(day)
+        if mask is not None: return mask
+
+        mask, before = 0, day - timedelta(days=1)
+        for w in self.windows:
+            overnight = w.end <= w.first
+            if w.applies(day):
+                mask |= (1 << (96 if overnight else w.end)) - (1 << w.first)
+            if overnight and w.applies(before):
+                mask |= (1 << w.end) - 1
+
+        if len(self._masks) >= self.MAXDAYS: self._masks.clear()
+        self._masks[day] = mask
+        return mask
+
+    def muted(self, day: date, hours: int, quarters: int) -> bool:
+        """
+        Ob eine Viertelstunde stumm ist.
+
+        Parameters
+        ----------
+        day : date
+            Tag des Schlags.
+        hours : int
+            Stundenzahl des Schlags.
+        quarters : int
+            Viertelstunde des Schlags (0 für die volle Stunde).
+        """
+        return bool(self.mask(day) >> (hours * 4 + quarters) & 1)
+
+    @classmethod
+    def from_settings(cls, settings: StrikerSettings) -> 'MuteCalendar':
+        """
+        Kompiliert die Regeln aus den Einstellungen des Schlagwerks. Die
+        Nachtabschaltung schweigt nach dem Schlag zu `nightmuter_start` bis
+        vor dem Schlag zu `nightmuter_end`, die Fenster aus `mutes` von
+        `start` bis vor `end`.
+
+        Raises
+        ------
+        ValueError
+            Falls eine Uhrzeit, ein Wochentag oder ein Datum ungültig ist.
+        """
+        windows = list()
+        if settings.nightmuter_start is not None:
+            first = (cls.slot(settings.nightmuter_start) + 1) % 96
+            end = cls.slot(settings.nightmuter_end)
+            windows.append(MuteWindow(first, end))
+
+        for m in settings.mutes:
+            first, end = cls.slot(m.start), cls.slot(m.end)
+            if first == end: continue
+            windows.append(MuteWindow(
+                first, end, cls._weekdays(m), cls._dates(m.dates),
+                cls._dates(m.exceptions) or frozenset()))
+        return cls(windows)
+
+    @staticmethod
+    def slot(value: str) -> int:
+        """
+        Übersetzt eine Uhrzeit (`'HH:MM'`) in die Nummer ihrer Viertelstunde,
+        wobei Minuten auf die Viertelstunde abgerundet werden. `'24:00'`
+        ergibt 96.
+        """
+        try:
+            h, m = (int(v) for v in value.split(':'))
+        except (AttributeError, ValueError):
+            raise ValueError(f'Ungültige Uhrzeit: {value!r}') from None
+        if not (0 <= h < 24 and 0 <= m < 60 or (h, m) == (24, 0)):
+            raise ValueError(f'Ungültige Uhrzeit: {value!r}')
+        return h * 4 + m // 15
+
+    @staticmethod
+    def _dates(values: Optional[List[str]]) -> Optional[FrozenSet[str]]:
+        """
+        Interne Methode, die Datumsangaben (`'MM-TT'` oder `'JJJJ-MM-TT'`)
+        prüft und vereinheitlicht.
+        """
+        if values is None: return None
+        dates = set()
+        for v in values:
+            try:
+                d = date.fromisoformat(v if len(v) > 5 else f'2000-{v}')
+            except (TypeError, ValueError):
+                raise ValueError(f'Ungültiges Datum: {v!r}') from None
+            dates.add(d.isoformat() if len(v) > 5 else d.isoformat()[5:])
+        return frozenset(dates)
+
+    @staticmethod
+    def _weekdays(mute: MuteSettings) -> Optional[FrozenSet[int]]:
+        """Interne Methode, die die Wochentage eines Fensters prüft."""
+        if mute.weekdays is None: return None
+        if not all(0 <= d <= 6 for d in mute.weekdays):
+            raise ValueError(f'Ungültige Wochentage: {mute.weekdays!r}')
+        return frozenset(mute.weekdays)
@@ -1,69 +1,73 @@
+from datetime import date
+from typing import Tuple
+
 from .melody import Melody
-from .settings import Settings, StrikerSettings
+from .mutecalendar import MuteCalendar
+from .settings import StrikerSettings
 from .striker import Striker
 
 
 class Nightmuter:
     """
-    Einfache Klasse zur Realisierung einer Nachtabschaltung.
+    Stummschaltung des Schlagwerks für die Nacht und weitere Ruhezeiten. Die
+    Regeln werden in einen `MuteCalendar` kompiliert, sodass ein Schlag nur
+    noch ein Bit prüft. Neu kompiliert wird nur, wenn sich die Einstellungen
+    geändert haben.
 
     Attributes
     ----------
-    end_hour : int
-        Stundenzahl, um die die Nachtabschaltung enden soll.
-    end_quarter : int
-        Quartalsnummer, um die die Nachtabschaltung enden soll.
+    calendar : MuteCalendar
+        Kompilierte Ruhezeiten.
     settings : StrikerSettings
-        Einstellungsobjekt, das Informationen über Start- und Endzeit enthält.
-    start_hour : int
-        Stundenzahl, um die die Nachtabschaltung beginnen soll.
-    start_quarter : int
-        Quartalsnummer, um die die Nachtabschaltung beginnen soll.
+        Einstellungsobjekt des Schlagwerks, das die Ruhezeiten enthält.
+    _key : Tuple
+        Stand der Einstellungen, aus dem `calendar` kompiliert wurde.
 
     Methods
     -------
-    _check_mute(melody, hours, quarters) : Melody
+    recompile()
+        Kompiliert die Ruhezeiten neu aus den Einstellungen.
+    _check_mute(melody, hours, quarters, day) : Melody
         Interne Methode, die vom Schlagwerk zur Überprüfung aufgerufen wird.
     """
 
     def __init__(self, striker: Striker):
         """
-        Registriert sich beim Schlagwerk als Callback zur Überprüfung der
-        Nachtabschaltung.
+        Kompiliert die Ruhezeiten und registriert sich beim Schlagwerk als
+        Callback zu ihrer Überprüfung. Die Ruhezeiten werden aus dessen
+        Einstellungen gelesen, sodass Änderungen über MQTT sofort greifen.
+
+        Raises
+        ------
+        ValueError
+            Falls eine Ruhezeit ungültig angegeben ist.
         """
-        self.settings: StrikerSettings = Settings().striker
+        self.settings: StrikerSettings = striker.settings
+        self.recompile()
         striker.subscribe(self._check_mute)
 
-    @property
-    def end_hour(self) -> int:
-        """Stunde, um die die Nachtabschaltung enden soll."""
-        return int(self.settings.nightmuter_end.split(':')[0])
-
-    @property
-    def end_quarter(self) -> int:
-        """Quartal, zu dem die Nachtabschaltung enden soll."""
-        minute = int(self.settings.nightmuter_end.split(':')[1])
-        return minute // 15
-
-    @property
-    def start_hour(self) -> int:
-        """Stunde, um die die Nachtabschaltung starten soll."""
-        return int(self.settings.nightmuter_start.split(':')[0])
+    def recompile(self) -> None:
+        """
+        Kompiliert die Ruhezeiten neu aus den Einstellungen.
 
-    @property
-    def start_quarter(self) -> int:
-        """Quartal, zu dem die Nachtabschaltung starten soll."""
-        minute = int(self.settings.nightmuter_start.split(':')[1])
-        return minute // 15
+        Raises
+        ------
+        ValueError
+            Falls eine Ruhezeit ungültig angegeben ist.
+        """
+        self.calendar: MuteCalendar = MuteCalendar.from_settings(self.settings)
+        self._key: Tuple = (self.settings.nightmuter_start,
+                            self.settings.nightmuter_end, self.settings.mutes)
 
-    def _check_mute(self, melody: Melody, hours: int, quarters: int) -> Melody:
+    def _check_mute(
+        self, melody: Melody, hours: int, quarters: int, day: date
+    ) -> Melody:
         """
-        Callbackmethode, die überprüft, ob ein Schlag in die Nachtzeit fällt
+        Callbackmethode, die überprüft, ob ein Schlag in eine Ruhezeit fällt
         und ihn ggf. abbricht.
         """
-        if self.start_hour < hours: return None
-        if self.start_hour == hours and self.start_quarter < quarters:
-            return None
-        if self.end_hour > hours: return None
-        if self.end_hour == hours and self.end_quarter > quarters: return None
+        if self._key != (self.settings.nightmuter_start,
+                         self.settings.nightmuter_end, self.settings.mutes):
+            self.recompile()
+        if self.calendar.muted(day, hours, quarters): return None
         return melody
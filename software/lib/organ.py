@@ -0,0 +1,78 @@
+from configparser import ConfigParser
+from pathlib import Path
+from typing import Dict, NamedTuple, Union
+
+
+class Pipe(NamedTuple):
+    """
+    Eine Pfeife (hier: Glocke) der Orgeldefinition.
+
+    Attributes
+    ----------
+    path : Path
+        Pfad zur Sampledatei.
+    tuning : float
+        Tonhöhenkorrektur in Cent, um die das Sample beim Abspielen verschoben
+        wird.
+    amplitude : float
+        Lautstärkefaktor der Pfeife.
+    """
+    path: Path
+    tuning: float = 0
+    amplitude: float = 1
+
+
+class OrganDefinition:
+    """
+    Liest eine Orgeldefinitionsdatei (ODF) von GrandOrgue bzw. Hauptwerk, wie
+    sie unter `carillon/carillon.organ` liegt, und ordnet jeder MIDI-Note die
+    Pfeife des ersten Manuals zu.
+
+    Attributes
+    ----------
+    name : str
+        Name der Orgel bzw. des Carillons.
+    path : Path
+        Pfad zur Orgeldefinitionsdatei.
+    pipes : Dict[int, Pipe]
+        Zuordnung von MIDI-Note zu Pfeife.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Liest die Orgeldefinition ein.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Pfad zur Orgeldefinitionsdatei.
+        """
+        self.path: Path = Path(path)
+        odf = ConfigParser(comment_prefixes=(';',), interpolation=None,
+                           strict=False)
+        odf.optionxform = str
+        odf.read(self.path, encoding='latin-1')
+
+        organ = odf['Organ']
+        self.name: str = organ.get('ChurchName', self.path.stem)
+        level = organ.getfloat('AmplitudeLevel', 100) / 100
+
+        # Erstes Manual mit allen zugehörigen Registern auswerten
+        manual = odf['Manual001']
+        first_key = manual.getint('FirstAccessibleKeyLogicalKeyNumber', 1)
+        first_note = manual.getint('FirstAccessibleKeyMIDINoteNumber', 36)
+        self.pipes: Dict[int, Pipe] = dict()
+        for s in range(1, manual.getint('NumberOfStops', 0) + 1):
+            stop = odf[f'Stop{int(manual[f"Stop{s:03d}"]):03d}']
+            amplitude = level * stop.getfloat('AmplitudeLevel', 100) / 100
+            first_pipe = stop.getint('FirstAccessiblePipeLogicalPipeNumber', 1)
+            key = stop.getint('FirstAccessiblePipeLogicalKeyNumber', 1)
+            for p in range(stop.getint('NumberOfAccessiblePipes', 0)):
+                name = f'Pipe{first_pipe + p:03d}'
+                if name not in stop: continue
+                note = first_note + key + p - first_key
+                self.pipes[note] = Pipe(
+                    path=self.path.parent / stop[name].replace('\\', '/'),
+                    tuning=stop.getfloat(f'{name}PitchTuning', 0),
+                    amplitude=amplitude * stop.getfloat(
+                        f'{name}AmplitudeLevel', 100) / 100)
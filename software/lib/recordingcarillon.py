@@ -0,0 +1,96 @@
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple
+
+from .clock import Clock
+from .melody import Melody
+
+
+class Recording(NamedTuple):
+    """
+    Eine aufgezeichnete Wiedergabe.
+
+    Attributes
+    ----------
+    when : datetime
+        Zeitpunkt, zu dem die Melodie beginnen sollte.
+    priority : int
+        Priorität, mit der gespielt werden sollte.
+    melody : Melody
+        Die Melodie.
+    """
+    when: datetime
+    priority: int
+    melody: Melody
+
+
+class RecordingCarillon:
+    """
+    Carillon, das nichts abspielt, sondern jede Anfrage samt Sollzeitpunkt
+    aufzeichnet und sofort als pünktlich begonnen meldet. Zusammen mit einer
+    `VirtualClock` lässt sich so das Schlagwerk im Zeitraffer durchspielen.
+
+    Attributes
+    ----------
+    clock : Clock
+        Uhr, nach der die Sollzeitpunkte umgerechnet werden.
+    port : Any
+        Immer `None`, es gibt keinen Ausgang.
+    records : List[Recording]
+        Alle aufgezeichneten Wiedergaben in Eingangsreihenfolge.
+    volume : float
+        Lautstärke des Carillons zwischen 0 und 1.
+
+    Methods
+    -------
+    play(melody, priority, preempt, timeout, audio, start, started) : bool
+        Zeichnet eine Wiedergabe auf.
+    stats() : Dict[str, Any]
+        Gibt die Anzahl der Aufzeichnungen zurück.
+    stop() : Future
+        Tut nichts, es spielt ja nichts.
+    """
+
+    def __init__(self, clock: Clock):
+        """
+        Erstellt das Carillon mit leerer Aufzeichnung.
+
+        Parameters
+        ----------
+        clock : Clock
+            Uhr, nach der die Sollzeitpunkte umgerechnet werden.
+        """
+        self.clock: Clock = clock
+        self.port: Any = None
+        self.records: List[Recording] = list()
+        self.volume: float = 1
+
+    def play(
+        self, melody: Melody, priority: int = 0, preempt: bool = True,
+        timeout: float = None, audio: Any = None, start: float = None,
+        started: Future = None
+    ) -> bool:
+        """
+        Zeichnet eine Wiedergabe auf. Die Parameter entsprechen denen von
+        `Carillon.play`; `start` bezieht sich auf `Clock.perf_counter`.
+
+        Returns
+        -------
+        Immer `True`, da sofort aufgezeichnet wird.
+        """
+        when = self.clock.time() if start is None \
+            else start - self.clock.perf_counter() + self.clock.time()
+        self.records.append(
+            Recording(datetime.fromtimestamp(when), priority, melody))
+        if started is not None: started.set_result(0.0)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Gibt die Anzahl der Aufzeichnungen zurück."""
+        return {'played': len(self.records)}
+
+    def stop(self) -> Future:
+        """Tut nichts und gibt ein bereits erfülltes Future zurück."""
+        future = Future()
+        future.set_result(None)
+        return future
@@ -0,0 +1,392 @@
+import numpy as np
+from threading import Lock, Thread
+import time
+from typing import Iterator, List, Tuple, Union
+
+from .audiosink import AudioSink
+from .melody import Melody
+from .organ import OrganDefinition
+from .samplebank import SampleBank
+from .settings import CarillonSettings
+from .wireport import WirePort
+
+
+class Voice:
+    """
+    Eine klingende Glocke bzw. ein vorab gerenderter Puffer im Renderer.
+
+    Attributes
+    ----------
+    gain : float
+        Lautstärkefaktor aus Velocity und Orgeldefinition.
+    position : int
+        Aktuelle Leseposition im Sample.
+    sample : np.ndarray
+        Das abzuspielende Sample.
+    """
+
+    __slots__ = ('gain', 'position', 'sample')
+
+    def __init__(self, sample: np.ndarray, gain: float):
+        """Erstellt die Stimme am Anfang des Samples."""
+        self.sample: np.ndarray = sample
+        self.position: int = 0
+        self.gain: float = gain
+
+
+class Renderer:
+    """
+    Klangerzeugung im eigenen Prozess, die GrandOrgue ersetzen kann. Die
+    Glockensamples werden anhand der Orgeldefinition den MIDI-Noten zugeordnet
+    und mit NumPy gemischt. Da Glocken perkussiv sind, klingt jedes Sample nach
+    dem Anschlag vollständig aus, auch wenn dieselbe Glocke erneut
+    angeschlagen wird. Der Renderer verhält sich gegenüber dem Carillon wie ein
+    MIDI-Port und streamt die gemischten Blöcke an ein `AudioSink`.
+
+    Unterstützt werden `note_on` (Velocity als Lautstärkefaktor), der
+    Lautstärke-Controller 7 sowie die Controller 120 und 123, die alle Glocken
+    kurz ausblenden.
+
+    Attributes
+    ----------
+    bank : SampleBank
+        Sammlung der Glockensamples, die nur benötigte Samples wandelt.
+    blocksize : int
+        Anzahl der Samples je gerendertem Block.
+    FADE : int
+        Anzahl an Samples, über die beim Zurücksetzen ausgeblendet wird.
+    organ : OrganDefinition
+        Orgeldefinition mit der Zuordnung von Noten zu Samples.
+    polyphony : int
+        Maximale Anzahl gleichzeitig klingender Stimmen.
+    samplerate : int
+        Abtastrate der Ausgabe.
+    sink : AudioSink
+        Ziel, an das gestreamt wird.
+    thread : Thread
+        Thread, der die Blöcke rendert und streamt.
+    volume : float
+        Gesamtlautstärke zwischen 0 und 1 (Controller 7).
+    _events : List[Tuple[float, Union[bytes, np.ndarray]]]
+        Seit dem letzten Block eingegangene Nachrichten bzw. Puffer samt
+        Eingangszeit.
+    _last_render : float
+        Zeitpunkt (`time.perf_counter`), zu dem der letzte Block gerendert
+        wurde.
+    _lock : Lock
+        Sichert die eingehenden Nachrichten zwischen den Threads ab.
+    _running : bool
+        Ob der Streaming-Thread laufen soll.
+    _voices : List[Voice]
+        Aktuell klingende Stimmen.
+
+    Methods
+    -------
+    bounce(melody) : np.ndarray
+        Rendert eine Melodie vollständig ohne Echtzeitbezug.
+    close()
+        Beendet das Streaming und schließt das Ziel.
+    play(audio)
+        Spielt einen vorab gerenderten Puffer ab.
+    prepare(melody)
+        Wandelt die Samples aller Glocken einer Melodie vorab.
+    render(frames) : np.ndarray
+        Rendert den nächsten Block aus den eingegangenen Nachrichten.
+    reset()
+        Blendet alle klingenden Glocken aus.
+    send(msg)
+        Nimmt eine `mido.Message` entgegen.
+    send_bytes(data)
+        Nimmt vorkodierte MIDI-Nachrichten entgegen.
+    start(sink)
+        Startet das Streaming an ein Ziel.
+    _apply(data)
+        Wendet MIDI-Nachrichten auf den Zustand an.
+    _mix(out, start, end)
+        Mischt alle Stimmen in einen Ausschnitt des Puffers.
+    _stream()
+        Schleife des Streaming-Threads.
+
+    Class Methods
+    -------------
+    open(settings) : Renderer
+        Erstellt und startet einen Renderer anhand der Einstellungen.
+
+    Static Methods
+    --------------
+    notes(melody) : Iterator[int]
+        Gibt die angeschlagenen Noten einer Melodie zurück.
+    pcm(block) : bytes
+        Wandelt einen gerenderten Block in 16-Bit-PCM.
+    """
+
+    FADE: int = 256
+
+    def __init__(
+        self, organ: OrganDefinition, samplerate: int = 44100,
+        blocksize: int = 512, polyphony: int = 64,
+        samplememory: int = 32 * 2 ** 20
+    ):
+        """
+        Erstellt den Renderer, ohne bereits zu streamen.
+
+        Parameters
+        ----------
+        organ : OrganDefinition
+            Orgeldefinition mit der Zuordnung von Noten zu Samples.
+        samplerate : int (optional)
+            Abtastrate der Ausgabe.
+        blocksize : int (optional)
+            Anzahl der Samples je gerendertem Block.
+        polyphony : int (optional)
+            Maximale Anzahl gleichzeitig klingender Stimmen.
+        samplememory : int (optional)
+            Speicherobergrenze der gewandelten Samples in Bytes.
+        """
+        self.organ: OrganDefinition = organ
+        self.samplerate: int = samplerate
+        self.blocksize: int = blocksize
+        self.polyphony: int = polyphony
+        self.bank: SampleBank = SampleBank(organ, samplerate, samplememory)
+        self.volume: float = 1
+        self.sink: AudioSink = None
+        self.thread: Thread = None
+        self._events: List[Tuple[float, Union[bytes, np.ndarray]]] = list()
+        self._last_render: float = time.perf_counter()
+        self._lock: Lock = Lock()
+        self._running: bool = False
+        self._voices: List[Voice] = list()
+
+    def bounce(
+        self, melody: Melody, tail: bool = True, volume: float = 1
+    ) -> np.ndarray:
+        """
+        Rendert eine Melodie vollständig und ohne Echtzeitbezug, wobei jede
+        Nachricht samplegenau platziert wird. Der Zustand des Renderers wird
+        dafür genutzt, ein laufendes Streaming sollte also nicht parallel
+        stattfinden.
+
+        Parameters
+        ----------
+        melody : Melody
+            Die zu rendernde Melodie.
+        tail : bool (optional)
+            Ob die Glocken nach dem Ende der Melodie noch ausklingen sollen.
+        volume : float (optional)
+            Faktor, mit dem die Lautstärke-Controller der Melodie wie beim
+            Carillon skaliert werden.
+
+        Returns
+        -------
+        Die gerenderte Melodie als Float-Array.
+        """
+        self.prepare(melody)
+        frames = int(round(melody.duration * self.samplerate))
+        out = np.zeros(frames, dtype=np.float32)
+        gains = np.ones(frames, dtype=np.float32)
+        cursor = 0
+        for offset, score, transpose, tempo in melody.segments():
+            times, groups = score.wire(transpose, volume)
+            for t, data in zip(times, groups):
+                position = min(frames, int(round(
+                    (offset + t / tempo) * self.samplerate)))
+                self._mix(out, cursor, position)
+                gains[cursor:position] = self.volume
+                self._apply(data)
+                cursor = position
+        self._mix(out, cursor, frames)
+        gains[cursor:] = self.volume
+        out *= gains
+
+        if tail and self._voices:
+            rest = max(len(v.sample) - v.position for v in self._voices)
+            ring = np.zeros(rest, dtype=np.float32)
+            self._mix(ring, 0, rest)
+            out = np.concatenate((out, ring * self.volume))
+        return out
+
+    def close(self) -> None:
+        """Beendet das Streaming und schließt das Ziel."""
+        self._running = False
+        if self.thread is not None: self.thread.join()
+        if self.sink is not None: self.sink.close()
+
+    def play(self, audio: np.ndarray) -> None:
+        """
+        Spielt einen vorab gerenderten Puffer (16-Bit-PCM) ab dem nächsten
+        Block wie eine weitere Stimme ab. Die Gesamtlautstärke wirkt darauf
+        wie auf die Glocken, ebenso das Ausblenden beim Zurücksetzen.
+
+        Parameters
+        ----------
+        audio : np.ndarray
+            Der abzuspielende Puffer in der Abtastrate des Renderers.
+        """
+        with self._lock: self._events.append((time.perf_counter(), audio))
+
+    def prepare(self, melody: Melody) -> None:
+        """
+        Wandelt die Samples aller Glocken, die in einer Melodie angeschlagen
+        werden, vorab, damit dies nicht während der Wiedergabe geschieht.
+
+        Parameters
+        ----------
+        melody : Melody
+            Die demnächst zu spielende Melodie.
+        """
+        self.bank.preload(self.notes(melody))
+
+    def render(self, frames: int) -> np.ndarray:
+        """
+        Rendert den nächsten Block. Nachrichten, die seit dem letzten Block
+        eingegangen sind, werden anteilig ihrer Eingangszeit im Block
+        platziert. So bleibt der zeitliche Abstand der Anschläge erhalten, die
+        Latenz beträgt dafür einen Block.
+
+        Parameters
+        ----------
+        frames : int
+            Anzahl der zu rendernden Samples.
+
+        Returns
+        -------
+        Der gerenderte Block als Float-Array.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            events, self._events = self._events, list()
+        last, self._last_render = self._last_render, now
+        span = max(now - last, 1e-9)
+
+        out = np.zeros(frames, dtype=np.float32)
+        cursor = 0
+        for t, data in events:
+            position = int((t - last) / span * frames)
+            position = min(frames, max(cursor, position))
+            self._mix(out, cursor, position)
+            self._apply(data)
+            cursor = position
+        self._mix(out, cursor, frames)
+        out *= self.volume
+        return out
+
+    def reset(self) -> None:
+        """Blendet alle klingenden Glocken kurz aus (wie `mido`-Ports)."""
+        self.send_bytes(bytes((0xB0, 120, 0)))
+
+    def send(self, msg) -> None:
+        """
+        Nimmt eine `mido.Message` entgegen, damit der Renderer auch wie ein
+        gewöhnlicher Port genutzt werden kann.
+        """
+        self.send_bytes(bytes(msg.bytes()))
+
+    def send_bytes(self, data: bytes) -> None:
+        """
+        Nimmt vorkodierte MIDI-Nachrichten entgegen, die mit dem nächsten
+        Block wirksam werden.
+
+        Parameters
+        ----------
+        data : bytes
+            Aneinandergereihte, vollständige MIDI-Nachrichten.
+        """
+        with self._lock: self._events.append((time.perf_counter(), data))
+
+    def start(self, sink: AudioSink) -> None:
+        """
+        Startet einen Thread, der fortlaufend Blöcke rendert und an das Ziel
+        streamt.
+
+        Parameters
+        ----------
+        sink : AudioSink
+            Ziel, an das gestreamt wird.
+        """
+        self.sink = sink
+        self._running = True
+        self._last_render = time.perf_counter()
+        self.thread = Thread(target=self._stream, daemon=True)
+        self.thread.start()
+
+    def _apply(self, data: bytes) -> None:
+        """
+        Interne Methode, die MIDI-Nachrichten bzw. einen gerenderten Puffer auf
+        den Zustand anwendet.
+        """
+        if isinstance(data, np.ndarray):
+            self._voices.append(Voice(data, 1 / 32768))
+            return
+        for msg in WirePort.split(data):
+            status = msg[0] & 0xF0
+            if status == 0x90 and msg[2] > 0:
+                sample = self.bank.get(msg[1])
+                if sample is None: continue
+                gain = msg[2] / 127 * self.organ.pipes[msg[1]].amplitude
+                self._voices.append(Voice(sample, gain))
+                if len(self._voices) > self.polyphony: self._voices.pop(0)
+            elif status == 0xB0 and msg[1] == 7:
+                self.volume = msg[2] / 127
+            elif status == 0xB0 and msg[1] in (120, 123):
+                for v in self._voices:
+                    fade = v.sample[v.position:v.position + self.FADE]
+                    v.sample = fade * np.linspace(1, 0, len(fade),
+                                                  dtype=np.float32)
+                    v.position = 0
+
+    def _mix(self, out: np.ndarray, start: int, end: int) -> None:
+        """Interne Methode, die alle Stimmen in `out[start:end]` mischt."""
+        if end <= start: return
+        alive = list()
+        for v in self._voices:
+            chunk = v.sample[v.position:v.position + end - start]
+            out[start:start + len(chunk)] += chunk * v.gain
+            v.position += len(chunk)
+            if v.position < len(v.sample): alive.append(v)
+        self._voices = alive
+
+    def _stream(self) -> None:
+        """
+        Interne Schleife, die Blöcke rendert und an das Ziel schreibt. Nimmt
+        das Ziel die Blöcke nicht selbst im Echtzeittakt ab, gibt der Renderer
+        den Takt vor.
+        """
+        period = self.blocksize / self.samplerate
+        due = time.perf_counter()
+        while self._running:
+            self.sink.write(self.pcm(self.render(self.blocksize)))
+            if self.sink.realtime: continue
+            due += period
+            time.sleep(max(0, due - time.perf_counter()))
+
+    @classmethod
+    def open(cls, settings: CarillonSettings) -> 'Renderer':
+        """
+        Erstellt einen Renderer anhand der Einstellungen des Carillons und
+        startet das Streaming an das dort angegebene Ziel.
+
+        Parameters
+        ----------
+        settings : CarillonSettings
+            Einstellungen mit Orgeldefinition, Ziel und Blockgröße.
+        """
+        renderer = cls(OrganDefinition(settings.organ), settings.samplerate,
+                       settings.blocksize,
+                       samplememory=int(settings.samplememory * 2 ** 20))
+        renderer.start(AudioSink.open(
+            settings.sink, settings.samplerate, settings.blocksize))
+        return renderer
+
+    @staticmethod
+    def notes(melody: Melody) -> Iterator[int]:
+        """Gibt die angeschlagenen Noten einer Melodie zurück."""
+        for _, score, transpose, _ in melody.segments():
+            for status, note, velocity in zip(
+                    score.statuses, score.data1, score.data2):
+                if status == 0x90 and velocity > 0:
+                    yield note + transpose
+
+    @staticmethod
+    def pcm(block: np.ndarray) -> bytes:
+        """Wandelt einen Block in 16-Bit-PCM (Little Endian) um."""
+        return (np.clip(block, -1, 1) * 32767).astype('<i2').tobytes()
@@ -0,0 +1,177 @@
+from collections import OrderedDict
+import mmap
+import numpy as np
+from pathlib import Path
+import struct
+from threading import Lock
+from typing import Any, Dict, Iterable, Tuple
+
+from .organ import OrganDefinition
+
+
+class SampleBank:
+    """
+    Speichersparende Sammlung der Glockensamples einer Orgeldefinition. Die
+    WAV-Dateien werden nur per `mmap` eingeblendet; erst wenn eine Note
+    tatsächlich gebraucht wird, wird ihr Sample in Fließkommazahlen gewandelt
+    und ggf. in Tonhöhe und Abtastrate umgerechnet. Die gewandelten Samples
+    liegen in einem LRU-Cache mit Speicherobergrenze.
+
+    Attributes
+    ----------
+    hits : int
+        Anzahl der Anfragen, die aus dem Cache beantwortet wurden.
+    maxbytes : int
+        Speicherobergrenze der gewandelten Samples in Bytes.
+    misses : int
+        Anzahl der Anfragen, für die gewandelt werden musste.
+    organ : OrganDefinition
+        Orgeldefinition mit der Zuordnung von Noten zu Samples.
+    resident : int
+        Aktuell von gewandelten Samples belegter Speicher in Bytes.
+    samplerate : int
+        Abtastrate, in die gewandelt wird.
+    _cache : OrderedDict[int, np.ndarray]
+        Gewandelte Samples je Note in LRU-Reihenfolge.
+    _lock : Lock
+        Sichert den Cache zwischen Threads ab.
+    _maps : Dict[Path, Tuple[np.ndarray, int, int]]
+        Eingeblendete WAV-Daten je Datei samt Abtastrate und Kanalzahl.
+
+    Methods
+    -------
+    get(note) : np.ndarray
+        Gibt das gewandelte Sample einer Note zurück.
+    preload(notes)
+        Wandelt die Samples mehrerer Noten vorab.
+    stats() : Dict[str, Any]
+        Gibt Belegung und Trefferquote zurück.
+    _map(path) : Tuple[np.ndarray, int, int]
+        Blendet eine WAV-Datei ein.
+    """
+
+    def __init__(
+        self, organ: OrganDefinition, samplerate: int = 44100,
+        maxbytes: int = 32 * 2 ** 20
+    ):
+        """
+        Erstellt die Sammlung, ohne bereits Dateien zu lesen.
+
+        Parameters
+        ----------
+        organ : OrganDefinition
+            Orgeldefinition mit der Zuordnung von Noten zu Samples.
+        samplerate : int (optional)
+            Abtastrate, in die gewandelt wird.
+        maxbytes : int (optional)
+            Speicherobergrenze der gewandelten Samples in Bytes.
+        """
+        self.organ: OrganDefinition = organ
+        self.samplerate: int = samplerate
+        self.maxbytes: int = maxbytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.resident: int = 0
+        self._cache: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._lock: Lock = Lock()
+        self._maps: Dict[Path, Tuple[np.ndarray, int, int]] = dict()
+
+    def get(self, note: int) -> np.ndarray:
+        """
+        Gibt das in Fließkommazahlen gewandelte Sample einer Note zurück.
+
+        Parameters
+        ----------
+        note : int
+            MIDI-Note der Glocke.
+
+        Returns
+        -------
+        Das Sample oder `None`, falls die Note keiner Glocke zugeordnet ist.
+        """
+        pipe = self.organ.pipes.get(note)
+        if pipe is None: return None
+        with self._lock:
+            if note in self._cache:
+                self._cache.move_to_end(note)
+                self.hits += 1
+                return self._cache[note]
+            self.misses += 1
+            raw, rate, channels = self._map(pipe.path)
+
+        data = raw.reshape(-1, channels)
+        data = data[:, 0] if channels == 1 else data.mean(axis=1)
+        data = (data / 32768).astype(np.float32)
+        ratio = 2 ** (pipe.tuning / 1200) * rate / self.samplerate
+        if ratio != 1:
+            positions = np.arange(0, len(data) - 1, ratio)
+            data = np.interp(positions, np.arange(len(data)), data)
+            data = data.astype(np.float32)
+
+        with self._lock:
+            if note not in self._cache: self.resident += data.nbytes
+            self._cache[note] = data
+            while self.resident > self.maxbytes and len(self._cache) > 1:
+                self.resident -= self._cache.popitem(last=False)[1].nbytes
+        return data
+
+    def preload(self, notes: Iterable[int]) -> None:
+        """
+        Wandelt die Samples mehrerer Noten vorab, etwa aller Glocken einer
+        Melodie vor ihrem Abspielen.
+
+        Parameters
+        ----------
+        notes : Iterable[int]
+            Die benötigten MIDI-Noten.
+        """
+        for note in set(notes): self.get(note)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Gibt Anzahl und Speicherbedarf der gewandelten Samples, die
+        Speicherobergrenze, die Trefferquote sowie die Anzahl eingeblendeter
+        Dateien zurück.
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'samples': len(self._cache),
+                'resident': self.resident,
+                'maxbytes': self.maxbytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitrate': self.hits / requests if requests else 0,
+                'mapped': len(self._maps),
+            }
+
+    def _map(self, path: Path) -> Tuple[np.ndarray, int, int]:
+        """
+        Interne Methode, die eine WAV-Datei (PCM, 16 Bit) einblendet und eine
+        Sicht auf ihre Sampledaten zurückgibt, ohne sie zu lesen. Muss mit
+        gehaltener Sperre aufgerufen werden.
+        """
+        if path in self._maps: return self._maps[path]
+        with path.open('rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+            raise ValueError(f'Keine WAV-Datei: {path}')
+
+        # RIFF-Chunks bis zu den Sampledaten durchlaufen
+        position, rate, channels = 12, None, None
+        while position + 8 <= len(data):
+            chunk, size = struct.unpack_from('<4sI', data, position)
+            position += 8
+            if chunk == b'fmt ':
+                fmt, channels, rate, _, _, bits = struct.unpack_from(
+                    '<HHIIHH', data, position)
+                if fmt != 1 or bits != 16:
+                    raise ValueError(f'Nur 16-Bit-PCM unterstützt: {path}')
+            elif chunk == b'data':
+                size = min(size, len(data) - position) // 2 * 2
+                raw = np.frombuffer(data, dtype='<i2', count=size // 2,
+                                    offset=position)
+                self._maps[path] = (raw, rate, channels)
+                return self._maps[path]
+            position += size + size % 2
+        raise ValueError(f'Keine Sampledaten gefunden: {path}')
@@ -2,7 +2,7 @@ import json
 from pathlib import Path
 from pydantic import BaseModel, BaseSettings, Extra, root_validator
 from pydantic.env_settings import SettingsSourceCallable
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class AngelusSettings(BaseModel):
@@ -57,6 +57,73 @@ class BellSettings(BaseModel):
     priority: int = 10
 
 
+class PortSettings(BaseModel):
+    """
+    Einstellungen für einen einzelnen Ausgang des Carillons.
+
+    Attributes
+    ----------
+    latency : float
+        Anzahl an Sekunden, die der Ausgang vom Empfang einer Nachricht bis zum
+        Erklingen braucht. Schnellere Ausgänge werden entsprechend verzögert.
+    name : str
+        Name des MIDI-Ports, `renderer` für den eingebauten Renderer oder
+        `None` für den Standardport.
+    transpose : int
+        Transponierung aller Noten an diesem Ausgang.
+    """
+    latency: float = 0
+    name: str = None
+    transpose: int = 0
+
+
+class CarillonSettings(BaseModel):
+    """
+    Einstellungen für das Carillon.
+
+    Attributes
+    ----------
+    backend : str
+        Womit die Glocken erklingen: `midi` sendet an einen MIDI-Port (etwa
+        GrandOrgue), `renderer` mischt die Glockensamples im eigenen Prozess,
+        `virtual` zeichnet die Nachrichten nur mit Zeitstempel auf (zum
+        Testen und Messen).
+    blocksize : int
+        Anzahl der Samples je Audioblock des Renderers.
+    busywait : float
+        Anzahl an Sekunden, die vor jedem Ton aktiv gewartet statt geschlafen
+        wird. Das gleicht die Ungenauigkeit von `time.sleep` aus, kostet aber
+        Rechenzeit. Bei 0 wird nur geschlafen.
+    organ : str
+        Pfad zur Orgeldefinition, aus der der Renderer die Samples bezieht.
+    ports : List[PortSettings]
+        Ausgänge, an die jede Melodie gleichzeitig gesendet wird. Ist die
+        Liste leer, wird wie gewohnt nur ein Port gemäß `backend` genutzt.
+    queuetimeout : float
+        Anzahl an Sekunden, die eine Melodie standardmäßig in der
+        Warteschlange auf ihre Wiedergabe warten darf, bevor sie verworfen
+        wird. Bei 0 wird wie früher jede Melodie abgelehnt, die nicht sofort
+        beginnen kann.
+    samplememory : float
+        Speicherobergrenze in MiB für die vom Renderer gewandelten Samples.
+        Ungenutzte Samples werden darüber hinaus wieder verworfen.
+    samplerate : int
+        Abtastrate der Ausgabe des Renderers.
+    sink : str
+        Ziel des Renderers: `device` (Soundkarte), `wav:<pfad>` oder
+        `pipe:<befehl>`.
+    """
+    backend: str = 'midi'
+    blocksize: int = 512
+    busywait: float = 0
+    organ: str = '../carillon/carillon.organ'
+    ports: List[PortSettings] = list()
+    queuetimeout: float = 0
+    samplememory: float = 32
+    samplerate: int = 44100
+    sink: str = 'device'
+
+
 class DirektoriumSettings(BaseModel):
     """
     Einstellungen für das Direktorium.
@@ -70,6 +137,27 @@ class DirektoriumSettings(BaseModel):
         soll.
     kalender : str
         Kalenderbezeichnung für die Kalender-API.
+    api : str
+        Adresse der Kalender-API, etwa die eines lokalen Ersatzes.
+    source : str
+        Quelle der liturgischen Angaben: `'api'` für die Kalender-API mit
+        lokaler Berechnung als Rückfall, `'local'` nur für die lokale
+        Berechnung.
+    regional : str
+        Pfad zu einer eigenen Tabelle regionaler Feiern für die lokale
+        Berechnung, etwa mit Patrozinium und Kirchweih.
+    prefetch : int
+        Tage vor Jahresende, ab denen das Folgejahr im Hintergrund geladen
+        wird.
+    maxage : int
+        Alter in Tagen, ab dem ein Jahr im Cache erneut geladen wird.
+    timeout : float
+        Zeitlimit für Anfragen an die Kalender-API in Sekunden.
+    retries : int
+        Anzahl weiterer Versuche, falls eine Anfrage fehlschlägt.
+    backoff : float
+        Wartezeit vor dem ersten weiteren Versuch in Sekunden, die sich mit
+        jedem Versuch verdoppelt.
     theme_nichtgeboten : str
         Schlagwerktheme, das an nichtgebotenen Gedenktagen genutzt werden soll.
     theme_geboten : str
@@ -99,6 +187,14 @@ class DirektoriumSettings(BaseModel):
     cachedir: str = './cache'
     eastermute: bool = False
     kalender: str = 'deutschland'
+    api: str = 'http://www.eucharistiefeier.de/lk/api.php'
+    source: str = 'api'
+    regional: str = None
+    prefetch: int = 42
+    maxage: int = 30
+    timeout: float = 10
+    retries: int = 4
+    backoff: float = 30
     theme_nichtgeboten: str = None
     theme_geboten: str = None
     theme_fest: str = None
@@ -134,13 +230,35 @@ class JukeboxSettings(BaseModel):
     priority : int
         Mit welcher Priorität die Melodien aus der Jukebox abgespielt werden
         sollen.
+    preempt : bool
+        Ob eine laufende Melodie geringerer Priorität (etwa der
+        Viertelstundenschlag) abgebrochen werden soll. Andernfalls wartet das
+        Lied, bis sie zu Ende gespielt ist.
     basefolder : str
         Pfad, in dem die Jukebox nach Melodien sucht.
     """
     priority: int = 5
+    preempt: bool = True
     basefolder: str = '../melodies/songs'
 
 
+class LibrarySettings(BaseModel):
+    """
+    Einstellungen für den Index der Melodiedateien.
+
+    Attributes
+    ----------
+    inotify : bool
+        Ob Änderungen an den Melodieordnern über `inotify` verfolgt werden
+        sollen. Steht das nicht zur Verfügung, wird abgefragt.
+    poll : float
+        Abstand in Sekunden, in dem die Ordner ohne `inotify` nach
+        Änderungen abgesucht werden. 0 schaltet das Abfragen ab.
+    """
+    inotify: bool = True
+    poll: float = 30
+
+
 class MqttSettings(BaseModel):
     """
     Einstellungen für den MQTT-Client.
@@ -178,6 +296,34 @@ class MqttSettings(BaseModel):
     control_volume: float = 1
 
 
+class MuteSettings(BaseModel):
+    """
+    Einstellungen für ein Zeitfenster, in dem das Schlagwerk schweigt.
+
+    Attributes
+    ----------
+    start : str
+        Erste stumme Viertelstunde, etwa `'12:00'`.
+    end : str
+        Erste wieder hörbare Viertelstunde, etwa `'14:00'`. Liegt sie vor
+        `start`, reicht das Fenster über Mitternacht in den Folgetag; `'24:00'`
+        steht für das Tagesende.
+    weekdays : List[int]
+        Wochentage (0 für Montag bis 6 für Sonntag), an denen das Fenster
+        beginnt. Bei `None` an jedem Tag.
+    dates : List[str]
+        Tage (`'MM-TT'` jährlich oder `'JJJJ-MM-TT'`), an denen das Fenster
+        ausschließlich beginnt. Bei `None` an jedem Tag.
+    exceptions : List[str]
+        Tage im gleichen Format, an denen das Fenster nicht beginnt.
+    """
+    start: str
+    end: str
+    weekdays: List[int] = None
+    dates: List[str] = None
+    exceptions: List[str] = list()
+
+
 class StrikerSettings(BaseModel, extra=Extra.allow):
     """
     Einstellungen für das Schlagwerk.
@@ -186,6 +332,9 @@ class StrikerSettings(BaseModel, extra=Extra.allow):
     ----------
     priority : int
         Mit welcher Priorität der Stundenschlag abgespielt werden soll.
+    prearm : float
+        Anzahl an Sekunden, die ein Schlag vor der Viertelstunde vorbereitet
+        wird, damit der erste Ton pünktlich erklingt.
     basefolder : str
         Pfad, in dem die verschiedenen Stile von Stundenschlägen liegen.
     theme : str
@@ -194,16 +343,31 @@ class StrikerSettings(BaseModel, extra=Extra.allow):
         Einstellungen für konkrete Themes - Dokumentation dazu siehe in der
         Striker-Klasse.
     nightmuter_start : str
-        Startzeit, um die die Nachtabschaltung erfolgen soll.
+        Letzter Schlag vor der Nachtabschaltung. Bei `None` gibt es keine
+        Nachtabschaltung.
     nightmuter_end : str
         Zeit, um die die Nachtabschaltung aufgehoben werden soll.
+    mutes : List[MuteSettings]
+        Weitere Zeitfenster, in denen das Schlagwerk schweigt.
+    rendercache : str
+        Ordner, in dem die Schläge beim eingebauten Renderer vorab gerendert
+        abgelegt werden. Leer, um das Vorabrendern abzuschalten.
+    rendercache_disk : float
+        Speicherobergrenze der gerenderten Schläge auf der Platte in MiB.
+    rendercache_memory : float
+        Speicherobergrenze der gerenderten Schläge im Arbeitsspeicher in MiB.
     """
     priority: int = -1
+    prearm: float = 30
     basefolder: str = '../melodies/striker'
     theme: str = 'default'
     themes: Dict[str, Dict[str, Any]] = dict()
-    nightmuter_start: str = '21:00'
-    nightmuter_end: str = '8:00'
+    nightmuter_start: Optional[str] = '21:00'
+    nightmuter_end: Optional[str] = '8:00'
+    mutes: List[MuteSettings] = list()
+    rendercache: str = './cache/strikes'
+    rendercache_disk: float = 256
+    rendercache_memory: float = 64
 
 
 class Settings(BaseSettings):
@@ -217,12 +381,16 @@ class Settings(BaseSettings):
         Einstellungen für den Angelus.
     bell : BellSettings
         Einstellungen für eine Hardware-Klingel via GPIO-Pins.
+    carillon : CarillonSettings
+        Einstellungen für das Carillon.
     direktorium : DirektoriumSettings
         Einstellungen für das Direktorium.
     festive : FestiveSettings
         Einstellungen für den Festplayer.
     jukebox : JukeboxSettings
         Einstellungen für die Jukebox.
+    library : LibrarySettings
+        Einstellungen für den Index der Melodiedateien.
     mqtt : MqttSettings
         Einstellungen für den MQTT-Client.
     striker : StrikerSettings
@@ -241,9 +409,11 @@ class Settings(BaseSettings):
 
     angelus: AngelusSettings = AngelusSettings()
     bell: BellSettings = BellSettings()
+    carillon: CarillonSettings = CarillonSettings()
     direktorium: DirektoriumSettings = DirektoriumSettings()
     festive: FestiveSettings = FestiveSettings()
     jukebox: JukeboxSettings = JukeboxSettings()
+    library: LibrarySettings = LibrarySettings()
     mqtt: MqttSettings = MqttSettings()
     striker: StrikerSettings = StrikerSettings()
 
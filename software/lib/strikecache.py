@@ -0,0 +1,255 @@
+from collections import OrderedDict
+import hashlib
+import numpy as np
+import os
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Iterator, Optional, Tuple
+
+from .renderer import Renderer
+from .theme import Theme
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .striker import Striker
+
+
+class StrikeCache:
+    """
+    Cache fertig gemischter Audiodaten für die immer wiederkehrenden Schläge
+    des Schlagwerks. Je Theme gibt es drei Viertelstundenschläge und zwölf
+    volle Stunden; diese werden mit dem eingebauten Renderer vorab gerendert,
+    sodass ein Schlag nur noch einen Puffer abspielt.
+
+    Ein Eintrag ist über Theme, Viertelstunde, Stundenzahl, Transponierung,
+    Tempo und Lautstärke sowie Änderungszeit und Größe der Theme-Dateien
+    eindeutig bestimmt. Wird ein Theme mit geänderten Dateien oder
+    Einstellungen geladen oder ändert sich die Lautstärke, passt kein alter
+    Eintrag mehr und die Schläge werden im Hintergrund neu gerendert. Die
+    Puffer liegen als 16-Bit-PCM in einem LRU-Cache im Speicher sowie als
+    `.npy`-Dateien auf der Platte; beides ist in der Größe beschränkt.
+
+    Attributes
+    ----------
+    folder : Path
+        Ordner für die gerenderten Dateien.
+    maxdisk : int
+        Speicherobergrenze auf der Platte in Bytes.
+    maxmemory : int
+        Speicherobergrenze im Arbeitsspeicher in Bytes.
+    renderer : Renderer
+        Renderer des Carillons, dessen Orgel und Samples genutzt werden.
+    resident : int
+        Aktuell im Arbeitsspeicher belegte Bytes.
+    striker : Striker
+        Schlagwerk, dessen Schläge gerendert werden.
+    _dirty : bool
+        Ob während des Renderns eine erneute Prüfung angefordert wurde.
+    _lock : Lock
+        Sichert Speicher-Cache und Hintergrundthread ab.
+    _memory : OrderedDict[str, np.ndarray]
+        Puffer je Schlüssel in LRU-Reihenfolge.
+    _thread : Thread
+        Hintergrundthread, der die Schläge rendert.
+
+    Methods
+    -------
+    get(hours, quarters) : Optional[np.ndarray]
+        Gibt den gerenderten Schlag zurück, sofern vorhanden.
+    key(hours, quarters, theme) : str
+        Ermittelt den Schlüssel eines Schlags.
+    refresh()
+        Rendert fehlende Schläge des aktuellen Themes im Hintergrund.
+    _build()
+        Schleife des Hintergrundthreads.
+    _prune()
+        Verwirft die ältesten Dateien oberhalb der Obergrenze.
+    _remember(key, audio)
+        Legt einen Puffer im Speicher-Cache ab.
+    _settings(theme) : Tuple[int, float, int]
+        Gibt Transponierung, Tempo und Lautstärke zurück.
+
+    Static Methods
+    --------------
+    strikes() : Iterator[Tuple[int, int]]
+        Alle unterschiedlichen Schläge als Stundenzahl und Viertelstunde.
+    """
+
+    def __init__(
+        self, striker: 'Striker', renderer: Renderer, folder: str,
+        maxmemory: int, maxdisk: int
+    ):
+        """
+        Erstellt den Cache, ohne bereits zu rendern.
+
+        Parameters
+        ----------
+        striker : Striker
+            Schlagwerk, dessen Schläge gerendert werden.
+        renderer : Renderer
+            Renderer des Carillons.
+        folder : str
+            Ordner für die gerenderten Dateien.
+        maxmemory : int
+            Speicherobergrenze im Arbeitsspeicher in Bytes.
+        maxdisk : int
+            Speicherobergrenze auf der Platte in Bytes.
+        """
+        self.striker: 'Striker' = striker
+        self.renderer: Renderer = renderer
+        self.folder: Path = Path(folder)
+        self.maxmemory: int = maxmemory
+        self.maxdisk: int = maxdisk
+        self.resident: int = 0
+        self._dirty: bool = False
+        self._lock: Lock = Lock()
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._thread: Thread = None
+
+    def get(self, hours: int, quarters: int) -> Optional[np.ndarray]:
+        """
+        Gibt den gerenderten Schlag zur aktuellen Einstellung zurück. Fehlt er,
+        wird das Rendern im Hintergrund angestoßen.
+
+        Parameters
+        ----------
+        hours : int
+            Stundenzahl des Schlags.
+        quarters : int
+            Viertelstunde des Schlags (0 für die volle Stunde).
+
+        Returns
+        -------
+        Der Puffer als 16-Bit-PCM oder `None`, falls (noch) nicht gerendert.
+        """
+        key = self.key(hours, quarters)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        path = self.folder / f'{key}.npy'
+        try:
+            audio = np.load(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.refresh()
+            return None
+        self._remember(key, audio)
+        return audio
+
+    def key(self, hours: int, quarters: int, theme: Theme = None) -> str:
+        """
+        Ermittelt den Schlüssel eines Schlags aus Theme, Viertelstunde,
+        Stundenzahl, Transponierung, Tempo und Lautstärke sowie dem Stand der
+        beteiligten Dateien beim Laden des Themes.
+
+        Parameters
+        ----------
+        hours : int
+            Stundenzahl des Schlags.
+        quarters : int
+            Viertelstunde des Schlags (0 für die volle Stunde).
+        theme : Theme (optional)
+            Theme des Schlags, standardmäßig das aktuelle des Schlagwerks.
+        """
+        theme = theme or self.striker.active
+        hours = (hours - 1) % 12 + 1 if quarters == 0 else 0
+        names = [f'q{quarters if quarters != 0 else 4}.mid']
+        if quarters == 0: names.append('h.mid')
+        files = [f for f in theme.files if f[0] in names]
+
+        parts = (theme.name, quarters, hours, *self._settings(theme),
+                 self.renderer.samplerate, files)
+        return hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+
+    def refresh(self) -> None:
+        """
+        Prüft im Hintergrund, ob alle Schläge des aktuellen Themes gerendert
+        vorliegen, und rendert fehlende nach. Läuft bereits ein Durchgang, wird
+        im Anschluss erneut geprüft.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._dirty = True
+                return
+            self._dirty = False
+            self._thread = Thread(target=self._build, daemon=True)
+            self._thread.start()
+
+    def _build(self) -> None:
+        """
+        Interne Schleife des Hintergrundthreads, die alle fehlenden Schläge
+        rendert und auf der Platte ablegt.
+        """
+        self.folder.mkdir(parents=True, exist_ok=True)
+        while True:
+            theme = self.striker.active
+            volume, rendered = self._settings(theme)[2], 0
+            for hours, quarters in self.strikes():
+                key = self.key(hours, quarters, theme)
+                path = self.folder / f'{key}.npy'
+                if path.exists(): continue
+
+                melody = theme.compose(hours, quarters)
+                offline = Renderer(
+                    self.renderer.organ, self.renderer.samplerate)
+                offline.bank = self.renderer.bank
+                audio = offline.bounce(melody, volume=volume / 127)
+                audio = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+
+                tmp = path.with_name(f'.{key}.tmp.npy')
+                np.save(tmp, audio)
+                os.replace(tmp, path)
+                self._remember(key, audio)
+                rendered += 1
+            self._prune()
+            if rendered: print(f'Rendered {rendered} strikes')
+
+            with self._lock:
+                if not self._dirty:
+                    self._thread = None
+                    return
+                self._dirty = False
+
+    def _prune(self) -> None:
+        """
+        Interne Methode, die die am längsten ungenutzten Dateien löscht, bis
+        die Obergrenze auf der Platte eingehalten ist.
+        """
+        files = [(f.stat(), f) for f in self.folder.glob('*.npy')]
+        files.sort(key=lambda x: x[0].st_mtime_ns)
+        total = sum(stat.st_size for stat, _ in files)
+        for stat, f in files:
+            if total <= self.maxdisk: break
+            f.unlink(missing_ok=True)
+            total -= stat.st_size
+
+    def _remember(self, key: str, audio: np.ndarray) -> None:
+        """
+        Interne Methode, die einen Puffer im Speicher-Cache ablegt und dabei
+        die am längsten ungenutzten Puffer oberhalb der Obergrenze verwirft.
+        """
+        with self._lock:
+            if key in self._memory: return
+            self._memory[key] = audio
+            self.resident += audio.nbytes
+            while self.resident > self.maxmemory and len(self._memory) > 1:
+                self.resident -= self._memory.popitem(last=False)[1].nbytes
+
+    def _settings(self, theme: Theme) -> Tuple[int, float, int]:
+        """
+        Interne Methode, die Transponierung und Tempo eines Themes sowie die
+        Lautstärke des Carillons (0 bis 127) zurückgibt.
+        """
+        volume = round(self.striker.carillon.volume * 127)
+        return theme.transpose, theme.tempo, volume
+
+    @staticmethod
+    def strikes() -> Iterator[Tuple[int, int]]:
+        """
+        Alle unterschiedlichen Schläge eines Themes als Stundenzahl und
+        Viertelstunde: drei Viertelstunden und zwölf volle Stunden.
+        """
+        for quarters in range(1, 4): yield 0, quarters
+        for hours in range(1, 13): yield hours, 0
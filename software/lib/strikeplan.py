@@ -0,0 +1,114 @@
+from datetime import date
+import json
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .melody import Melody
+
+
+class PlannedStrike(NamedTuple):
+    """
+    Ein Schlag des Tagesplans.
+
+    Attributes
+    ----------
+    hours : int
+        Stundenzahl des Schlags.
+    quarters : int
+        Viertelstunde des Schlags (0 für die volle Stunde).
+    melody : Melody
+        Die fertig zusammengestellte Melodie oder `None`, falls der Schlag
+        stumm bleibt.
+    composed : bool
+        Ob die Melodie unverändert vom Schlagwerk stammt, also kein Observer
+        sie angepasst hat.
+    error : str
+        Fehler, mit dem die Berechnung des Schlags scheiterte, oder `None`.
+        Ein gescheiterter Schlag bleibt stumm.
+    """
+    hours: int
+    quarters: int
+    melody: Optional[Melody]
+    composed: bool
+    error: Optional[str] = None
+
+    @property
+    def muted(self) -> bool:
+        """Ob der Schlag stumm bleibt."""
+        return self.melody is None
+
+
+class StrikePlan:
+    """
+    Vorab berechneter Plan aller 96 Viertelstunden eines Tages. Für jeden
+    Schlag ist bereits festgelegt, ob er stumm bleibt und welche Melodie er
+    spielt, sodass ein Schlag nur noch nachschlagen muss.
+
+    Attributes
+    ----------
+    day : date
+        Tag, für den der Plan gilt.
+    signature : Any
+        Stand der Einstellungen, mit dem der Plan berechnet wurde.
+    strikes : List[PlannedStrike]
+        Die Schläge des Tages in zeitlicher Reihenfolge ab 00:00.
+    theme : str
+        Theme, mit dem der Plan berechnet wurde.
+
+    Methods
+    -------
+    export() : Dict[str, Any]
+        Beschreibt den Plan in JSON-tauglicher Form.
+    get(hours, quarters) : PlannedStrike
+        Gibt den geplanten Schlag einer Viertelstunde zurück.
+    json() : str
+        Gibt den Plan als JSON zurück.
+    """
+
+    def __init__(
+        self, day: date, theme: str, signature: Any,
+        strikes: List[PlannedStrike]
+    ):
+        """Erstellt den Plan aus den bereits berechneten Schlägen."""
+        self.day: date = day
+        self.theme: str = theme
+        self.signature: Any = signature
+        self.strikes: List[PlannedStrike] = strikes
+
+    def export(self) -> Dict[str, Any]:
+        """
+        Beschreibt den Plan in JSON-tauglicher Form: Für jeden Schlag Uhrzeit,
+        ob er stumm bleibt, seine Dauer und die gespielten Abschnitte mit
+        Startzeit, Datei, Transponierung und Tempo.
+        """
+        strikes = list()
+        for s in self.strikes:
+            entry = {'time': f'{s.hours:02d}:{s.quarters * 15:02d}',
+                     'muted': s.muted}
+            if s.error is not None: entry['error'] = s.error
+            if not s.muted:
+                entry['duration'] = s.melody.duration
+                entry['segments'] = [
+                    {'offset': offset, 'file': score.source,
+                     'transpose': transpose, 'tempo': tempo}
+                    for offset, score, transpose, tempo
+                    in s.melody.segments()]
+            strikes.append(entry)
+        return {'date': self.day.isoformat(), 'theme': self.theme,
+                'strikes': strikes}
+
+    def get(self, hours: int, quarters: int) -> PlannedStrike:
+        """
+        Gibt den geplanten Schlag einer Viertelstunde zurück.
+
+        Parameters
+        ----------
+        hours : int
+            Stundenzahl (0 bis 23).
+        quarters : int
+            Viertelstunde (0 für die volle Stunde).
+        """
+        return self.strikes[hours * 4 + quarters]
+
+    def json(self) -> str:
+        """Gibt den Plan als JSON zurück."""
+        return json.dumps(self.export(), ensure_ascii=False, indent=2)
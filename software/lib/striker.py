@@ -1,66 +1,147 @@
-from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+from functools import partial
+from importlib import import_module
 from pathlib import Path
-import schedule
-from threading import Thread
-import time
-from typing import Callable, List
+from typing import Any, Callable, Deque, Dict, List, Tuple
 
 from .carillon import Carillon
+from .clock import Clock
 from .melody import Melody
 from .settings import Settings, StrikerSettings
+from .strikeplan import PlannedStrike, StrikePlan
+from .theme import Theme
+from .timerservice import TimerService
 
 
 class Striker:
     """
     Virtuelles Schlagwerk, das jede Viertelstunde auslöst. Anhand eines Themes
-    kann ein Geläutstil ausgewählt werden.
+    kann ein Geläutstil ausgewählt werden. Das Theme wird beim Auswählen
+    vollständig geladen und geprüft; ein fehlerhaftes Theme wird abgelehnt und
+    das bisherige bleibt aktiv, beim Start übernimmt `FALLBACK`.
 
     Attributes
     ----------
+    FALLBACK : str
+        Theme, das beim Start anstelle eines fehlerhaften Themes geladen
+        wird.
+    active : Theme
+        Das vollständig geladene, aktuell verwendete Theme.
     basefolder : Path
         Pfad, in dem die einzelnen Themes bereitstehen.
+    cache : StrikeCache
+        Cache der vorab gerenderten Schläge oder `None`, wenn das Carillon
+        nicht über den eingebauten Renderer spielt.
     carillon : Carillon
         Das Carillon, auf dem geschlagen werden soll.
+    clock : Clock
+        Uhr der Zeitsteuerung, nach der geschlagen wird.
+    error : str
+        Grund, aus dem das eingestellte Theme beim Start abgelehnt wurde,
+        oder `None`.
     folder : Path
         Pfad des Ordners mit aktuellem Theme.
-    observers : List[Callable[[Melody, int, int], Melody]]
+    lateness : Deque[Tuple[datetime, float]]
+        Verspätung des ersten Tons jedes Schlags der letzten Woche in Sekunden
+        samt Sollzeitpunkt. `None`, falls der Schlag nicht begonnen hat.
+    observers : List[Callable[[Melody, int, int, date], Melody]]
         Liste an registrierten Observern für einen Schlag.
+    plan : StrikePlan
+        Plan des heutigen Tages.
+    plans : Dict[date, StrikePlan]
+        Berechnete Tagespläne für heute und ggf. morgen.
     settings : StrikerSettings
         Einstellungsobjekt, das globale Einstellungen bereithält.
     theme : str
         Theme, das die Geläutart vorgibt.
+    timers : TimerService
+        Zeitsteuerung, in der die Schläge eingeplant sind.
 
     Methods
     -------
+    compose(hours, quarters) : Melody
+        Stellt die Melodie eines Schlags zusammen.
+    plan_for(day) : StrikePlan
+        Gibt den aktuellen Plan eines Tages zurück.
+    replan(day) : StrikePlan
+        Berechnet den Tagesplan neu.
     subscribe(observer)
         Registriert eine Callbackmethode.
-    _strike()
-        Interne Methode zum Auslösen des eigentlichen Stundengeläuts.
+    _arm()
+        Bereitet den nächsten Schlag vollständig vor.
+    _signature(theme) : Tuple
+        Gibt den Stand der Einstellungen zurück, von dem der Plan abhängt.
+    _strike(slot, melody, audio)
+        Übergibt einen vorbereiteten Schlag für den Sollzeitpunkt dem
+        Carillon.
     """
 
+    FALLBACK: str = 'default'
+
     def __init__(self, carillon: Carillon):
         """
-        Erstellt das Stundengeläut und bereitet den Scheduler vor. Es wird ein
-        Thread gestartet, der automatisch den Scheduler anstößt.
+        Erstellt das Stundengeläut und plant die Schläge in der gemeinsamen
+        Zeitsteuerung ein. Jeder Schlag wird `prearm` Sekunden vor der
+        Viertelstunde vorbereitet. Ist das eingestellte Theme unvollständig
+        oder fehlerhaft, wird der Grund in `error` vermerkt und stattdessen
+        `FALLBACK` geladen; die Einstellung selbst bleibt unverändert.
 
         Parameters
         ----------
         carillon : Carillon
             Carillon-Objekt, auf dem gespielt wird.
+
+        Raises
+        ------
+        ValueError
+            Falls auch `FALLBACK` unvollständig oder fehlerhaft ist.
         """
         self.carillon: Carillon = carillon
         self.settings: StrikerSettings = Settings().striker
-        self.observers: List[Callable[[Melody, int, int], Melody]] = list()
+        self.timers: TimerService = TimerService.shared()
+        self.clock: Clock = self.timers.clock
+        self.error: str = None
+        try:
+            self.active: Theme = Theme.load(
+                self.basefolder, self.settings.theme,
+                self.settings.themes.get(self.settings.theme))
+        except ValueError as e:
+            if self.settings.theme == self.FALLBACK: raise
+            print(f'Rejected theme: {e}, falling back to {self.FALLBACK}')
+            self.error = str(e)
+            self.active = Theme.load(self.basefolder, self.FALLBACK,
+                                     self.settings.themes.get(self.FALLBACK))
+        self.observers: List[Callable[[Melody, int, int, date], Melody]] = \
+            list()
+        self.plans: Dict[date, StrikePlan] = dict()
+        self.lateness: Deque[Tuple[datetime, float]] = deque(maxlen=7 * 96)
 
-        for q in range(0, 60, 15):
-            schedule.every().hour.at(f':{q:02d}').do(self._strike)
+        # Schläge vorab rendern, wenn das Carillon selbst rendert
+        self.cache: Any = None
+        if self.settings.rendercache and hasattr(carillon.port, 'bounce'):
+            strikecache = import_module('.strikecache', __package__)
+            self.cache = strikecache.StrikeCache(
+                self, carillon.port, self.settings.rendercache,
+                int(self.settings.rendercache_memory * 2 ** 20),
+                int(self.settings.rendercache_disk * 2 ** 20))
+            self.cache.refresh()
+        elif self.settings.rendercache and \
+                getattr(carillon.port, 'renderers', None):
+            print('Strike cache disabled: renderer is one of several ports, '
+                  'strikes are streamed as MIDI')
 
-        def thread() -> None:
-            while True:
-                schedule.run_pending()
-                time.sleep(0.1)
+        for q in range(0, 60, 15):
+            arm = int(q * 60 - self.settings.prearm) % 3600
+            self.timers.add(TimerService.hourly(arm // 60, arm % 60),
+                            self._arm, f'strike:{q:02d}')
 
-        Thread(target=thread, daemon=True).start()
+        # Plan des nächsten Tages rechtzeitig vor Mitternacht berechnen
+        self.timers.add(
+            TimerService.daily(23, 50),
+            lambda: self.replan(self.clock.today() + timedelta(days=1)),
+            'plan')
 
     @property
     def basefolder(self) -> Path:
@@ -70,63 +151,190 @@ class Striker:
     @property
     def folder(self) -> Path:
         """Ordner, in dem sich die aktuellen Theme-Dateien befinden."""
-        return self.basefolder / self.theme
+        return self.active.folder
+
+    @property
+    def plan(self) -> StrikePlan:
+        """Plan des heutigen Tages, wird bei Bedarf berechnet."""
+        return self.plan_for(self.clock.today())
 
     @property
     def theme(self) -> str:
         """Name des aktuell verwendeten Themes."""
-        return self.settings.theme
+        return self.active.name
 
     @theme.setter
     def theme(self, value: str) -> None:
-        """Stellt ein neue Theme ein, sofern das vorhanden ist."""
-        path = self.basefolder / value
-        if path.is_dir(): self.settings.theme = value
+        """
+        Lädt ein Theme vollständig und tauscht es erst danach in einem Schritt
+        gegen das bisherige aus. Erneutes Setzen desselben Themes lädt dessen
+        Dateien neu.
+
+        Raises
+        ------
+        ValueError
+            Falls das Theme unvollständig oder fehlerhaft ist; das bisherige
+            Theme bleibt dann aktiv.
+        """
+        self.active = Theme.load(self.basefolder, value,
+                                 self.settings.themes.get(value))
+        self.settings.theme = value
+        self.error = None
+        print(f'Loaded theme {value}')
+        if self.cache is not None: self.cache.refresh()
+        for day in list(self.plans): self.replan(day)
+
+    def compose(self, hours: int, quarters: int) -> Melody:
+        """
+        Stellt die Melodie eines Schlags aus dem aktuellen Theme zusammen.
+
+        Parameters
+        ----------
+        hours : int
+            Stundenzahl des Schlags.
+        quarters : int
+            Viertelstunde des Schlags (0 für die volle Stunde).
+        """
+        return self.active.compose(hours, quarters)
+
+    def plan_for(self, day: date) -> StrikePlan:
+        """
+        Gibt den Plan eines Tages zurück. Fehlt er oder haben sich die
+        Einstellungen seit seiner Berechnung geändert, wird er neu berechnet.
+
+        Parameters
+        ----------
+        day : date
+            Tag, dessen Plan benötigt wird.
+        """
+        plan = self.plans.get(day)
+        if plan is None or plan.signature != self._signature():
+            plan = self.replan(day)
+        return plan
+
+    def replan(self, day: date = None) -> StrikePlan:
+        """
+        Berechnet den Plan aller 96 Viertelstunden eines Tages: Für jeden
+        Schlag wird die Melodie zusammengestellt und die Kette der Observer
+        durchlaufen, bis einer den Schlag stummschaltet. Scheitert ein
+        Observer, bleibt nur dieser Schlag stumm und der Fehler wird im Plan
+        vermerkt. Pläne vergangener Tage werden verworfen.
+
+        Parameters
+        ----------
+        day : date (optional)
+            Tag, für den geplant wird. Standardmäßig heute.
+
+        Returns
+        -------
+        Der neu berechnete Plan.
+        """
+        if day is None: day = self.clock.today()
+        theme, strikes = self.active, list()
+        for hours in range(24):
+            for quarters in range(4):
+                melody = composed = theme.compose(hours, quarters)
+                try:
+                    for o in self.observers:
+                        melody = o(melody, hours, quarters, day)
+                        if melody is None: break
+                except Exception as e:
+                    print(f'Strike {hours:02d}:{quarters * 15:02d} on '
+                          f'{day.isoformat()} failed: {e!r}')
+                    strikes.append(PlannedStrike(
+                        hours, quarters, None, False, repr(e)))
+                    continue
+                strikes.append(PlannedStrike(
+                    hours, quarters, melody, melody is composed))
+
+        plan = StrikePlan(day, theme.name, self._signature(theme), strikes)
+        self.plans = {d: p for d, p in self.plans.items()
+                      if d >= self.clock.today() and d != day}
+        self.plans[day] = plan
+        print(f'Planned strikes for {day.isoformat()} ({theme.name})')
+        return plan
 
     def subscribe(
-        self, observer: Callable[[Melody, int, int], Melody]
+        self, observer: Callable[[Melody, int, int, date], Melody]
     ) -> None:
         """
         Registriert eine Methode, die über auszuführende Schläge informiert
-        werden soll. Sie muss die Parameter Melodie, Stundenzahl und
-        Viertelstundenzahl aufnehmen.
+        werden soll. Sie muss die Parameter Melodie, Stundenzahl,
+        Viertelstundenzahl und Tag des Schlags aufnehmen. Observer werden beim
+        Berechnen des Tagesplans befragt, nicht erst zum Schlag selbst.
 
         Parameters
         ----------
-        observer : Callable[[Melody, int, int], Melody]
+        observer : Callable[[Melody, int, int, date], Melody]
             Callback-Methode, die informiert werden soll.
         """
         self.observers.append(observer)
 
-    def _strike(self) -> None:
-        """Interne Methode, die das eigentliche Stundengeläut auslöst."""
-
-        # Ermitteln der Anzahl an Stunden- und Viertelstundenschlägen
-        time = datetime.now() + timedelta(minutes=7, seconds=30)
-        hours, quarters = time.hour, time.minute // 15
-        print(f'Striking: {hours:02d}:{quarters * 15:02d}')
-
-        # Viertelstundenschläge in Melodie einladen
-        melody = Melody()
-        qpath = self.folder / f'q{quarters if quarters != 0 else 4}.mid'
-        if qpath.exists(): melody += Melody.from_file(qpath)
-
-        # Bei Bedarf Stundenschlag anfügen
-        if quarters == 0:
-            hpath = self.folder / 'h.mid'
-            h = hours % 12
-            if h == 0: h = 12
-            if hpath.exists(): melody += Melody.from_file(hpath) * h
-
-        # Ggf. Einstellungen für die Melodie übernehmen
-        if self.theme in self.settings.themes:
-            cfg = self.settings.themes[self.theme]
-            if 'transpose' in cfg: melody.transpose = cfg['transpose']
-            if 'tempo' in cfg: melody.tempo = cfg['tempo']
-
-        # Alle Observer noch um ihre Meinung fragen und ggf. abbrechen
-        for o in self.observers: melody = o(melody, hours, quarters)
-        if melody is None: return
-
-        # Melodie wiedergeben
-        self.carillon.play(melody, self.settings.priority)
+    def _arm(self) -> None:
+        """
+        Interne Methode, die den nächsten Schlag im Tagesplan nachschlägt und
+        ihn kurz vor dem Sollzeitpunkt an das Carillon übergibt.
+        """
+
+        # Nächste Viertelstunde als Sollzeitpunkt ermitteln
+        target = self.clock.now() + timedelta(
+            seconds=self.settings.prearm, minutes=7.5)
+        slot = target.replace(minute=target.minute // 15 * 15, second=0,
+                              microsecond=0)
+        hours, quarters = slot.hour, slot.minute // 15
+        print(f'Preparing strike: {hours:02d}:{quarters * 15:02d}')
+        strike = self.plan_for(slot.date()).get(hours, quarters)
+        if strike.muted: return
+
+        # Unveränderte Schläge ggf. als gerenderten Puffer abspielen
+        audio = None
+        if self.cache is not None and strike.composed:
+            audio = self.cache.get(hours, quarters)
+
+        # Kurz vor dem Sollzeitpunkt an das Carillon übergeben
+        self.timers.at(slot.timestamp() - 1,
+                       partial(self._strike, slot, strike.melody, audio),
+                       f'strike {slot:%H:%M}')
+
+    def _signature(self, theme: Theme = None) -> Tuple:
+        """
+        Interne Methode, die den Stand der Einstellungen zurückgibt, von dem
+        der Tagesplan abhängt: geladenes Theme, Einstellungen des Schlagwerks
+        und Anzahl der Observer.
+        """
+        theme = theme or self.active
+        return theme, self.settings.json(), len(self.observers)
+
+    def _strike(self, slot: datetime, melody: Melody, audio: Any) -> None:
+        """
+        Interne Methode, die einen vorbereiteten Schlag dem Carillon übergibt.
+        Der Sollzeitpunkt wird dabei von der Wanduhr auf die monotone Uhr des
+        Carillons umgerechnet, das den ersten Ton exakt dann anschlägt. Die
+        Verspätung des ersten Tons wird in `lateness` festgehalten. Kann der
+        Schlag nicht spätestens eine Sekunde nach dem Sollzeitpunkt beginnen
+        (etwa weil eine Melodie höherer Priorität läuft), wird er verworfen:
+        Ein ausgelassener Schlag ist besser als eine falsche Zeitangabe.
+
+        Parameters
+        ----------
+        slot : datetime
+            Sollzeitpunkt des Schlags.
+        melody : Melody
+            Die fertig vorbereitete Melodie.
+        audio : Any
+            Gerenderte Fassung der Melodie oder `None`.
+        """
+        start = self.clock.perf_counter() + slot.timestamp() - \
+            self.clock.time()
+        started = Future()
+
+        def record(future: Future) -> None:
+            lateness = future.result()
+            self.lateness.append((slot, lateness))
+            if lateness is not None:
+                print(f'Strike {slot:%H:%M} started {lateness * 1000:.1f} ms '
+                      'late')
+        started.add_done_callback(record)
+        timeout = slot.timestamp() - self.clock.time() + 1
+        self.carillon.play(melody, self.settings.priority, timeout=timeout,
+                           audio=audio, start=start, started=started)
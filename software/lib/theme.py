@@ -0,0 +1,148 @@
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from .melody import Melody
+
+
+class Theme:
+    """
+    Vollständig geladenes Theme des Schlagwerks. Beim Laden werden alle
+    Dateien eingelesen, geprüft und vorkodiert; danach ändert sich das Objekt
+    nicht mehr. Das Schlagwerk tauscht beim Themewechsel nur den Verweis auf
+    ein neues Objekt aus, sodass ein Schlag nie ein halb geladenes Theme
+    sieht.
+
+    Attributes
+    ----------
+    FILES : Tuple[str, ...]
+        Dateien, die jedes Theme enthalten muss.
+    files : Tuple[Tuple[str, int, int], ...]
+        Name, Änderungszeit und Größe der Dateien zum Zeitpunkt des Ladens.
+    folder : Path
+        Ordner des Themes.
+    hour : Melody
+        Stundenschlag, der entsprechend der Stundenzahl wiederholt wird.
+    name : str
+        Name des Themes.
+    quarters : Tuple[Melody, ...]
+        Viertelstundenschläge, beginnend mit der ersten Viertelstunde.
+    tempo : float
+        Tempo, mit dem die Schläge gespielt werden.
+    transpose : int
+        Transponierung der Schläge in Halbtönen.
+
+    Methods
+    -------
+    compose(hours, quarters) : Melody
+        Stellt die Melodie eines Schlags zusammen.
+
+    Class Methods
+    -------------
+    load(basefolder, name, cfg) : Theme
+        Lädt und prüft ein Theme.
+    """
+
+    FILES: Tuple[str, ...] = ('q1.mid', 'q2.mid', 'q3.mid', 'q4.mid', 'h.mid')
+
+    def __init__(
+        self, name: str, folder: Path, quarters: Tuple[Melody, ...],
+        hour: Melody, transpose: int = 0, tempo: float = 1,
+        files: Tuple[Tuple[str, int, int], ...] = ()
+    ):
+        """Erstellt das Theme aus bereits geladenen Melodien."""
+        self.name: str = name
+        self.folder: Path = folder
+        self.quarters: Tuple[Melody, ...] = quarters
+        self.hour: Melody = hour
+        self.transpose: int = transpose
+        self.tempo: float = tempo
+        self.files: Tuple[Tuple[str, int, int], ...] = files
+
+    def compose(self, hours: int, quarters: int) -> Melody:
+        """
+        Stellt die Melodie eines Schlags aus den geladenen Dateien zusammen und
+        übernimmt Transponierung und Tempo des Themes.
+
+        Parameters
+        ----------
+        hours : int
+            Stundenzahl des Schlags.
+        quarters : int
+            Viertelstunde des Schlags (0 für die volle Stunde).
+        """
+        melody = Melody()
+        melody += self.quarters[quarters - 1]
+        if quarters == 0:
+            h = hours % 12
+            if h == 0: h = 12
+            melody += self.hour * h
+        melody.transpose = self.transpose
+        melody.tempo = self.tempo
+        return melody
+
+    @classmethod
+    def load(
+        cls, basefolder: Path, name: str, cfg: Dict[str, Any] = None
+    ) -> 'Theme':
+        """
+        Lädt alle Dateien eines Themes und prüft sie: Jede Datei muss
+        vorhanden und lesbar sein, mindestens einen Ton enthalten und darf
+        durch die Transponierung den MIDI-Tonumfang nicht verlassen. Die
+        Nachrichten werden dabei bereits vorkodiert.
+
+        Parameters
+        ----------
+        basefolder : Path
+            Ordner, in dem die Theme-Ordner liegen.
+        name : str
+            Name des Themes.
+        cfg : Dict[str, Any] (optional)
+            Einstellungen des Themes (`transpose`, `tempo`).
+
+        Raises
+        ------
+        ValueError
+            Falls das Theme unvollständig oder fehlerhaft ist; die Meldung
+            nennt den Grund.
+        """
+        cfg = cfg or dict()
+        folder = Path(basefolder) / name
+        if not name or not folder.is_dir():
+            raise ValueError(f'Theme {name}: Ordner {folder} fehlt')
+
+        transpose, tempo = cfg.get('transpose', 0), cfg.get('tempo', 1)
+        if not isinstance(transpose, int):
+            raise ValueError(f'Theme {name}: Transponierung {transpose!r} '
+                             'ist keine ganze Zahl')
+        if not isinstance(tempo, (int, float)) or tempo <= 0:
+            raise ValueError(f'Theme {name}: Tempo {tempo!r} ist ungültig')
+
+        melodies, files = list(), list()
+        for filename in cls.FILES:
+            path = folder / filename
+            try:
+                stat = path.stat()
+                melody = Melody.from_file(path)
+            except FileNotFoundError:
+                raise ValueError(f'Theme {name}: {filename} fehlt') from None
+            except Exception as e:
+                raise ValueError(f'Theme {name}: {filename} ist nicht '
+                                 f'lesbar ({e!r})') from e
+
+            notes = [d1 for _, score, _, _ in melody.segments()
+                     for s, d1, d2 in zip(score.statuses, score.data1,
+                                          score.data2)
+                     if s == 0x90 and d2 > 0]
+            if not notes:
+                raise ValueError(
+                    f'Theme {name}: {filename} enthält keine Töne')
+            if min(notes) + transpose < 0 or max(notes) + transpose > 127:
+                raise ValueError(f'Theme {name}: {filename} verlässt mit '
+                                 f'Transponierung {transpose} den Tonumfang')
+
+            for _, score, _, _ in melody.segments(): score.wire(transpose)
+            melodies.append(melody)
+            files.append((filename, stat.st_mtime_ns, stat.st_size))
+
+        return cls(name, folder, tuple(melodies[:4]), melodies[4], transpose,
+                   tempo, tuple(files))
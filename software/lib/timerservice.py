@@ -0,0 +1,351 @@
+from datetime import datetime, timedelta
+import heapq
+import itertools
+from threading import Condition, Thread
+import time
+from typing import Callable, List, Optional, Tuple
+
+from .clock import Clock, VirtualClock
+
+
+class Job:
+    """
+    Eine wiederkehrende Aufgabe des `TimerService`.
+
+    Attributes
+    ----------
+    callback : Callable[[], None]
+        Methode, die zum Fälligkeitszeitpunkt aufgerufen wird.
+    cancelled : bool
+        Ob die Aufgabe abgebrochen wurde.
+    due : float
+        Nächster Fälligkeitszeitpunkt als Unix-Zeitstempel.
+    name : str
+        Name der Aufgabe für Ausgaben.
+    rule : Callable[[float], Optional[float]]
+        Ermittelt aus einem Zeitpunkt den nächsten Fälligkeitszeitpunkt danach
+        oder `None` für einmalige Aufgaben.
+    """
+
+    __slots__ = ('callback', 'cancelled', 'due', 'name', 'rule')
+
+    def __init__(
+        self, rule: Callable[[float], Optional[float]],
+        callback: Callable[[], None], name: str
+    ):
+        """Erstellt die Aufgabe, ohne sie bereits einzuplanen."""
+        self.rule: Callable[[float], Optional[float]] = rule
+        self.callback: Callable[[], None] = callback
+        self.name: str = name
+        self.cancelled: bool = False
+        self.due: float = None
+
+
+class TimerService:
+    """
+    Zeitsteuerung, die alle wiederkehrenden Aufgaben in einem Heap verwaltet
+    und genau bis zur nächsten Fälligkeit schläft, statt regelmäßig nachzusehen.
+    Neue oder abgebrochene Aufgaben wecken den Thread sofort.
+
+    Fälligkeiten beziehen sich auf die Wanduhr. Springt diese (etwa durch eine
+    NTP-Korrektur), wird das spätestens nach `MAXSLEEP` Sekunden bemerkt und
+    alle Aufgaben werden ab der neuen Uhrzeit neu eingeplant; verpasste
+    Aufgaben werden dabei nicht nachgeholt. Die Zeitumstellung verschiebt die
+    Unix-Zeit nicht und wird über die Regeln in Ortszeit berücksichtigt.
+
+    Mit einer `VirtualClock` läuft kein Thread: Die Aufgaben werden dann erst
+    über `advance` im Zeitraffer ausgeführt, wobei die Uhr jeweils auf den
+    Fälligkeitszeitpunkt vorrückt.
+
+    Attributes
+    ----------
+    JUMP : float
+        Abweichung zwischen Wanduhr und monotoner Uhr in Sekunden, ab der ein
+        Sprung der Wanduhr angenommen wird.
+    MAXSLEEP : float
+        Maximale Anzahl an Sekunden, die am Stück geschlafen wird.
+    clock : Clock
+        Uhr, nach der die Aufgaben fällig werden.
+    thread : Thread
+        Thread, der die Aufgaben ausführt, bzw. `None` bei virtueller Uhr.
+    _condition : Condition
+        Sichert den Heap zwischen den Threads ab.
+    _counter : itertools.count
+        Laufende Nummer, die gleiche Fälligkeiten in Eingangsreihenfolge hält.
+    _heap : List[Tuple[float, int, Job]]
+        Heap der eingeplanten Aufgaben.
+    _shared : TimerService
+        Gemeinsam genutzte Instanz.
+
+    Methods
+    -------
+    add(rule, callback, name) : Job
+        Plant eine wiederkehrende Aufgabe ein.
+    advance(until)
+        Führt bei virtueller Uhr alle Aufgaben bis zu einem Zeitpunkt aus.
+    at(when, callback, name) : Job
+        Plant eine einmalige Aufgabe ein.
+    cancel(job)
+        Bricht eine Aufgabe ab.
+    jobs() : List[Job]
+        Gibt alle eingeplanten Aufgaben nach Fälligkeit zurück.
+    _push(job)
+        Legt eine Aufgabe auf den Heap.
+    _reschedule(now)
+        Plant alle Aufgaben ab einem Zeitpunkt neu ein.
+    _run(job, due)
+        Führt eine Aufgabe aus und plant sie erneut ein.
+    _work()
+        Schleife des Threads.
+
+    Class Methods
+    -------------
+    shared() : TimerService
+        Gibt die gemeinsam genutzte Instanz zurück.
+    use(timers)
+        Legt die gemeinsam genutzte Instanz fest.
+
+    Static Methods
+    --------------
+    daily(hour, minute) : Callable[[float], float]
+        Regel für eine tägliche Aufgabe.
+    hourly(minute, second) : Callable[[float], float]
+        Regel für eine stündliche Aufgabe.
+    interval(seconds) : Callable[[float], float]
+        Regel für eine Aufgabe in festem Abstand.
+    """
+
+    JUMP: float = 1
+    MAXSLEEP: float = 60
+    _shared: 'TimerService' = None
+
+    def __init__(self, clock: Clock = None):
+        """
+        Erstellt die Zeitsteuerung und startet ihren Thread.
+
+        Parameters
+        ----------
+        clock : Clock (optional)
+            Uhr, nach der die Aufgaben fällig werden, standardmäßig die des
+            Systems. Mit einer `VirtualClock` wird kein Thread gestartet.
+        """
+        self.clock: Clock = clock or Clock()
+        self._condition: Condition = Condition()
+        self._counter: itertools.count = itertools.count()
+        self._heap: List[Tuple[float, int, Job]] = list()
+        self.thread: Thread = None
+        if isinstance(self.clock, VirtualClock): return
+        self.thread = Thread(target=self._work, daemon=True)
+        self.thread.start()
+
+    def add(
+        self, rule: Callable[[float], float], callback: Callable[[], None],
+        name: str = None
+    ) -> Job:
+        """
+        Plant eine wiederkehrende Aufgabe ein.
+
+        Parameters
+        ----------
+        rule : Callable[[float], float]
+            Ermittelt aus einem Unix-Zeitstempel den nächsten
+            Fälligkeitszeitpunkt danach, siehe etwa `hourly` und `daily`.
+        callback : Callable[[], None]
+            Methode, die zu jedem Fälligkeitszeitpunkt aufgerufen wird.
+        name : str (optional)
+            Name der Aufgabe für Ausgaben.
+
+        Returns
+        -------
+        Die Aufgabe, über die sie sich wieder abbrechen lässt.
+        """
+        job = Job(rule, callback, name or callback.__name__)
+        with self._condition:
+            job.due = rule(self.clock.time())
+            self._push(job)
+        return job
+
+    def advance(self, until: float) -> None:
+        """
+        Führt bei virtueller Uhr alle bis zu einem Zeitpunkt fälligen Aufgaben
+        in ihrer Reihenfolge aus. Die Uhr rückt dabei jeweils auf den
+        Fälligkeitszeitpunkt und zum Schluss auf `until` vor.
+
+        Parameters
+        ----------
+        until : float
+            Zeitpunkt als Unix-Zeitstempel, bis zu dem ausgeführt wird.
+        """
+        while True:
+            with self._condition:
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                if not self._heap or self._heap[0][0] > until: break
+                due, _, job = heapq.heappop(self._heap)
+            self.clock.current = max(self.clock.current, due)
+            self._run(job, due)
+        self.clock.current = max(self.clock.current, until)
+
+    def at(
+        self, when: float, callback: Callable[[], None], name: str = None
+    ) -> Job:
+        """
+        Plant eine einmalige Aufgabe ein. Liegt der Zeitpunkt bereits in der
+        Vergangenheit, wird sie sofort ausgeführt.
+
+        Parameters
+        ----------
+        when : float
+            Fälligkeitszeitpunkt als Unix-Zeitstempel.
+        callback : Callable[[], None]
+            Methode, die zum Fälligkeitszeitpunkt aufgerufen wird.
+        name : str (optional)
+            Name der Aufgabe für Ausgaben.
+
+        Returns
+        -------
+        Die Aufgabe, über die sie sich wieder abbrechen lässt.
+        """
+        job = Job(lambda now: None, callback, name or callback.__name__)
+        with self._condition:
+            job.due = when
+            self._push(job)
+        return job
+
+    def cancel(self, job: Job) -> None:
+        """Bricht eine Aufgabe ab."""
+        with self._condition:
+            job.cancelled = True
+            self._condition.notify()
+
+    def jobs(self) -> List[Job]:
+        """Gibt alle eingeplanten Aufgaben nach Fälligkeit sortiert zurück."""
+        with self._condition:
+            return [j for _, _, j in sorted(self._heap) if not j.cancelled]
+
+    def _push(self, job: Job) -> None:
+        """
+        Interne Methode, die eine Aufgabe auf den Heap legt und den Thread
+        weckt. Muss mit gehaltener Sperre aufgerufen werden.
+        """
+        heapq.heappush(self._heap, (job.due, next(self._counter), job))
+        self._condition.notify()
+
+    def _reschedule(self, now: float) -> None:
+        """
+        Interne Methode, die alle Aufgaben ab einem Zeitpunkt neu einplant.
+        Muss mit gehaltener Sperre aufgerufen werden.
+        """
+        jobs = [j for _, _, j in self._heap if not j.cancelled]
+        self._heap.clear()
+        for job in jobs:
+            due = job.rule(now)
+            if due is not None: job.due = due
+            self._push(job)
+
+    def _run(self, job: Job, due: float) -> None:
+        """
+        Interne Methode, die eine vom Heap genommene Aufgabe ausführt und
+        wiederkehrende Aufgaben erneut einplant.
+        """
+        try:
+            job.callback()
+        except Exception as e:
+            print(f'Job {job.name} failed: {e!r}')
+
+        with self._condition:
+            if job.cancelled: return
+            job.due = job.rule(max(self.clock.time(), due))
+            if job.due is not None: self._push(job)
+
+    def _work(self) -> None:
+        """
+        Interne Schleife, die bis zur nächsten Fälligkeit schläft, die Aufgabe
+        ausführt und sie neu einplant.
+        """
+        while True:
+            with self._condition:
+                while True:
+                    if self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                        continue
+                    wall, mono = self.clock.time(), time.monotonic()
+                    remaining = self._heap[0][0] - wall if self._heap \
+                        else self.MAXSLEEP
+                    if remaining <= 0: break
+                    self._condition.wait(min(remaining, self.MAXSLEEP))
+
+                    # Sprung der Wanduhr erkennen
+                    jump = self.clock.time() - wall - (time.monotonic() - mono)
+                    if abs(jump) > self.JUMP:
+                        print(f'Clock jumped by {jump:.1f} s, rescheduling')
+                        self._reschedule(self.clock.time())
+                due, _, job = heapq.heappop(self._heap)
+            self._run(job, due)
+
+    @classmethod
+    def shared(cls) -> 'TimerService':
+        """Gibt die gemeinsam genutzte Instanz zurück und erstellt sie ggf."""
+        if cls._shared is None: cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def use(cls, timers: 'TimerService') -> None:
+        """
+        Legt die gemeinsam genutzte Instanz fest, etwa eine mit virtueller
+        Uhr. Muss vor dem Erstellen der zeitgesteuerten Objekte geschehen.
+        """
+        cls._shared = timers
+
+    @staticmethod
+    def daily(hour: int, minute: int = 0) -> Callable[[float], float]:
+        """
+        Regel für eine Aufgabe, die täglich zur angegebenen Ortszeit fällig
+        ist.
+
+        Parameters
+        ----------
+        hour : int
+            Stunde der Fälligkeit.
+        minute : int (optional)
+            Minute der Fälligkeit.
+        """
+        def rule(now: float) -> float:
+            day = datetime.fromtimestamp(now).date()
+            while True:
+                due = datetime(day.year, day.month, day.day, hour, minute)
+                if due.timestamp() > now: return due.timestamp()
+                day += timedelta(days=1)
+        return rule
+
+    @staticmethod
+    def hourly(minute: int, second: int = 0) -> Callable[[float], float]:
+        """
+        Regel für eine Aufgabe, die jede Stunde zur angegebenen Minute und
+        Sekunde (Ortszeit) fällig ist.
+
+        Parameters
+        ----------
+        minute : int
+            Minute der Fälligkeit.
+        second : int (optional)
+            Sekunde der Fälligkeit.
+        """
+        def rule(now: float) -> float:
+            local = datetime.fromtimestamp(now).astimezone()
+            due = local.replace(minute=minute, second=second, microsecond=0)
+            while due.timestamp() <= now: due += timedelta(hours=1)
+            return due.timestamp()
+        return rule
+
+    @staticmethod
+    def interval(seconds: float) -> Callable[[float], float]:
+        """
+        Regel für eine Aufgabe, die im festen Abstand fällig ist.
+
+        Parameters
+        ----------
+        seconds : float
+            Abstand in Sekunden.
+        """
+        return lambda now: now + seconds
@@ -0,0 +1,187 @@
+from datetime import date, timedelta
+import json
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .direktorium.direktorium import Direktorium
+from .direktorium.event import Event
+from .direktorium.rank import Rank
+from .direktorium.season import Season
+from .settings import DirektoriumSettings
+
+
+class TimetableDay(NamedTuple):
+    """
+    Ein Tag des Jahresfahrplans.
+
+    Attributes
+    ----------
+    day : date
+        Der Tag.
+    title : str
+        Bezeichnung des Tages laut Direktorium.
+    rank : Rank
+        Rang des Tages.
+    season : Season
+        Zeit im Kirchenjahr.
+    theme : str
+        Schlagwerktheme des Tages oder `None` für das eingestellte.
+    antiphon : str
+        Pfad zur marianischen Antiphon oder `None`, falls keine gespielt wird.
+    eastermute : bool
+        Ob das Schlagwerk wegen der Osterstille schweigt.
+
+    Methods
+    -------
+    export() : Dict[str, Any]
+        Beschreibt den Tag in JSON-tauglicher Form.
+    """
+    day: date
+    title: str
+    rank: Rank
+    season: Season
+    theme: Optional[str]
+    antiphon: Optional[str]
+    eastermute: bool
+
+    def export(self) -> Dict[str, Any]:
+        """Beschreibt den Tag in JSON-tauglicher Form."""
+        return {'date': self.day.isoformat(), 'title': self.title,
+                'rank': str(self.rank), 'season': self.season.name.lower(),
+                'theme': self.theme, 'antiphon': self.antiphon,
+                'eastermute': self.eastermute}
+
+
+class Timetable:
+    """
+    Vorab aus dem Direktorium berechneter Fahrplan eines Jahres: Für jeden
+    Tag ist festgelegt, mit welchem Theme das Schlagwerk schlägt, welche
+    marianische Antiphon folgt und ob es wegen der Osterstille schweigt. Die
+    tägliche Arbeit ist damit ein Nachschlagen über den Index des Tages.
+
+    Attributes
+    ----------
+    days : List[TimetableDay]
+        Alle Tage des Jahres ab dem 1. Januar.
+    signature : Any
+        Stand von Kalenderdaten und Einstellungen, mit dem berechnet wurde.
+    year : int
+        Jahr des Fahrplans.
+
+    Methods
+    -------
+    export() : Dict[str, Any]
+        Beschreibt den Fahrplan in JSON-tauglicher Form.
+    get(day) : TimetableDay
+        Gibt den Eintrag eines Tages zurück.
+    json() : str
+        Gibt den Fahrplan als JSON zurück.
+
+    Class Methods
+    -------------
+    compile(year, direktorium, settings, signature) : Timetable
+        Berechnet den Fahrplan eines Jahres.
+
+    Static Methods
+    --------------
+    antiphon(season, settings) : Optional[str]
+        Wählt die marianische Antiphon zu einer Zeit im Kirchenjahr.
+    theme(event, settings) : Optional[str]
+        Wählt das Theme zum wichtigsten Event eines Tages.
+    """
+
+    def __init__(self, year: int, signature: Any, days: List[TimetableDay]):
+        """Erstellt den Fahrplan aus den bereits berechneten Tagen."""
+        self.year: int = year
+        self.signature: Any = signature
+        self.days: List[TimetableDay] = days
+
+    def export(self) -> Dict[str, Any]:
+        """Beschreibt den Fahrplan in JSON-tauglicher Form."""
+        return {'year': self.year, 'days': [d.export() for d in self.days]}
+
+    def get(self, day: date) -> TimetableDay:
+        """
+        Gibt den Eintrag eines Tages zurück.
+
+        Parameters
+        ----------
+        day : date
+            Tag innerhalb des Jahres des Fahrplans.
+        """
+        return self.days[day.timetuple().tm_yday - 1]
+
+    def json(self) -> str:
+        """Gibt den Fahrplan als JSON zurück."""
+        return json.dumps(self.export(), ensure_ascii=False, indent=2)
+
+    @classmethod
+    def compile(
+        cls, year: int, direktorium: Direktorium,
+        settings: DirektoriumSettings, signature: Any = None
+    ) -> 'Timetable':
+        """
+        Berechnet den Fahrplan eines Jahres in einem Durchgang über alle
+        Events des Jahres.
+
+        Parameters
+        ----------
+        year : int
+            Zu berechnendes Jahr.
+        direktorium : Direktorium
+            Direktorium, aus dem die Events stammen.
+        settings : DirektoriumSettings
+            Einstellungen zu Themes, Antiphonen und Osterstille.
+        signature : Any (optional)
+            Stand, unter dem der Fahrplan vermerkt wird.
+        """
+        first, last = date(year, 1, 1), date(year, 12, 31)
+        events: Dict[date, Event] = dict()
+        for e in direktorium.range(first, last): events.setdefault(e.date, e)
+
+        easter = Direktorium.easter(year)
+        silent = {easter - timedelta(days=2), easter - timedelta(days=1)}
+        days = list()
+        for n in range((last - first).days + 1):
+            day = first + timedelta(days=n)
+            event = events.get(day) or direktorium.fallback(day)[0]
+            season = Direktorium.season(direktorium, day)
+            days.append(TimetableDay(
+                day, event.title, event.rank, season,
+                cls.theme(event, settings), cls.antiphon(season, settings),
+                settings.eastermute and day in silent))
+        return cls(year, signature, days)
+
+    @staticmethod
+    def antiphon(
+        season: Season, settings: DirektoriumSettings
+    ) -> Optional[str]:
+        """
+        Wählt die marianische Antiphon zu einer Zeit im Kirchenjahr oder
+        `None`, falls keine gespielt wird.
+        """
+        if settings.antiphon is None: return None
+        if season == Season.CHRISTMAS: return settings.antiphon_christmas
+        if season == Season.LENT: return settings.antiphon_lent
+        if season == Season.EASTER: return settings.antiphon_easter
+        return settings.antiphon_ordinary
+
+    @staticmethod
+    def theme(event: Event, settings: DirektoriumSettings) -> Optional[str]:
+        """
+        Wählt nach Rang bzw. Sonntag das Theme zum wichtigsten Event eines
+        Tages oder `None`, falls das eingestellte Theme gilt.
+        """
+        rank = event.rank
+        if rank == Rank.HOCHFEST and settings.theme_hochfest is not None:
+            return settings.theme_hochfest
+        if rank == Rank.FEST and settings.theme_fest is not None:
+            return settings.theme_fest
+        if rank == Rank.GEBOTEN and settings.theme_geboten is not None:
+            return settings.theme_geboten
+        if rank == Rank.NICHTGEBOTEN and \
+                settings.theme_nichtgeboten is not None:
+            return settings.theme_nichtgeboten
+        if 'sonntag' in event.title.lower() and \
+                settings.theme_sonntag is not None:
+            return settings.theme_sonntag
+        return None
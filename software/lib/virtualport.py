@@ -0,0 +1,77 @@
+from array import array
+import mido
+from threading import Lock
+import time
+from typing import List
+
+from .wireport import WirePort
+
+
+class VirtualPort:
+    """
+    Virtueller MIDI-Port, der nichts ausgibt, sondern jede empfangene
+    Nachricht mit einem hochauflösenden Zeitstempel (`time.perf_counter`)
+    aufzeichnet. Damit lässt sich das Carillon ohne rtmidi und GrandOrgue
+    testen und vermessen.
+
+    Attributes
+    ----------
+    messages : List[bytes]
+        Alle empfangenen Nachrichten in Eingangsreihenfolge.
+    resets : array
+        Zeitpunkte, zu denen der Port zurückgesetzt wurde.
+    times : array
+        Empfangszeitpunkt jeder Nachricht parallel zu `messages`.
+    _lock : Lock
+        Sichert die Aufzeichnung zwischen Threads ab.
+
+    Methods
+    -------
+    clear()
+        Verwirft alle Aufzeichnungen.
+    reset()
+        Zeichnet ein Zurücksetzen auf.
+    send(msg)
+        Zeichnet eine `mido.Message` auf.
+    send_bytes(data)
+        Zeichnet vorkodierte MIDI-Nachrichten auf.
+    """
+
+    def __init__(self):
+        """Erstellt den Port mit leerer Aufzeichnung."""
+        self.messages: List[bytes] = list()
+        self.resets: array = array('d')
+        self.times: array = array('d')
+        self._lock: Lock = Lock()
+
+    def clear(self) -> None:
+        """Verwirft alle Aufzeichnungen."""
+        with self._lock:
+            self.messages = list()
+            self.resets = array('d')
+            self.times = array('d')
+
+    def reset(self) -> None:
+        """Zeichnet ein Zurücksetzen auf."""
+        now = time.perf_counter()
+        with self._lock: self.resets.append(now)
+
+    def send(self, msg: mido.Message) -> None:
+        """Zeichnet eine `mido.Message` auf."""
+        self.send_bytes(bytes(msg.bytes()))
+
+    def send_bytes(self, data: bytes) -> None:
+        """
+        Zeichnet vorkodierte MIDI-Nachrichten auf. Wie bei einem echten Port
+        wird jede Nachricht einer Gruppe einzeln und mit eigenem Zeitstempel
+        übernommen, sodass sich auch die Spreizung von Akkorden messen lässt.
+
+        Parameters
+        ----------
+        data : bytes
+            Aneinandergereihte, vollständige MIDI-Nachrichten.
+        """
+        with self._lock:
+            for msg in WirePort.split(data):
+                self.messages.append(msg)
+                self.times.append(time.perf_counter())
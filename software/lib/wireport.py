@@ -0,0 +1,104 @@
+import mido
+from typing import Any, Iterator
+
+
+class WirePort:
+    """
+    Adapter, der vorkodierte MIDI-Bytes mit möglichst wenigen Aufrufen an
+    einen Port übergibt. Ein Aufruf von `send` erhält dabei eine Gruppe
+    vollständiger, gleichzeitig zu spielender Nachrichten.
+
+    Je nach Port wird der günstigste Weg gewählt:
+
+    * Ports mit einer Methode `send_bytes` erhalten die ganze Gruppe auf
+      einmal.
+    * rtmidi-Ports von mido erhalten jede Nachricht direkt als Bytes, ohne dass
+      `mido.Message`-Objekte entstehen. Dafür wird auf den internen
+      rtmidi-Ausgang des Ports zugegriffen; fehlt er in einer anderen
+      mido-Fassung, wird auf den folgenden Weg ausgewichen.
+    * Alle anderen Ports erhalten wie gewohnt `mido.Message`-Objekte.
+
+    Attributes
+    ----------
+    port : Any
+        Der eigentliche MIDI-Port.
+
+    Methods
+    -------
+    reset()
+        Setzt den Port zurück.
+    send(data)
+        Sendet eine Gruppe vorkodierter Nachrichten.
+
+    Static Methods
+    --------------
+    split(data) : Iterator[bytes]
+        Zerlegt eine Gruppe in einzelne Nachrichten.
+    _raw(port) : Any
+        Gibt ggf. den rtmidi-Ausgang eines mido-Ports zurück.
+    """
+
+    def __init__(self, port: Any):
+        """
+        Erstellt den Adapter und wählt den Sendeweg für den Port.
+
+        Parameters
+        ----------
+        port : Any
+            MIDI-Port, etwa ein von `mido.open_output` geöffneter Port.
+        """
+        self.port: Any = port
+        rt = self._raw(port)
+        if hasattr(port, 'send_bytes'):
+            self.send = port.send_bytes
+        elif rt is not None:
+            def send(data: bytes) -> None:
+                for msg in WirePort.split(data): rt.send_message(msg)
+            self.send = send
+
+    def reset(self) -> None:
+        """Setzt den Port zurück, beendet also insbesondere alle Töne."""
+        self.port.reset()
+
+    def send(self, data: bytes) -> None:
+        """
+        Sendet eine Gruppe vorkodierter Nachrichten an den Port. Diese
+        Standardimplementierung wird je nach Port im Konstruktor ersetzt.
+
+        Parameters
+        ----------
+        data : bytes
+            Aneinandergereihte, vollständige MIDI-Nachrichten.
+        """
+        for msg in WirePort.split(data):
+            self.port.send(mido.Message.from_bytes(msg))
+
+    @staticmethod
+    def split(data: bytes) -> Iterator[bytes]:
+        """
+        Zerlegt eine Gruppe vorkodierter Kanalnachrichten anhand ihrer
+        Statusbytes in einzelne Nachrichten.
+
+        Parameters
+        ----------
+        data : bytes
+            Aneinandergereihte, vollständige MIDI-Nachrichten.
+        """
+        i, end = 0, len(data)
+        while i < end:
+            n = 2 if data[i] & 0xE0 == 0xC0 else 3
+            yield data[i:i + n]
+            i += n
+
+    @staticmethod
+    def _raw(port: Any) -> Any:
+        """
+        Interne Methode, die den rtmidi-Ausgang eines mido-Ports zurückgibt,
+        sofern der Port aus dem rtmidi-Backend von mido stammt und der Ausgang
+        Bytes annimmt, sonst `None`.
+        """
+        if not type(port).__module__.startswith('mido.backends.rtmidi'):
+            return None
+        rt = getattr(port, '_rt', None)
+        if not callable(getattr(rt, 'send_message', None)): return None
+        return rt
@@ -1,4 +1,4 @@
-import time
+from threading import Event
 
 from lib import AngelusPlayer, Carillon, FestivePlayer, GpioBell, \
     DirektoriumProxy, Jukebox, MqttClient, MqttController, Nightmuter, Striker
@@ -10,18 +10,18 @@ if __name__ == '__main__':
     c = Carillon()
     s = Striker(c)
     Nightmuter(s)
-    DirektoriumProxy(s)
+    d = DirektoriumProxy(s)
     AngelusPlayer(s)
     FestivePlayer(s)
 
     m = MqttClient()
     if m.client is not None:
         Jukebox(c, m)
-        MqttController(s, m)
+        MqttController(s, m, d)
 
     GpioBell(c, m)
 
     print('Vorbereitungen abgeschlossen, mache mich an das unendliche Warten…')
 
-    while True:
-        time.sleep(0.1)
+    # Alle Arbeit geschieht in Threads, der Hauptthread wartet nur noch
+    Event().wait()
@@ -0,0 +1,127 @@
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta
+import difflib
+import io
+from pathlib import Path
+import sys
+import time
+from typing import List
+
+from lib.angelusplayer import AngelusPlayer
+from lib.clock import VirtualClock
+from lib.direktoriumproxy import DirektoriumProxy
+from lib.festiveplayer import FestivePlayer
+from lib.melody import Melody
+from lib.nightmuter import Nightmuter
+from lib.recordingcarillon import Recording, RecordingCarillon
+from lib.striker import Striker
+from lib.timerservice import TimerService
+
+
+def describe(melody: Melody) -> str:
+    """
+    Beschreibt eine Melodie kompakt über ihre Abschnitte: Ordner und Name der
+    Datei, ggf. mit Transponierung und Tempo. Aufeinanderfolgende gleiche
+    Abschnitte werden zusammengefasst.
+    """
+    parts: List[List] = list()
+    for _, score, transpose, tempo in melody.segments():
+        if score.source is None and not len(score): continue
+        name = '<inline>' if score.source is None \
+            else f'{Path(score.source).parent.name}/{Path(score.source).stem}'
+        if transpose: name += f' {transpose:+d}'
+        if tempo != 1: name += f' x{tempo:g}'
+        if parts and parts[-1][0] == name: parts[-1][1] += 1
+        else: parts.append([name, 1])
+    return ' + '.join(n if c == 1 else f'{n} *{c}' for n, c in parts)
+
+
+def log(records: List[Recording], start: date, end: date) -> List[str]:
+    """
+    Erstellt das Protokoll aller Schläge zwischen zwei Tagen: je gespieltem
+    Schlag eine Zeile mit Sollzeitpunkt, Dauer und Abschnitten. Stumme
+    Viertelstunden tauchen nicht auf.
+    """
+    lines = [f'# Karpo-Simulation {start.isoformat()} bis '
+             f'{(end - timedelta(days=1)).isoformat()}']
+    for r in records:
+        if not start <= r.when.date() < end: continue
+        lines.append(f'{r.when:%Y-%m-%d %H:%M} {r.melody.duration:8.3f}  '
+                     f'{describe(r.melody)}')
+    return lines
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(
+        description='Spielt Schlagwerk und Observer im Zeitraffer mit einer '
+                    'virtuellen Uhr durch und protokolliert, was gespielt '
+                    'worden wäre.')
+    parser.add_argument('-y', '--year', type=int, default=date.today().year,
+                        help='Zu simulierendes Kalenderjahr.')
+    parser.add_argument('-s', '--start', type=date.fromisoformat,
+                        help='Erster simulierter Tag (überschreibt --year).')
+    parser.add_argument('-d', '--days', type=int,
+                        help='Anzahl simulierter Tage (Standard: bis zum '
+                             'Jahresende).')
+    parser.add_argument('-o', '--output',
+                        help='Protokoll hier ablegen statt es auszugeben.')
+    parser.add_argument('-n', '--no-direktorium', action='store_true',
+                        help='Ohne Direktorium (Osterruhe, Antiphon, '
+                             'Themewechsel) simulieren, etwa ohne Netz.')
+    parser.add_argument('-c', '--check',
+                        help='Protokoll mit dieser Referenz vergleichen und '
+                             'bei Abweichungen mit Fehler beenden.')
+    args = parser.parse_args()
+
+    start = args.start or date(args.year, 1, 1)
+    end = start + timedelta(days=args.days) if args.days \
+        else date(start.year + 1, 1, 1)
+    begin = datetime.combine(start, datetime.min.time())
+
+    # Zeitsteuerung mit virtueller Uhr kurz vor dem ersten Schlag
+    clock = VirtualClock((begin - timedelta(minutes=1)).timestamp())
+    timers = TimerService(clock)
+    TimerService.use(timers)
+
+    output = io.StringIO()
+    with redirect_stdout(output):
+        carillon = RecordingCarillon(clock)
+        striker = Striker(carillon)
+        Nightmuter(striker)
+        if not args.no_direktorium: DirektoriumProxy(striker)
+        AngelusPlayer(striker)
+        FestivePlayer(striker)
+
+        elapsed = time.perf_counter()
+        until = datetime.combine(end, datetime.min.time())
+        timers.advance(until.timestamp() - 1)
+        elapsed = time.perf_counter() - elapsed
+
+    # Fehlgeschlagene Aufgaben (etwa ohne Direktorium) zusammenfassen
+    failures = dict()
+    for line in output.getvalue().splitlines():
+        if line.startswith('Job ') and ' failed: ' in line:
+            failures[line] = failures.get(line, 0) + 1
+    for line, count in failures.items():
+        print(f'{count}x {line}', file=sys.stderr)
+
+    lines = log(carillon.records, start, end)
+    slots = round((until - begin).total_seconds() / 900)
+    played = len(lines) - 1
+    print(f'{slots} quarters ({played} played, {slots - played} '
+          f'muted) in {elapsed:.2f} s, {slots / elapsed:.0f} strikes/s',
+          file=sys.stderr)
+
+    text = '\n'.join(lines) + '\n'
+    if args.output: Path(args.output).write_text(text)
+    elif not args.check: sys.stdout.write(text)
+
+    if args.check:
+        reference = Path(args.check).read_text().splitlines()
+        diff = list(difflib.unified_diff(
+            reference, lines, args.check, 'Simulation', lineterm=''))
+        if diff:
+            print('\n'.join(diff[:200]), file=sys.stderr)
+            sys.exit(1)
+        print('No differences from the reference.', file=sys.stderr)
@@ -0,0 +1,108 @@
+from datetime import date
+
+from lib.direktorium.calendarstore import CalendarStore
+from lib.direktorium.direktorium import Direktorium
+from lib.direktorium.fakeapi import FakeApi
+from lib.direktorium.rank import Rank
+
+
+def celebration(day, title, importance, rank=''):
+    return {'Tl': title, 'Datum': day, 'Bem': '', 'L1': '', 'AP': '',
+            'L2': '', 'EV': '', 'Farbe': 'w', 'Grad': importance,
+            'Rang': rank}
+
+
+def year(*celebrations, **meta):
+    return {**meta, 'Zelebrationen': {
+        str(n): c for n, c in enumerate(celebrations)}}
+
+
+DATA = year(
+    celebration('2027-03-19', 'Josef', 3, 'H'),
+    celebration('2027-03-18', 'Cyrill', 12, 'g'),
+    celebration('2027-03-19', 'Fastenwochentag', 9),
+    celebration('2027-03-17', 'Patrick', 12, 'g'),
+    celebration('2027-03-18', 'Fastenwochentag', 9),
+    Kalender='deutschland', Jahr=2027)
+
+
+def test_get_orders_by_importance():
+    store = CalendarStore(':memory:')
+    store.insert(2027, DATA)
+    titles = [e.title for e in store.get(date(2027, 3, 18))]
+    assert titles == ['Fastenwochentag', 'Cyrill']
+    assert store.get(date(2027, 3, 20)) == []
+
+
+def test_range_orders_by_day_then_importance():
+    store = CalendarStore(':memory:')
+    store.insert(2027, DATA)
+    events = store.range(date(2027, 3, 18), date(2027, 3, 19))
+    assert [(e.date.day, e.title) for e in events] == [
+        (18, 'Fastenwochentag'), (18, 'Cyrill'),
+        (19, 'Josef'), (19, 'Fastenwochentag')]
+
+
+def test_rank_filters_and_orders_by_day():
+    store = CalendarStore(':memory:')
+    store.insert(2027, DATA)
+    assert [e.title for e in store.rank(2027, Rank.NICHTGEBOTEN)] == \
+        ['Patrick', 'Cyrill']
+    assert [e.title for e in store.rank(2027, Rank.HOCHFEST)] == ['Josef']
+
+
+def test_raw_and_meta_restore_the_api_format():
+    store = CalendarStore(':memory:')
+    store.insert(2027, DATA)
+    raw = store.raw(date(2027, 3, 19))
+    assert list(raw) == ['0', '2']
+    assert raw['0'] == DATA['Zelebrationen']['0']
+    assert store.meta(2027) == {'Kalender': 'deutschland', 'Jahr': 2027}
+    assert store.meta(2028) == {}
+
+
+def test_insert_replaces_the_year():
+    store = CalendarStore(':memory:')
+    store.insert(2027, DATA)
+    assert store.get(date(2027, 3, 17))[0].title == 'Patrick'
+    store.insert(2027, year(celebration('2027-03-17', 'Gertrud', 12, 'g')))
+
+    assert [e.title for e in store.get(date(2027, 3, 17))] == ['Gertrud']
+    assert store.get(date(2027, 3, 19)) == []
+    assert store.revision(2027) == 2
+    assert store.revision(2028) == 0
+
+
+def test_years_are_kept_apart():
+    store = CalendarStore(':memory:')
+    store.insert(2027, DATA)
+    store.insert(2028, year(celebration('2028-03-19', 'Josef', 3, 'H')))
+    store.insert(2027, DATA)
+    assert store.has(2027) and store.has(2028) and not store.has(2029)
+    assert [e.date.year for e in store.rank(2028, Rank.HOCHFEST)] == [2028]
+
+
+def test_store_persists(tmp_path):
+    path = str(tmp_path / 'calendar.sqlite')
+    store = CalendarStore(path)
+    store.insert(2027, DATA)
+    store.close()
+
+    store = CalendarStore(path)
+    assert store.has(2027)
+    assert [e.title for e in store.get(date(2027, 3, 19))] == \
+        ['Josef', 'Fastenwochentag']
+    assert store.meta(2027)['Jahr'] == 2027
+    store.close()
+
+
+def test_request_cache_keeps_the_other_keys():
+    api = FakeApi().start()
+    try:
+        direktorium = Direktorium(url=api.url())
+        data = direktorium.request_cache(date(2027, 3, 19))
+    finally:
+        api.stop()
+    assert data['Kalender'] == 'deutschland' and data['Jahr'] == 2027
+    assert {c['Datum'] for c in data['Zelebrationen'].values()} == \
+        {'2027-03-19'}
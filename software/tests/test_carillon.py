@@ -0,0 +1,133 @@
+from concurrent.futures import Future
+import time
+
+import mido
+import pytest
+
+from lib.carillon import Carillon
+from lib.melody import Melody
+from lib.virtualport import VirtualPort
+
+
+def tone(note, seconds):
+    return Melody([mido.Message('note_on', note=note, velocity=64),
+                   mido.Message('note_off', note=note, time=seconds)])
+
+
+def onsets(port):
+    return [(t, m[1]) for m, t in zip(port.messages, port.times)
+            if m[0] & 0xF0 == 0x90 and m[2] > 0]
+
+
+def notes(port):
+    return [n for _, n in onsets(port)]
+
+
+def wait_for(condition, timeout=3):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline: time.sleep(0.005)
+    return condition()
+
+
+def idle(carillon):
+    return carillon.current is None and carillon.stats()['depth'] == 0
+
+
+@pytest.fixture
+def carillon():
+    carillon = Carillon(VirtualPort())
+    yield carillon
+    carillon.stop().result(3)
+
+
+def test_play_starts_immediately_when_idle(carillon):
+    started = Future()
+    assert carillon.play(tone(60, 0.05), started=started) is True
+    assert 0 <= started.result(1) < 0.05
+    assert wait_for(lambda: idle(carillon))
+    assert notes(carillon.port) == [60]
+
+
+@pytest.mark.parametrize('priority', [0, 1])
+def test_equal_or_higher_priority_preempts(carillon, priority):
+    carillon.play(tone(60, 5), 0)
+    assert wait_for(lambda: notes(carillon.port) == [60])
+    assert carillon.play(tone(62, 0.05), priority) is True
+    assert wait_for(lambda: idle(carillon), timeout=1)
+    assert notes(carillon.port) == [60, 62]
+    assert len(carillon.port.resets) == 1
+
+
+def test_lower_priority_is_rejected_by_default(carillon):
+    assert carillon.settings.queuetimeout == 0
+    carillon.play(tone(60, 0.2), 1)
+    assert wait_for(lambda: notes(carillon.port) == [60])
+    started = Future()
+    assert carillon.play(tone(62, 0.05), 0, started=started) is False
+    assert started.result(0) is None
+    assert carillon.stats()['dropped'] == 1
+    assert wait_for(lambda: idle(carillon))
+    assert notes(carillon.port) == [60]
+
+
+def test_without_preempt_waits_for_the_current_melody(carillon):
+    carillon.play(tone(60, 0.3), 0)
+    assert wait_for(lambda: notes(carillon.port) == [60])
+    assert carillon.play(tone(62, 0.05), 5, preempt=False, timeout=5) \
+        is False
+    assert wait_for(lambda: idle(carillon))
+    (first, _), (second, _) = onsets(carillon.port)
+    assert notes(carillon.port) == [60, 62]
+    assert second - first >= 0.3
+
+
+def test_queue_plays_by_priority_then_arrival(carillon):
+    carillon.play(tone(60, 0.2), 9)
+    assert wait_for(lambda: notes(carillon.port) == [60])
+    for note, priority in [(61, 1), (62, 3), (63, 2), (64, 3)]:
+        carillon.play(tone(note, 0.01), priority, preempt=False, timeout=5)
+    assert carillon.stats()['depth'] == 4
+    assert wait_for(lambda: idle(carillon))
+    assert notes(carillon.port) == [60, 62, 64, 63, 61]
+    assert carillon.stats()['played'] == 5
+
+
+def test_expired_request_is_dropped(carillon):
+    carillon.play(tone(60, 0.4), 0)
+    assert wait_for(lambda: notes(carillon.port) == [60])
+    started = Future()
+    assert carillon.play(tone(62, 0.05), 0, preempt=False, timeout=0.1,
+                         started=started) is False
+    assert started.result(2) is None
+    assert wait_for(lambda: idle(carillon))
+    assert notes(carillon.port) == [60]
+    assert carillon.stats()['dropped'] == 1
+
+
+def test_zero_timeout_still_plays_when_free(carillon):
+    assert carillon.play(tone(60, 0.05), 0, timeout=0) is True
+    assert wait_for(lambda: idle(carillon))
+    assert notes(carillon.port) == [60]
+    assert carillon.stats()['dropped'] == 0
+
+
+def test_stop_returns_at_once_and_clears_the_queue(carillon):
+    carillon.play(tone(60, 10), 0)
+    assert wait_for(lambda: notes(carillon.port) == [60])
+    started = Future()
+    carillon.play(tone(62, 0.05), 0, preempt=False, timeout=30,
+                  started=started)
+
+    called = time.perf_counter()
+    silenced = carillon.stop()
+    assert time.perf_counter() - called < 0.05
+    assert started.result(0) is None
+    assert 0 <= silenced.result(1) < 0.5
+    assert idle(carillon)
+    assert notes(carillon.port) == [60]
+    assert carillon.stats()['stops'] == 1
+
+
+def test_stop_when_idle_is_already_done(carillon):
+    silenced = carillon.stop()
+    assert silenced.done() and silenced.result() == 0
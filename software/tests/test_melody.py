@@ -0,0 +1,89 @@
+import mido
+import pytest
+
+from lib.melody import Melody
+
+
+def tone(note, seconds=1):
+    return Melody([mido.Message('note_on', note=note, velocity=64),
+                   mido.Message('note_off', note=note, time=seconds)])
+
+
+def played(melody):
+    """Absolute Zeitpunkte und Noten aller Anschläge."""
+    result, now = list(), 0
+    for m in melody.messages:
+        now += m.time
+        if m.type == 'note_on': result.append((pytest.approx(now), m.note))
+    return result
+
+
+def test_add_applies_each_summands_settings_once():
+    a, b = tone(60), tone(70)
+    a.transpose, a.tempo = 2, 2
+    melody = a + b
+
+    # Bisher wurden Transponierung und Tempo des linken Summanden doppelt
+    # und zusätzlich auf den rechten angewendet: 64 bei vierfachem Tempo,
+    # danach 72.
+    assert (melody.transpose, melody.tempo) == (0, 1)
+    assert played(melody) == [(0, 62), (0.5, 70)]
+    assert melody.duration == pytest.approx(1.5)
+
+
+def test_add_leaves_its_summands_untouched():
+    a, b = tone(60), tone(70)
+    b.transpose = 5
+    a + b
+    assert played(a) == [(0, 60)]
+    assert played(b) == [(0, 75)]
+
+
+def test_settings_of_a_sum_apply_on_top():
+    a = tone(60)
+    a.transpose = 2
+    melody = a + tone(70)
+    melody.transpose, melody.tempo = 1, 2
+    assert played(melody) == [(0, 63), (0.5, 71)]
+    assert melody.duration == pytest.approx(1)
+
+
+def test_iadd_keeps_settings_for_the_whole_melody():
+    a, b = tone(60), tone(70)
+    a.transpose, b.transpose = 2, 1
+    a += b
+    assert a.transpose == 2
+    assert played(a) == [(0, 62), (1, 73)]
+
+
+def test_mul_repeats_with_settings_applied_once():
+    a = tone(60)
+    a.transpose, a.tempo = 3, 2
+    melody = a * 3
+    assert (melody.transpose, melody.tempo) == (3, 2)
+    assert played(melody) == [(0, 63), (0.5, 63), (1, 63)]
+    assert played(2 * a) == played(a * 2)
+
+
+def test_imul_repeats_in_place():
+    a = tone(60)
+    a.tempo = 2
+    a *= 2
+    assert played(a) == [(0, 60), (0.5, 60)]
+
+
+def test_nested_chains_accumulate_transpose_and_tempo():
+    inner = tone(60) + tone(62)
+    inner.transpose, inner.tempo = 12, 2
+    outer = inner * 2 + tone(64)
+    outer.transpose = -12
+    assert played(outer) == [(0, 60), (0.5, 62), (1, 60), (1.5, 62),
+                             (2, 52)]
+    assert outer.duration == pytest.approx(3)
+    assert [s.offset for s in outer.segments()] == \
+        pytest.approx([0, 0.5, 1, 1.5, 2])
+
+
+def test_sum_of_plain_melodies_stays_flat():
+    melody = tone(60) + tone(62) + tone(64)
+    assert len(melody.root.parts) == 3
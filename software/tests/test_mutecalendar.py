@@ -0,0 +1,104 @@
+from datetime import date
+
+import pytest
+
+from lib.mutecalendar import MuteCalendar
+from lib.settings import MuteSettings, StrikerSettings
+
+
+FRIDAY = date(2027, 3, 5)
+
+
+def calendar(start=None, end=None, mutes=()):
+    settings = StrikerSettings(
+        nightmuter_start=start, nightmuter_end=end,
+        mutes=[MuteSettings(**m) for m in mutes])
+    return MuteCalendar.from_settings(settings)
+
+
+def muted(cal, day, hhmm):
+    h, m = (int(v) for v in hhmm.split(':'))
+    return cal.muted(day, h, m // 15)
+
+
+@pytest.mark.parametrize('start, end', [
+    ('21:00', '8:00'), ('23:30', '6:15'), ('12:00', '12:00'),
+    ('22:45', '0:00')])
+def test_nightmuter_matches_baseline_rule(start, end):
+    # Regel der bisherigen Nachtabschaltung über Mitternacht, die den Tag
+    # noch nicht kannte
+    sh, sq = int(start.split(':')[0]), int(start.split(':')[1]) // 15
+    eh, eq = int(end.split(':')[0]), int(end.split(':')[1]) // 15
+
+    def baseline(hours, quarters):
+        if sh < hours or sh == hours and sq < quarters: return True
+        return eh > hours or eh == hours and eq > quarters
+
+    cal = calendar(start, end)
+    for slot in range(96):
+        assert cal.muted(FRIDAY, slot // 4, slot % 4) == \
+            baseline(slot // 4, slot % 4), f'{slot // 4}:{slot % 4 * 15}'
+
+
+def test_overnight_window_spills_into_next_day():
+    cal = calendar('21:00', '8:00')
+    assert not muted(cal, FRIDAY, '21:00')
+    assert muted(cal, FRIDAY, '21:15')
+    assert muted(cal, FRIDAY, '23:45')
+    assert muted(cal, FRIDAY, '0:00')
+    assert muted(cal, FRIDAY, '7:45')
+    assert not muted(cal, FRIDAY, '8:00')
+
+
+def test_overnight_window_follows_its_start_day():
+    cal = calendar(mutes=[{'start': '22:00', 'end': '6:00', 'weekdays': [4]}])
+    saturday, sunday = date(2027, 3, 6), date(2027, 3, 7)
+    assert not muted(cal, FRIDAY, '3:00')
+    assert muted(cal, FRIDAY, '22:00')
+    assert muted(cal, saturday, '3:00')
+    assert not muted(cal, saturday, '6:00')
+    assert not muted(cal, saturday, '22:00')
+    assert not muted(cal, sunday, '3:00')
+
+
+def test_exception_also_frees_the_following_morning():
+    cal = calendar(mutes=[{'start': '22:00', 'end': '6:00',
+                           'exceptions': ['03-05']}])
+    saturday = date(2027, 3, 6)
+    assert not muted(cal, FRIDAY, '23:00')
+    assert not muted(cal, saturday, '3:00')
+    assert muted(cal, saturday, '23:00')
+
+
+def test_mute_with_equal_start_and_end_is_empty():
+    cal = calendar(mutes=[{'start': '12:00', 'end': '12:00'}])
+    assert cal.windows == []
+    assert cal.mask(FRIDAY) == 0
+
+
+def test_nightmuter_with_equal_start_and_end_keeps_only_that_strike():
+    cal = calendar('12:00', '12:00')
+    assert cal.mask(FRIDAY) == (1 << 96) - 1 - (1 << 48)
+
+
+def test_window_until_midnight_does_not_spill():
+    cal = calendar(mutes=[{'start': '23:00', 'end': '24:00'}])
+    assert muted(cal, FRIDAY, '23:45')
+    assert not muted(cal, date(2027, 3, 6), '0:00')
+
+
+def test_dates_restrict_the_start_day():
+    cal = calendar(mutes=[{'start': '12:00', 'end': '14:00',
+                           'dates': ['2027-03-05', '12-24']}])
+    assert muted(cal, FRIDAY, '13:00')
+    assert muted(cal, date(2030, 12, 24), '13:00')
+    assert not muted(cal, date(2027, 3, 4), '13:00')
+
+
+@pytest.mark.parametrize('mute', [
+    {'start': '25:00', 'end': '1:00'}, {'start': '12', 'end': '13:00'},
+    {'start': '12:00', 'end': '13:00', 'weekdays': [7]},
+    {'start': '12:00', 'end': '13:00', 'dates': ['02-30']}])
+def test_invalid_rules_raise(mute):
+    with pytest.raises(ValueError):
+        calendar(mutes=[mute])
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+import time
+
+from lib.clock import Clock, VirtualClock
+from lib.timerservice import TimerService
+
+
+START = datetime(2027, 3, 1, 12, 0)
+
+
+class JumpingClock(Clock):
+    """Systemuhr, deren Wanduhr sich im Test verstellen lässt."""
+
+    def __init__(self):
+        self.offset: float = 0
+
+    def time(self) -> float:
+        return time.time() + self.offset
+
+
+def virtual():
+    clock = VirtualClock(START.timestamp())
+    return TimerService(clock), clock
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline: time.sleep(0.01)
+    return condition()
+
+
+def test_jobs_run_in_due_order():
+    timers, clock = virtual()
+    now, order = clock.time(), list()
+    timers.at(now + 30, lambda: order.append('c'))
+    timers.at(now + 10, lambda: order.append('a'))
+    timers.at(now + 20, lambda: order.append('b'))
+    timers.advance(now + 60)
+    assert order == ['a', 'b', 'c']
+    assert clock.time() == now + 60
+
+
+def test_equal_due_times_keep_insertion_order():
+    timers, clock = virtual()
+    now, order = clock.time(), list()
+    for name in 'abcde': timers.at(now + 5, lambda n=name: order.append(n))
+    timers.advance(now + 5)
+    assert order == list('abcde')
+
+
+def test_clock_advances_to_each_due_time():
+    timers, clock = virtual()
+    now, seen = clock.time(), list()
+    timers.add(TimerService.interval(15), lambda: seen.append(clock.time()))
+    timers.advance(now + 60)
+    assert seen == [now + 15, now + 30, now + 45, now + 60]
+
+
+def test_interleaved_rules_merge_in_time_order():
+    timers, clock = virtual()
+    seen = list()
+    timers.add(TimerService.hourly(0), lambda: seen.append(('h', clock.now())))
+    timers.add(TimerService.daily(13, 30),
+               lambda: seen.append(('d', clock.now())))
+    timers.advance((START + timedelta(hours=3)).timestamp())
+    assert seen == [('h', datetime(2027, 3, 1, 13, 0)),
+                    ('d', datetime(2027, 3, 1, 13, 30)),
+                    ('h', datetime(2027, 3, 1, 14, 0)),
+                    ('h', datetime(2027, 3, 1, 15, 0))]
+
+
+def test_cancelled_job_does_not_run():
+    timers, clock = virtual()
+    now, runs = clock.time(), list()
+    job = timers.add(TimerService.interval(10), lambda: runs.append(1))
+    timers.advance(now + 25)
+    timers.cancel(job)
+    timers.advance(now + 100)
+    assert len(runs) == 2
+    assert timers.jobs() == []
+
+
+def test_failing_job_stays_scheduled(capsys):
+    timers, clock = virtual()
+    now, runs = clock.time(), list()
+
+    def fail():
+        runs.append(1)
+        raise RuntimeError('boom')
+
+    timers.add(TimerService.interval(10), fail, 'fail')
+    timers.advance(now + 30)
+    assert len(runs) == 3
+    assert 'Job fail failed' in capsys.readouterr().out
+
+
+def test_past_one_shot_runs_on_next_advance():
+    timers, clock = virtual()
+    now, runs = clock.time(), list()
+    timers.at(now - 10, lambda: runs.append(clock.time()))
+    timers.advance(now)
+    assert runs == [now]
+
+
+def test_backward_clock_jump_reschedules():
+    clock = JumpingClock()
+    timers = TimerService(clock)
+    timers.MAXSLEEP = 0.05
+    runs = list()
+    job = timers.add(TimerService.interval(5), lambda: runs.append(1))
+    clock.offset = -86400
+
+    # Ohne Neueinplanung wäre die Aufgabe erst in einem Tag fällig
+    assert wait_for(lambda: job.due - clock.time() <= 5)
+    assert runs == []
+    timers.cancel(job)
+
+
+def test_forward_clock_jump_skips_missed_runs():
+    clock = JumpingClock()
+    timers = TimerService(clock)
+    timers.MAXSLEEP = 0.05
+    runs = list()
+    job = timers.add(TimerService.interval(3600), lambda: runs.append(1))
+    before = job.due
+    clock.offset = 7200
+
+    assert wait_for(lambda: job.due > before + 3600)
+    assert runs == []
+    assert job.due - clock.time() > 3500
+    timers.cancel(job)